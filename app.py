@@ -1,10 +1,17 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
-from src.aggregator import NewsAggregator
-from src.classifier import ContentClassifier
+from src.config import AggregatorConfig
+from src.read_service import ArticleReadService
+from src.category_scores import DEFAULT_MIN_SCORE
+from src.article_cards import paginate, render_articles
 import time
 
+# Dashboard queries use the read snapshot published after every ingest cycle
+# (ARTICLES_SNAPSHOT_PATH) instead of competing with the writer for the
+# database. Replica nodes point it at the snapshot their ReplicaApplier publishes.
+CONFIG = AggregatorConfig.from_env()
+
 # Page config
 st.set_page_config(
     page_title="Fashion & Beauty News Aggregator",
@@ -43,6 +50,9 @@ st.markdown("""
         padding: 1rem;
         margin-bottom: 0.5rem;
         transition: all 0.3s ease;
+        /* Off-screen cards of the page are still built, but skipped by layout and paint */
+        content-visibility: auto;
+        contain-intrinsic-size: auto 160px;
     }
     
     .article-card:hover {
@@ -113,15 +123,15 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
-def load_aggregator():
-    """Load and cache the news aggregator"""
-    return NewsAggregator()
+@st.cache_resource
+def load_read_service():
+    """One read-only query service per process, shared by every session (never pickled or rebuilt)"""
+    return ArticleReadService(CONFIG.snapshot_path, CONFIG.db_path, in_memory=CONFIG.in_memory_snapshot)
 
 @st.cache_data(ttl=900)  # Cache for 15 minutes
-def get_articles_data(category_filter, source_filter, time_filter, limit):
+def get_articles_data(category_filter, source_filter, time_filter, limit, related=False):
     """Get articles data with caching"""
-    aggregator = load_aggregator()
+    service = load_read_service()
     
     hours_old = None
     if time_filter == "1 hour":
@@ -135,41 +145,28 @@ def get_articles_data(category_filter, source_filter, time_filter, limit):
     elif time_filter == "3 days":
         hours_old = 72
     
-    articles = aggregator.get_recent_articles(
+    articles = service.get_recent_articles(
         limit=limit,
         category=category_filter if category_filter != "All Categories" else None,
         source=source_filter if source_filter != "All Sources" else None,
-        hours_old=hours_old
+        hours_old=hours_old,
+        with_description=False,
+        # Opt-in: also list articles filed elsewhere that score high in the category
+        min_score=DEFAULT_MIN_SCORE if related else None
     )
     
-    return articles, aggregator.get_stats(), aggregator.get_sources(), aggregator.get_categories()
+    return articles
 
-def format_time_ago(published_date):
-    """Format time ago string"""
-    if not published_date:
-        return "Unknown time"
-    
-    try:
-        if isinstance(published_date, str):
-            pub_date = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
-        else:
-            pub_date = published_date
-        
-        now = datetime.now(pub_date.tzinfo) if pub_date.tzinfo else datetime.now()
-        diff = now - pub_date
-        
-        if diff.days > 0:
-            return f"{diff.days} day{'s' if diff.days > 1 else ''} ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hour{'s' if hours > 1 else ''} ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
-        else:
-            return "Just now"
-    except:
-        return "Unknown time"
+@st.cache_data(ttl=60)
+def get_stats_data():
+    """Get dashboard statistics (cheap: read from the summary tables)"""
+    return load_read_service().get_stats()
+
+@st.cache_data(ttl=1800)
+def get_filter_options():
+    """Get the source and category lists for the sidebar filters"""
+    service = load_read_service()
+    return service.get_sources(), service.get_categories()
 
 def main():
     # Header
@@ -189,11 +186,15 @@ def main():
         
         # Load data to get available categories and sources
         try:
-            sample_articles, stats, sources, categories = get_articles_data("All Categories", "All Sources", "All time", 10)
+            sources, categories = get_filter_options()
+            stats = get_stats_data()
             
             # Category filter
             category_options = ["All Categories"] + categories
             category_filter = st.selectbox("🏷️ Category", category_options, index=0)
+            related = st.checkbox("Include related articles", value=False,
+                                  help="Also list articles filed under another category that mention this one often",
+                                  disabled=category_filter == "All Categories")
             
             # Source filter
             source_options = ["All Sources"] + sorted(sources)
@@ -208,7 +209,7 @@ def main():
             st.metric("Total Articles", stats['total_articles'])
             st.metric("Last 24 Hours", stats['recent_articles_24h'])
             st.markdown('</div>', unsafe_allow_html=True)
-            
+        
         except Exception as e:
             st.error(f"Error loading data: {e}")
             st.stop()
@@ -231,47 +232,22 @@ def main():
     
     # Load articles
     try:
-        articles, stats, sources, categories = get_articles_data(category_filter, source_filter, time_filter, article_limit)
+        articles = get_articles_data(category_filter, source_filter, time_filter, article_limit, related)
         
         if not articles:
             st.warning("No articles found matching the current filters. Try adjusting your filter criteria.")
             return
         
-        # Display articles
-        for article in articles:
-            with st.container():
-                st.markdown('<div class="article-card">', unsafe_allow_html=True)
-                
-                # Title
-                st.markdown(f'<div class="article-title">{article["title"]}</div>', unsafe_allow_html=True)
-                
-                # Meta information
-                time_ago = format_time_ago(article.get('published_date'))
-                st.markdown(
-                    f'<div class="article-meta">'
-                    f'<span class="article-source">{article["source"]}</span> • '
-                    f'{time_ago} • '
-                    f'<span class="article-category">{article.get("category", "Uncategorized")}</span>'
-                    f'</div>',
-                    unsafe_allow_html=True
-                )
-                
-                # Description
-                if article.get('description'):
-                    description = article['description'][:200] + "..." if len(article['description']) > 200 else article['description']
-                    st.markdown(f'<div class="article-description">{description}</div>', unsafe_allow_html=True)
-                
-                # Read more button
-                st.markdown(
-                    f'<a href="{article["url"]}" target="_blank" class="read-more-btn">Read Full Article →</a>',
-                    unsafe_allow_html=True
-                )
-                
-                st.markdown('</div>', unsafe_allow_html=True)
-                
+        # Display one page of articles as a single element
+        page_count = paginate(articles, 1)[1]
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1) if page_count > 1 else 1
+        page_articles, page_count = paginate(articles, page)
+        st.markdown(render_articles(page_articles), unsafe_allow_html=True)
+        
         # Pagination info
         st.markdown(f"---")
-        st.markdown(f"**Showing {len(articles)} articles** (filtered from {stats['total_articles']} total)")
+        st.markdown(f"**Showing {len(page_articles)} of {len(articles)} articles** (page {page} of {page_count}, "
+                    f"filtered from {stats['total_articles']} total)")
         
         # Category breakdown
         if stats.get('by_category'):
@@ -281,7 +257,7 @@ def main():
                 for cat, count in stats['by_category'].items()
             ])
             st.bar_chart(category_df.set_index('Category'), use_container_width=True)
-            
+    
     except Exception as e:
         st.error(f"Error displaying articles: {e}")
         st.markdown("Please try refreshing the page or contact support if the issue persists.")
@@ -0,0 +1,155 @@
+"""Score each classifier implementation against the hand-labeled corpus: accuracy and speed.
+
+Reports per-category precision/recall/F1, the confusion matrix, articles/s
+(one article at a time, no cache) and peak memory of building the
+classifier and classifying the corpus. Runs offline from the committed
+corpus; the naive Bayes model is scored on held-out folds, never on
+articles it was trained on. Its hyperparameters were chosen on most of
+these articles, so the figure flatters it; whether a model may replace
+the keywords is decided on the held-out split alone (`holdout_evaluate`).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_accuracy
+    python -m benchmarks.bench_accuracy --json before.json   # keep results to compare a change
+    python -m benchmarks.bench_accuracy --export             # rebuild the corpus from articles.db + labels
+"""
+import os
+import json
+import time
+import tempfile
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+from src.classifier import ContentClassifier
+from src.bayes_classifier import (
+    NUMPY_AVAILABLE, CategoryModel, NaiveBayesClassifier, classification_metrics, cross_val_predict, read_labels,
+    stored_articles
+)
+from benchmarks.bench_classifier import RegexClassifier
+
+CORPUS_PATH = os.path.join('data', 'classifier_corpus.jsonl')
+LABELS_PATH = os.path.join('data', 'category_labels.csv')
+
+def export_corpus(db_path: str, labels_path: str, corpus_path: str) -> int:
+    """Write the hand-labeled articles of `db_path` (title, description as stored, label) as JSON lines"""
+    labels = read_labels(labels_path)
+    count = 0
+    with open(corpus_path, 'w') as f:
+        for url, title, description, _ in stored_articles(db_path):
+            if url in labels:
+                f.write(json.dumps({'url': url, 'title': title, 'description': description,
+                                    'category': labels[url]}, ensure_ascii=False) + '\n')
+                count += 1
+    return count
+
+def load_corpus(corpus_path: str) -> List[Tuple[str, str, str]]:
+    """(title, description, category) samples of a corpus file"""
+    with open(corpus_path) as f:
+        return [(a['title'], a['description'], a['category']) for a in map(json.loads, f)]
+
+def implementations(samples: List[Tuple[str, str, str]], folds: int, model_dir: str) -> Dict[str, Dict]:
+    """name -> {'build', 'classify', and 'predicted' when predictions must come from held-out folds}"""
+    keywords = ContentClassifier(cache_size=0)
+    impls = {
+        'regex': {
+            'build': lambda: RegexClassifier(keywords.category_keywords),
+            'classify': lambda c, title, description: c.classify(title, description)[1],
+        },
+        'keywords': {
+            'build': lambda: ContentClassifier(cache_size=0),
+            'classify': lambda c, title, description: c.classify_uncached(title, description),
+        },
+    }
+    if NUMPY_AVAILABLE:
+        # Speed and memory of a model trained on the whole corpus, loaded the
+        # way the aggregator loads it; accuracy from cross-validation
+        model_path = os.path.join(model_dir, 'category_model.bin')
+        CategoryModel.train(samples, keywords.get_categories(), keywords.category_keywords).save(model_path)
+        impls['naive-bayes'] = {
+            'build': lambda: NaiveBayesClassifier(model_path, cache_size=0),
+            'classify': lambda c, title, description: c.classify_uncached(title, description),
+            'predicted': cross_val_predict(samples, keywords.get_categories(), keywords.category_keywords, folds),
+            'mapped_bytes': os.path.getsize(model_path),
+        }
+    return impls
+
+def throughput(build: Callable, classify: Callable, samples, repeat: int = 5) -> float:
+    """Best articles/s over `repeat` passes"""
+    classifier = build()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for title, description, _ in samples:
+            classify(classifier, title, description)
+        best = min(best, time.perf_counter() - start)
+    return len(samples) / best
+
+def peak_memory(build: Callable, classify: Callable, samples) -> int:
+    """Peak bytes allocated while building the classifier and classifying every sample once"""
+    tracemalloc.start()
+    classifier = build()
+    for title, description, _ in samples:
+        classify(classifier, title, description)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del classifier
+    return peak
+
+def report(name: str, result: Dict, categories: List[str]):
+    """Print one implementation's results"""
+    mapped = f", {result['mapped_bytes'] / 2**20:.1f} MiB model file mapped" if 'mapped_bytes' in result else ''
+    print(f"\n== {name}: accuracy {result['accuracy']:.1%}, macro F1 {result['macro_f1']:.3f}, "
+          f"{result['articles_per_second']:,.0f} articles/s, peak {result['peak_memory'] / 2**20:.2f} MiB{mapped}")
+    
+    print(f"  {'category':<18}{'precision':>10}{'recall':>8}{'F1':>7}{'support':>9}")
+    for category, m in result['per_category'].items():
+        print(f"  {category:<18}{m['precision']:>10.2f}{m['recall']:>8.2f}{m['f1']:>7.2f}{m['support']:>9}")
+    
+    # Rows are labels, columns predictions, numbered in category order
+    print(f"  {'label / predicted':<21}" + ''.join(f"{i:>6}" for i in range(1, len(categories) + 1)))
+    for i, category in enumerate(categories, 1):
+        print(f"  {i} {category:<19}" + ''.join(f"{result['confusion'][category][c]:>6}" for c in categories))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    parser.add_argument('--export', action='store_true', help="rebuild the corpus from --db and --labels first")
+    parser.add_argument('--db', default='articles.db', help="read-only source for --export")
+    parser.add_argument('--labels', default=LABELS_PATH, help="hand labels (url,category) for --export")
+    parser.add_argument('--folds', type=int, default=10, help="cross-validation folds for trained models")
+    parser.add_argument('--only', nargs='+', help="implementations to run (default: all available)")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+    
+    if args.export:
+        print(f"Exported {export_corpus(args.db, args.labels, args.corpus)} labeled articles to {args.corpus}")
+    
+    samples = load_corpus(args.corpus)
+    labels = [category for _, _, category in samples]
+    categories = ContentClassifier(cache_size=0).get_categories()
+    print(f"{len(samples)} labeled articles in {args.corpus}")
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as model_dir:
+        for name, impl in implementations(samples, args.folds, model_dir).items():
+            if args.only and name not in args.only:
+                continue
+            predicted = impl.get('predicted')
+            if predicted is None:
+                classifier = impl['build']()
+                predicted = [impl['classify'](classifier, title, description) for title, description, _ in samples]
+            
+            result = classification_metrics(labels, predicted, categories)
+            result['articles_per_second'] = throughput(impl['build'], impl['classify'], samples)
+            result['peak_memory'] = peak_memory(impl['build'], impl['classify'], samples)
+            if 'mapped_bytes' in impl:
+                result['mapped_bytes'] = impl['mapped_bytes']
+            results[name] = result
+            report(name, result, categories)
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
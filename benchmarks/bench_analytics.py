@@ -0,0 +1,115 @@
+"""Compare DuckDB analytics queries against the equivalent SQLite GROUP BYs.
+
+Both sides must return the same rows; exits non-zero on any difference.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_analytics --articles 200000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime, timezone
+import pandas as pd
+from src.database import ArticleDatabase
+from src.analytics import AnalyticsStore
+from benchmarks.synthetic import generate_articles, bulk_load
+
+# SQLite GROUP BY answering the same question as each AnalyticsStore call;
+# day and hour buckets are epoch seconds (UTC), compared after normalizing
+SQLITE_QUERIES = {
+    'volume_by_source': '''
+        SELECT a.published_ts / 86400 * 86400 AS day, s.name AS source, COUNT(*) AS articles
+        FROM articles a LEFT JOIN sources s ON s.id = a.source_id
+        WHERE a.published_ts >= ? GROUP BY day, source
+    ''',
+    'volume_by_category': '''
+        SELECT a.published_ts / 86400 * 86400 AS day, c.name AS category, COUNT(*) AS articles
+        FROM articles a LEFT JOIN categories c ON c.id = a.category_id
+        WHERE a.published_ts >= ? GROUP BY day, category
+    ''',
+    'volume_by_hour': '''
+        SELECT published_ts / 3600 * 3600 AS hour, COUNT(*) AS articles
+        FROM articles WHERE published_ts >= ? GROUP BY hour
+    ''',
+    'share_of_voice': '''
+        SELECT a.published_ts / 86400 * 86400 AS day, s.name AS source,
+               COUNT(*) FILTER (WHERE c.name = 'Luxury') AS category_articles,
+               COUNT(*) AS articles,
+               COUNT(*) FILTER (WHERE c.name = 'Luxury') * 1.0 / COUNT(*) AS share
+        FROM articles a
+        LEFT JOIN sources s ON s.id = a.source_id
+        LEFT JOIN categories c ON c.id = a.category_id
+        WHERE a.published_ts >= ? GROUP BY day, source
+    ''',
+}
+
+def normalize(rows) -> list:
+    """Rows as sorted tuples of plain values: timestamps as epoch seconds, floats rounded"""
+    def plain(value):
+        if hasattr(value, 'year'):
+            return int(pd.Timestamp(value).timestamp())
+        if isinstance(value, float):
+            return round(value, 9)
+        return value.item() if hasattr(value, 'item') else value
+    return sorted(tuple(plain(v) for v in row) for row in rows)
+
+def timed(fn, repeat: int = 3) -> float:
+    """Best-of-`repeat` wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--articles', type=int, default=200000)
+    parser.add_argument('--days', type=int, default=90)
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix='bench_analytics_')
+    db_path = os.path.join(workdir, 'articles.db')
+    db = ArticleDatabase(db_path)
+    
+    start = time.perf_counter()
+    bulk_load(db, generate_articles(args.articles, days=args.days))
+    print(f"Loaded {args.articles} articles into SQLite in {time.perf_counter() - start:.1f}s")
+    
+    store = AnalyticsStore(os.path.join(workdir, 'analytics.duckdb'), db_path)
+    start = time.perf_counter()
+    store.sync()
+    print(f"Synced DuckDB store in {time.perf_counter() - start:.1f}s\n")
+    
+    # The store's windows start at midnight UTC `days - 1` days ago
+    since = store._since(args.days)
+    cutoff = int(datetime(since.year, since.month, since.day, tzinfo=timezone.utc).timestamp())
+    conn = db.connect()
+    duck_calls = {
+        'volume_by_source': lambda: store.volume_by_source(args.days),
+        'volume_by_category': lambda: store.volume_by_category(args.days),
+        'volume_by_hour': lambda: store.volume_by_hour(args.days),
+        'share_of_voice': lambda: store.share_of_voice('Luxury', args.days),
+    }
+    
+    mismatches = 0
+    print(f"{'query':<20} {'sqlite ms':>10} {'duckdb ms':>10} {'speedup':>8}")
+    for name, query in SQLITE_QUERIES.items():
+        expected = normalize(conn.execute(query, (cutoff,)).fetchall())
+        got = normalize(duck_calls[name]().itertuples(index=False))
+        if got != expected:
+            mismatches += 1
+            print(f"  MISMATCH {name}: {len(got)} DuckDB rows != {len(expected)} SQLite rows")
+        
+        sqlite_ms = timed(lambda: conn.execute(query, (cutoff,)).fetchall())
+        duck_ms = timed(duck_calls[name])
+        print(f"{name:<20} {sqlite_ms:>10.1f} {duck_ms:>10.1f} {sqlite_ms / duck_ms:>7.1f}x")
+    
+    conn.close()
+    store.close()
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Check the keyword classifier against the regex implementation it replaced, and measure its throughput.
+
+Every text is scored by both: per-category match counts and the chosen
+category must be identical. Exits non-zero on any difference.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_classifier --articles 5000
+"""
+import re
+import sys
+import time
+import random
+import sqlite3
+import argparse
+from typing import Dict, List, Tuple
+from src.classifier import ContentClassifier, FALLBACK_KEYWORDS, DEFAULT_CATEGORY, NUMPY_AVAILABLE
+from src.compression import TextCompressor
+from benchmarks.synthetic import generate_articles
+
+# Texts probing boundaries, case folding and keyword order
+EDGE_CASES = [
+    '', ' ', 'trend trending trends TRENDING', 'fashion week fashion weekend fashion_week',
+    'e-commerce ecommerce e-commerce-ready pre-e-commerce', 'pop-up pop-ups pop-up-store',
+    'retail strategy retail space retail', 'skincare routine skincare-routine',
+    'HERMÈS Hermès hermes HermÈs', 'AI AIs A.I. AI2 _AI AI_ ai-driven', 'IPO IPOs ipo',
+    'buſineſs buſiness', 'Kelvin K-pop Korea marKet share', 'İnline onlİne ONLINE',
+    'ultra-high-net-worth ultra-high-net-worthy', 'brick-and-mortar-store', 'AR VR ARVR VR-AR',
+    'onlineshopping online shopping online  shopping', 'businesses financially earningsrevenue',
+    'haute couture haute-couture hautecouture', 'luxurious premiums', 'digitally ecommerces',
+    'stores shopper retailer', 'nothing matches here', 'ǅ ǆ Ǆ ß ẞ ﬁ ﬀ',
+]
+
+# Keywords added through add_keywords, including ones with non-word edges
+EXTRA_KEYWORDS = {
+    'Fashion Trends': ['C++', '#metgala', 'K-pop', 'y2k', 'street style', 'trend'],
+    'Luxury': ['Hermès Birkin', '  ', 'ſilk'],
+}
+
+class RegexClassifier:
+    """The regex classifier this repository used before the keyword automaton (reference)"""
+    
+    def __init__(self, category_keywords: Dict[str, List[str]]):
+        self.category_patterns = {
+            category: re.compile(r'\b(?:' + '|'.join(re.escape(k) for k in keywords) + r')\b', re.IGNORECASE)
+            for category, keywords in category_keywords.items()
+        }
+    
+    def scores(self, text: str) -> Dict[str, int]:
+        return {category: len(pattern.findall(text)) for category, pattern in self.category_patterns.items()}
+    
+    def classify(self, title: str, description: str = '') -> Tuple[Dict[str, int], str]:
+        text = f"{title} {description or ''}"
+        scores = self.scores(text)
+        best = max(scores, key=scores.get)
+        if scores[best] > 0:
+            return scores, best
+        text_lower = text.lower()
+        for category, words in FALLBACK_KEYWORDS.items():
+            if any(word in text_lower for word in words):
+                return scores, category
+        return scores, DEFAULT_CATEGORY
+
+def fuzz_texts(keywords: List[str], count: int, seed: int = 1) -> List[str]:
+    """Random runs of keyword pieces, case changes and separators"""
+    rng = random.Random(seed)
+    pieces = [piece for keyword in keywords for piece in re.split(r'(\W)', keyword) if piece]
+    pieces += [' ', ' ', '-', '_', 's', 'ing', '.', 'É', 'è', 'ſ', '2']
+    texts = []
+    for _ in range(count):
+        parts = [rng.choice(pieces) for _ in range(rng.randint(1, 40))]
+        parts = [p.upper() if rng.random() < 0.2 else p for p in parts]
+        texts.append(''.join(rng.choice(['', ' ']) + p for p in parts))
+    return texts
+
+def corpus(args) -> List[Tuple[str, str]]:
+    """(title, description) pairs: the real database, synthetic feed HTML, edge cases and fuzz"""
+    pairs = []
+    try:
+        conn = sqlite3.connect(f"file:{args.real_db}?mode=ro", uri=True)
+        reader = TextCompressor()
+        pairs += [(title, reader.decompress(conn, description))
+                  for title, description in conn.execute('SELECT title, description FROM articles')]
+        conn.close()
+    except sqlite3.Error:
+        pass
+    pairs += [(a['title'], a['description']) for a in generate_articles(args.articles, html=True)]
+    pairs += [(text, '') for text in EDGE_CASES]
+    keywords = [k for words in ContentClassifier().category_keywords.values() for k in words]
+    pairs += [(text, '') for text in fuzz_texts(keywords, args.fuzz)]
+    return pairs
+
+def compare(classifier: ContentClassifier, reference: RegexClassifier, pairs) -> int:
+    """Number of texts where scores or category differ (the first few are printed)"""
+    mismatches = 0
+    for title, description in pairs:
+        scores, category = reference.classify(title, description)
+        got_scores = classifier.matcher.count(f"{title} {description or ''}")
+        got_category = classifier.classify_article(title, description)
+        if got_scores != scores or got_category != category:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  MISMATCH {title[:60]!r}: {got_category} {got_scores} != {category} {scores}")
+    return mismatches
+
+def throughput(classify_batch, pairs, repeat: int = 3) -> float:
+    """Best articles/s of `classify_batch(pairs)` over `repeat` passes"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        classify_batch(pairs)
+        best = min(best, time.perf_counter() - start)
+    return len(pairs) / best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--articles', type=int, default=5000, help="synthetic articles")
+    parser.add_argument('--fuzz', type=int, default=20000, help="random keyword-fragment texts")
+    parser.add_argument('--real-db', default='articles.db')
+    args = parser.parse_args()
+    
+    pairs = corpus(args)
+    classifier = ContentClassifier()
+    reference = RegexClassifier(classifier.category_keywords)
+    
+    print(f"Comparing {len(pairs):,} texts with the regex classifier...")
+    mismatches = compare(classifier, reference, pairs)
+    
+    for category, keywords in EXTRA_KEYWORDS.items():
+        classifier.add_keywords(category, keywords)
+    reference = RegexClassifier(classifier.category_keywords)
+    print("...and again after add_keywords")
+    mismatches += compare(classifier, reference, pairs)
+    
+    batch = classifier.classify_many(pairs)
+    batch_mismatches = sum(got != reference.classify(t, d)[1] for got, (t, d) in zip(batch, pairs))
+    print(f"...and classify_many: {batch_mismatches} mismatches")
+    mismatches += batch_mismatches
+    print(f"{mismatches} mismatches")
+    
+    classifier = ContentClassifier()
+    reference = RegexClassifier(classifier.category_keywords)
+    articles = [pair for pair in pairs if pair[1]]
+    regex_rate = throughput(lambda batch: [reference.classify(t, d) for t, d in batch], articles)
+    matcher_rate = throughput(lambda batch: [classifier.classify_article(t, d) for t, d in batch], articles)
+    batch_rate = throughput(classifier.classify_many, articles)
+    print(f"\nregex alternations:  {regex_rate:>10,.0f} articles/s")
+    print(f"keyword automaton:   {matcher_rate:>10,.0f} articles/s ({matcher_rate / regex_rate:.1f}x)")
+    print(f"classify_many:       {batch_rate:>10,.0f} articles/s ({batch_rate / regex_rate:.1f}x)"
+          f"{'' if NUMPY_AVAILABLE else ' (without NumPy)'}")
+    
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
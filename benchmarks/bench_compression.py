@@ -0,0 +1,96 @@
+"""Measure description compression: size on disk and scan / read query times.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_compression --articles 200000
+"""
+import os
+import time
+import shutil
+import argparse
+import sqlite3
+import tempfile
+from src.database import ArticleDatabase
+from src.compression import TextCompressor, train_dictionary
+from benchmarks.synthetic import generate_articles, bulk_load
+
+# Full scans of the articles table (NOT INDEXED keeps SQLite off the
+# narrow covering indexes), like rebuild_stats or ad-hoc reports
+SCAN_QUERIES = {
+    'count by source (scan)': 'SELECT source_id, COUNT(*) FROM articles NOT INDEXED GROUP BY source_id',
+    'title search (scan)': "SELECT COUNT(*) FROM articles NOT INDEXED WHERE title LIKE '%couture%'",
+}
+
+def timed(fn, repeat: int = 5) -> float:
+    """Best-of-`repeat` wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def measure(db_path: str, compress: bool, args) -> dict:
+    db = ArticleDatabase(db_path, near_duplicates=False, compress_descriptions=compress)
+    bulk_load(db, generate_articles(args.articles, days=args.days, html=True))
+    
+    conn = db.connect()
+    conn.execute('VACUUM')
+    # A small page cache, so scans pay for every page they touch
+    conn.execute('PRAGMA cache_size = -2000')
+    result = {
+        'size': os.path.getsize(db_path),
+        'description_bytes': conn.execute('SELECT SUM(length(description)) FROM articles').fetchone()[0],
+        'compressed_rows': conn.execute("SELECT COUNT(*) FROM articles WHERE typeof(description) = 'blob'").fetchone()[0],
+    }
+    for name, query in SCAN_QUERIES.items():
+        result[name] = timed(lambda: conn.execute(query).fetchall())
+    conn.close()
+    
+    result['get_stats'] = timed(db.get_stats)
+    result['get_articles (full)'] = timed(lambda: db.get_articles(limit=200))
+    result['get_articles (200 chars)'] = timed(lambda: db.get_articles(limit=200, description_chars=200))
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--articles', type=int, default=200000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--real-db', default='articles.db', help="also compare dictionaries on this file's descriptions")
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix='bench_compression_')
+    results = {}
+    for label, compress in (('plain', False), ('compressed', True)):
+        print(f"Building {args.articles:,} articles ({label})...")
+        results[label] = measure(os.path.join(workdir, f'{label}.db'), compress, args)
+    
+    print(f"\n{'':<28}" + ''.join(f"{label:>14}" for label in results))
+    print(f"{'database size (MB)':<28}" + ''.join(f"{r['size'] / 1e6:>14.1f}" for r in results.values()))
+    print(f"{'description bytes (MB)':<28}" + ''.join(f"{r['description_bytes'] / 1e6:>14.1f}" for r in results.values()))
+    print(f"{'compressed rows':<28}" + ''.join(f"{r['compressed_rows']:>14,}" for r in results.values()))
+    for name in list(SCAN_QUERIES) + ['get_stats', 'get_articles (full)', 'get_articles (200 chars)']:
+        print(f"{name + ' ms':<28}" + ''.join(f"{r[name]:>14.2f}" for r in results.values()))
+    shutil.rmtree(workdir)
+    
+    if os.path.exists(args.real_db):
+        # How much the trained dictionary adds over plain zlib on real feed
+        # text (read-only: the file is not upgraded)
+        conn = sqlite3.connect(f"file:{args.real_db}?mode=ro", uri=True)
+        reader = TextCompressor()
+        texts = [reader.decompress(conn, row[0]) for row in conn.execute('SELECT description FROM articles')]
+        conn.close()
+        
+        texts = [text for text in texts if text]
+        train, test = texts[::2], texts[1::2]
+        raw = sum(len(text.encode()) for text in test)
+        
+        plain, trained = TextCompressor(), TextCompressor()
+        trained.dictionaries[1] = train_dictionary(train)
+        trained.current_id = 1
+        print()
+        for label, compressor in (('zlib', plain), ('zlib + dictionary', trained)):
+            stored = sum(len(v if isinstance(v, bytes) else v.encode()) for v in map(compressor.compress, test))
+            print(f"{args.real_db} descriptions, {label}: {raw:,} -> {stored:,} bytes ({stored / raw:.0%})")
+
+if __name__ == "__main__":
+    main()
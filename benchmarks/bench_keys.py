@@ -0,0 +1,102 @@
+"""Compare database size and insert/lookup speed for the article key formats.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_keys --articles 1000000
+"""
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from src.database import ArticleDatabase, KEY_FORMATS
+from src.migrate_keys import migrate_keys
+from benchmarks.synthetic import generate_articles, bulk_load
+
+def index_sizes(conn) -> dict:
+    """Bytes per table/index from the dbstat virtual table (empty if SQLite lacks it)"""
+    try:
+        return dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall())
+    except Exception:
+        return {}
+
+def lookups_per_second(conn, column: str, keys) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        conn.execute(f"SELECT title FROM articles WHERE {column} = ?", (key,)).fetchone()
+    return len(keys) / (time.perf_counter() - start)
+
+def measure(db_path: str, key_format: str, args) -> dict:
+    db = ArticleDatabase(db_path, near_duplicates=False, key_format=key_format)
+    
+    start = time.perf_counter()
+    bulk_load(db, generate_articles(args.articles, days=args.days))
+    load_seconds = time.perf_counter() - start
+    
+    # Insert rate into the full table
+    extra = [dict(a, url=a['url'] + '/extra', title=a['title'] + ' extra')
+             for a in generate_articles(args.inserts, days=1, seed=7)]
+    start = time.perf_counter()
+    bulk_load(db, extra)
+    insert_rate = args.inserts / (time.perf_counter() - start)
+    
+    conn = db.connect()
+    conn.execute('VACUUM')
+    sample = conn.execute(
+        "SELECT id, content_hash FROM articles ORDER BY random() LIMIT ?", (args.lookups,)
+    ).fetchall()
+    
+    result = {
+        'size': os.path.getsize(db_path),
+        'load_seconds': load_seconds,
+        'insert_rate': insert_rate,
+        'id_lookups': lookups_per_second(conn, 'id', [r[0] for r in sample]),
+        'hash_lookups': lookups_per_second(conn, 'content_hash', [r[1] for r in sample]),
+        'objects': index_sizes(conn)
+    }
+    conn.close()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--articles', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--inserts', type=int, default=20000)
+    parser.add_argument('--lookups', type=int, default=50000)
+    parser.add_argument('--migrate', action='store_true', help="also time migrate_keys on the hex database")
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix='bench_keys_')
+    results = {}
+    for key_format in KEY_FORMATS:
+        print(f"Building {args.articles:,} articles with {key_format} keys...")
+        results[key_format] = measure(os.path.join(workdir, f'{key_format}.db'), key_format, args)
+    
+    print(f"\n{'':<24}" + ''.join(f"{f:>14}" for f in results))
+    rows = [
+        ('database size (MB)', lambda r: f"{r['size'] / 1e6:.1f}"),
+        ('bulk load (s)', lambda r: f"{r['load_seconds']:.1f}"),
+        ('inserts / s', lambda r: f"{r['insert_rate']:,.0f}"),
+        ('id lookups / s', lambda r: f"{r['id_lookups']:,.0f}"),
+        ('content_hash lookups / s', lambda r: f"{r['hash_lookups']:,.0f}"),
+    ]
+    for label, fmt in rows:
+        print(f"{label:<24}" + ''.join(f"{fmt(r):>14}" for r in results.values()))
+    
+    objects = sorted(set().union(*(r['objects'] for r in results.values())))
+    if objects:
+        print("\nPer-object size (MB):")
+        for name in objects:
+            print(f"  {name:<36}" + ''.join(f"{r['objects'].get(name, 0) / 1e6:>14.1f}" for r in results.values()))
+    
+    if args.migrate:
+        path = os.path.join(workdir, 'migrate.db')
+        shutil.copy(os.path.join(workdir, 'hex.db'), path)
+        start = time.perf_counter()
+        result = migrate_keys(path, 'int64')
+        print(f"\nmigrate_keys hex -> int64: {result['migrated']:,} articles in {time.perf_counter() - start:.1f}s, "
+              f"{result['size_before'] / 1e6:.1f} -> {result['size_after'] / 1e6:.1f} MB")
+    
+    shutil.rmtree(workdir)
+
+if __name__ == "__main__":
+    main()
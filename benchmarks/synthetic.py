@@ -0,0 +1,79 @@
+"""Synthetic article data for the benchmarks in this directory."""
+import random
+import sqlite3
+import itertools
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List
+from src.database import ArticleDatabase, INSERT_ARTICLE_SQL
+from src.feeds import FEED_SOURCES
+
+CATEGORIES = ['Fashion Business', 'Beauty', 'Luxury', 'Retail', 'E-commerce', 'Fashion Trends']
+
+WORDS = (
+    'runway collection designer luxury beauty skincare retail store brand launch '
+    'spring summer fall winter trend style revenue growth sustainable fashion week '
+    'makeup fragrance boutique ecommerce digital marketplace couture vintage'
+).split()
+
+def feed_html(rng: random.Random, source: str, title: str, body: str, i: int) -> str:
+    """Wrap body text the way WordPress-style feeds do: lead image, paragraph and footer"""
+    domain = ''.join(c for c in source.lower() if c.isalnum()) + '.com'
+    link = f"https://{domain}/2026/{rng.randint(1, 12):02d}/story-{i}/"
+    image = f"https://{domain}/wp-content/uploads/2026/{rng.randint(1, 12):02d}/story-{i}.jpg"
+    srcset = ', '.join(f"{image}?w={width} {width}w" for width in (300, 768, 1024, 1200))
+    return (
+        f'<figure class="wp-block-image size-large"><img width="1200" height="800" src="{image}" '
+        f'class="attachment-large size-large wp-post-image" alt="" decoding="async" loading="lazy" '
+        f'srcset="{srcset}" sizes="(max-width: 1200px) 100vw, 1200px" /></figure>'
+        f'<p>{body}</p><p><a href="{link}" rel="nofollow">Continue reading</a></p>'
+        f'<p>The post <a href="{link}" rel="nofollow">{title}</a> appeared first on '
+        f'<a href="https://{domain}" rel="nofollow">{source}</a>.</p>'
+    )
+
+def generate_articles(count: int, days: int = 90, seed: int = 42, html: bool = False) -> Iterator[Dict]:
+    """Yield `count` plausible articles spread over the last `days` days (feed-style HTML descriptions if `html`)"""
+    rng = random.Random(seed)
+    sources = list(FEED_SOURCES)
+    now = datetime.now(timezone.utc)
+    
+    for i in range(count):
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 12))).capitalize()
+        body = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(30, 120)))
+        source = rng.choice(sources)
+        description = feed_html(rng, source, title, body, i) if html else f'<p>{body}</p>'
+        yield {
+            'title': f"{title} {i}",
+            'url': f"https://example.com/{i}",
+            'description': description,
+            'published_date': now - timedelta(seconds=rng.randint(0, days * 86400)),
+            'source': source,
+            'category': rng.choice(CATEGORIES)
+        }
+
+def bulk_load(db: ArticleDatabase, articles: Iterator[Dict], batch_size: int = 10000) -> int:
+    """Insert articles in large transactions (much faster than insert_article per row)"""
+    conn = db.connect()
+    sql = INSERT_ARTICLE_SQL.format(table='articles')
+    loaded = 0
+    batch: List[tuple] = []
+    
+    # The first batch trains the description dictionary, if compressing
+    articles = iter(articles)
+    first = list(itertools.islice(articles, batch_size))
+    db.prepare_compressor(conn, first)
+    
+    for article in itertools.chain(first, articles):
+        batch.append(db.article_row(conn, article))
+        if len(batch) >= batch_size:
+            conn.executemany(sql, batch)
+            conn.commit()
+            loaded += len(batch)
+            batch = []
+    
+    if batch:
+        conn.executemany(sql, batch)
+        conn.commit()
+        loaded += len(batch)
+    
+    conn.close()
+    return loaded
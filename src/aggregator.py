@@ -4,19 +4,64 @@ from datetime import datetime, timezone
 import logging
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict
-from src.database import ArticleDatabase
-from src.classifier import ContentClassifier
-from src.feeds import get_all_feeds
+from dataclasses import replace
+from typing import List, Dict, Optional
+from src.database import ArticleDatabase, ArticleKey
+from src.partitioned_database import PartitionedArticleDatabase
+from src.sharded_database import ShardedArticleDatabase
+from src.archive import ArticleArchive
+from src.config import AggregatorConfig
+from src.snapshot import SnapshotArticleDatabase
+from src.replication import ReplicationPublisher
+from src.compaction import Compactor
+from src.classifier import top_category
+from src.bayes_classifier import load_classifier
+from src.feed_tags import TagMapper, entry_tags
+from src.feeds import get_all_feeds, TAG_CATEGORIES, SOURCE_TAG_CATEGORIES
 import traceback
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class NewsAggregator:
-    def __init__(self, db_path: str = "articles.db"):
-        self.db = ArticleDatabase(db_path)
-        self.classifier = ContentClassifier()
+    def __init__(self, config: Optional[AggregatorConfig] = None, **options):
+        """Build storage, readers and the classifier from `config`; keyword `options` override single fields"""
+        config = replace(config or AggregatorConfig(), **options)
+        self.config = config
+        
+        self.archive = ArticleArchive(config.archive_dir) if config.archive_dir else None
+        self.retention_days = config.retention_days
+        
+        storage_class = PartitionedArticleDatabase if config.partitioned else ArticleDatabase
+        if config.sharded:
+            self.db = ShardedArticleDatabase(config.db_path, config.shards, archive=self.archive,
+                                             shard_class=storage_class,
+                                             compress_descriptions=config.compress_descriptions)
+        else:
+            self.db = storage_class(config.db_path, archive=self.archive,
+                                    compress_descriptions=config.compress_descriptions)
+        
+        # Dashboard reads go to a snapshot published after each ingest cycle,
+        # so they never wait on (or block) the writer
+        self.snapshot_path = config.snapshot_path
+        if config.snapshot_path:
+            self.reader = SnapshotArticleDatabase(config.snapshot_path, config.db_path,
+                                                  in_memory=config.in_memory_snapshot)
+        else:
+            self.reader = self.db
+        
+        self.publisher = ReplicationPublisher(config.db_path, config.replication_dir) if config.replication_dir else None
+        
+        # Pages freed by retention are handed back in small steps after each cycle
+        db_paths = [config.db_path] + ([shard.db_path for shard in self.db.shards] if config.sharded else [])
+        self.compactors = [Compactor(path) for path in db_paths]
+        
+        # A trained naive Bayes model replaces the keyword lists when given,
+        # if it beat them on held-out articles
+        self.classifier = load_classifier(config.classifier_model)
+        # Publisher tags that settle a category before the classifier runs
+        self.tag_mapper = TagMapper(TAG_CATEGORIES, SOURCE_TAG_CATEGORIES)
+        self.classifier_version = self.tag_mapper.stamp(self.classifier.version)
         self.feeds = get_all_feeds()
         
         # Request session for connection pooling
@@ -24,7 +69,7 @@ class NewsAggregator:
         self.session.headers.update({
             'User-Agent': 'Fashion News Aggregator 1.0 (Educational Use)'
         })
-        
+    
     def parse_feed_date(self, entry) -> datetime:
         """Parse feed entry date to datetime object"""
         try:
@@ -41,6 +86,7 @@ class NewsAggregator:
     def fetch_single_feed(self, source_name: str, feed_url: str) -> List[Dict]:
         """Fetch and parse a single RSS feed"""
         articles = []
+        known = 0
         
         try:
             # Set timeout for feed parsing
@@ -62,29 +108,33 @@ class NewsAggregator:
                     if not url:
                         continue
                     
+                    # Most entries were stored on an earlier run; skip them
+                    # before any parsing, classification or database work
+                    if self.db.is_known(url.strip()):
+                        known += 1
+                        continue
+                    
                     # Parse publication date
                     published_date = self.parse_feed_date(entry)
                     
-                    # Classify article
-                    category = self.classifier.classify_article(title, description)
-                    
+                    # Classified with the whole batch in fetch_all_feeds
                     article = {
                         'title': title.strip(),
                         'url': url.strip(),
                         'description': description.strip() if description else None,
                         'published_date': published_date,
                         'source': source_name,
-                        'category': category
+                        'tags': entry_tags(entry)
                     }
                     
                     articles.append(article)
-                    
+                
                 except Exception as e:
                     logging.error(f"Error processing entry from {source_name}: {e}")
                     continue
-                    
-            logging.info(f"Successfully fetched {len(articles)} articles from {source_name}")
             
+            logging.info(f"Successfully fetched {len(articles)} new articles from {source_name} ({known} already stored)")
+        
         except requests.exceptions.RequestException as e:
             logging.error(f"Network error fetching {source_name}: {e}")
         except Exception as e:
@@ -96,6 +146,7 @@ class NewsAggregator:
     def fetch_all_feeds(self, max_workers: int = 10) -> int:
         """Fetch all RSS feeds concurrently"""
         total_new_articles = 0
+        fetched = []
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             # Submit all feed fetch tasks
@@ -109,24 +160,59 @@ class NewsAggregator:
                 source_name = future_to_source[future]
                 
                 try:
-                    articles = future.result()
-                    
-                    # Insert articles into database
-                    new_count = 0
-                    for article in articles:
-                        if self.db.insert_article(article):
-                            new_count += 1
-                    
-                    total_new_articles += new_count
-                    logging.info(f"Added {new_count} new articles from {source_name}")
-                    
+                    fetched.extend(future.result())
                 except Exception as e:
                     logging.error(f"Error processing results from {source_name}: {e}")
         
+        # Articles whose publisher tags map to one category are settled by
+        # them; the rest are scored in one batch, cached by content hash, so
+        # re-polled and syndicated copies are free. All category scores are
+        # stored for multi-label filtering
+        tag_scores = [self.tag_mapper.scores(a['source'], a['tags']) for a in fetched]
+        untagged = [a for a, scores in zip(fetched, tag_scores) if scores is None]
+        category_scores = iter(self.classifier.score_many(
+            [(a['title'], a['description']) for a in untagged],
+            [self.db.generate_content_hash(a['title'], a['description']) for a in untagged]
+        ))
+        for article, scores in zip(fetched, tag_scores):
+            scores = scores or next(category_scores)
+            article['category'] = top_category(scores)
+            article['category_scores'] = scores
+            article['classifier_version'] = self.classifier_version
+        if self.classifier.cache is not None:
+            stats = self.classifier.cache.stats()
+            logging.info(f"Classified {len(fetched)} articles ({len(fetched) - len(untagged)} by publisher tags); "
+                         f"classification cache hit rate {stats['hit_rate']:.1%} "
+                         f"({stats['hits']} hits, {stats['entries']} entries)")
+        
+        # Insert everything as one batch: a single transaction per database
+        # file, with shards (if any) written concurrently. An article that
+        # fails is rolled back and logged alone; the rest are still stored
+        inserted = self.db.insert_articles(fetched)
+        
+        new_by_source = {}
+        for article, is_new in zip(fetched, inserted):
+            if is_new:
+                new_by_source[article['source']] = new_by_source.get(article['source'], 0) + 1
+        
+        for source_name in self.feeds:
+            logging.info(f"Added {new_by_source.get(source_name, 0)} new articles from {source_name}")
+        total_new_articles = sum(new_by_source.values())
+        
         # Clean up old articles
-        deleted_count = self.db.cleanup_old_articles(days_old=5)
+        deleted_count = self.db.cleanup_old_articles(days_old=self.retention_days)
         logging.info(f"Cleaned up {deleted_count} old articles")
         
+        # Shrink the file before it is snapshotted or replicated
+        for compactor in self.compactors:
+            compactor.compact()
+        
+        if self.snapshot_path:
+            self.db.publish_snapshot(self.snapshot_path)
+        
+        if self.publisher:
+            self.publisher.publish()
+        
         logging.info(f"Total new articles added: {total_new_articles}")
         return total_new_articles
     
@@ -134,18 +220,50 @@ class NewsAggregator:
                           limit: int = 200,
                           category: str = None,
                           source: str = None,
-                          hours_old: float = None) -> List[Dict]:
-        """Get recent articles with filtering"""
-        return self.db.get_articles(
+                          hours_old: float = None,
+                          description_chars: int = None,
+                          with_description: bool = True,
+                          min_score: float = None,
+                          tag: str = None) -> List[Dict]:
+        """Get recent articles with filtering (`min_score`: multi-label category match, `tag`: publisher tag)"""
+        return self.reader.get_articles(
             limit=limit,
             category=category,
             source=source,
-            hours_old=hours_old
+            hours_old=hours_old,
+            description_chars=description_chars,
+            with_description=with_description,
+            min_score=min_score,
+            tag=tag
         )
     
+    def get_archived_articles(self,
+                              start: datetime = None,
+                              end: datetime = None,
+                              category: str = None,
+                              source: str = None,
+                              limit: int = None) -> List[Dict]:
+        """Query articles that have aged out of the hot database"""
+        if self.archive is None:
+            return []
+        return self.archive.query(start=start, end=end, source=source, category=category, limit=limit)
+    
+    def get_duplicates(self, article_id: ArticleKey) -> List[Dict]:
+        """Get the other sources' copies of a story shown on the dashboard"""
+        return self.reader.get_duplicates(article_id)
+    
     def get_stats(self) -> Dict:
         """Get aggregator statistics"""
-        return self.db.get_stats()
+        return self.reader.get_stats()
+    
+    def get_storage_metrics(self) -> List[Dict]:
+        """Size and fragmentation of each database file"""
+        return [dict(compactor.metrics(), db_path=compactor.db_path) for compactor in self.compactors]
+    
+    def get_classifier_stats(self) -> Dict:
+        """Classifier version and classification cache hit rate"""
+        stats = self.classifier.cache.stats() if self.classifier.cache is not None else {}
+        return dict(stats, version=self.classifier_version)
     
     def get_sources(self) -> List[str]:
         """Get list of all sources"""
@@ -157,7 +275,8 @@ class NewsAggregator:
 
 def main():
     """Main function for testing"""
-    aggregator = NewsAggregator()
+    # Publishes the snapshot the dashboards read, so they see this run
+    aggregator = NewsAggregator(AggregatorConfig.from_env())
     
     print("Starting news aggregation...")
     new_articles = aggregator.fetch_all_feeds()
@@ -0,0 +1,259 @@
+import sqlite3
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import pandas as pd
+from src.archive import ArticleArchive
+from src.sharded_database import shard_paths
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+# Dimensions the canned aggregations may group by
+DIMENSIONS = ('source', 'category')
+
+HOT_ROWS_SQL = '''
+    SELECT a.id, a.title, s.name, c.name, a.published_ts, a.created_at
+    FROM articles a
+    LEFT JOIN sources s ON s.id = a.source_id
+    LEFT JOIN categories c ON c.id = a.category_id
+'''
+
+class AnalyticsStore:
+    """Embedded columnar (DuckDB) copy of article metadata for analytical queries.
+    
+    The row store stays the source of truth: `sync()` pulls new rows from the
+    articles table (by created_at watermark), re-pulls hot rows whose
+    category was changed by reclassification, and loads any archive segments
+    not yet loaded, so history beyond the hot retention window stays
+    queryable. Sharded storage is synced shard by shard (`shard_count`).
+    """
+    
+    def __init__(self,
+                 analytics_path: str = "analytics.duckdb",
+                 db_path: str = "articles.db",
+                 archive: Optional[ArticleArchive] = None,
+                 shard_count: int = 1):
+        if not DUCKDB_AVAILABLE:
+            raise ImportError("duckdb is required for AnalyticsStore (pip install -r requirements-analytics.txt)")
+        
+        self.analytics_path = analytics_path
+        self.db_path = db_path
+        # The catalog file of sharded storage holds no articles
+        self.db_paths = shard_paths(db_path, shard_count) if shard_count > 1 else [db_path]
+        self.archive = archive
+        self.conn = duckdb.connect(analytics_path)
+        self.init_store()
+    
+    def init_store(self):
+        """Create the columnar tables and sync bookkeeping"""
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS articles (
+                id VARCHAR PRIMARY KEY,
+                title VARCHAR,
+                source VARCHAR,
+                category VARCHAR,
+                published_ts BIGINT,
+                published_at TIMESTAMP,
+                day DATE
+            )
+        ''')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS sync_state (key VARCHAR PRIMARY KEY, value VARCHAR)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS ingested_segments (path VARCHAR PRIMARY KEY, rows INTEGER)')
+    
+    def close(self):
+        self.conn.close()
+    
+    def _load_rows(self, rows) -> int:
+        """Upsert article rows (id, title, source, category, published_ts) into the store"""
+        if not rows:
+            return 0
+        
+        incoming = pd.DataFrame(rows, columns=['id', 'title', 'source', 'category', 'published_ts'])
+        # Hex and 64-bit integer article ids share the VARCHAR key column
+        incoming['id'] = incoming['id'].astype(str)
+        self.conn.register('incoming', incoming)
+        self.conn.execute('''
+            INSERT OR REPLACE INTO articles
+            SELECT id, title, source, category, published_ts,
+                   epoch_ms(published_ts * 1000),
+                   CAST(epoch_ms(published_ts * 1000) AS DATE)
+            FROM incoming
+            WHERE published_ts IS NOT NULL
+        ''')
+        self.conn.unregister('incoming')
+        return len(incoming)
+    
+    def sync(self) -> int:
+        """Incrementally load new and reclassified hot rows and new archive segments, return rows loaded"""
+        loaded = sum(self._sync_hot(path) for path in self.db_paths)
+        
+        # Cold archive: segments are immutable, so each is loaded exactly once;
+        # a merged segment is a new file whose rows upsert over the ones loaded before
+        if self.archive is not None:
+            done = {r[0] for r in self.conn.execute('SELECT path FROM ingested_segments').fetchall()}
+            for day in self.archive.list_days():
+                for path in self.archive.list_segments(day):
+                    if path in done:
+                        continue
+                    try:
+                        segment = self.archive.read_segment(
+                            path, columns=['id', 'title', 'source', 'category', 'published_ts']
+                        )
+                    except (OSError, ValueError) as e:
+                        # Not recorded as ingested, so the next sync tries it again
+                        logging.error(f"Skipping unreadable archive segment {path}: {e}")
+                        continue
+                    count = self._load_rows([
+                        (r['id'], r['title'], r['source'], r['category'], r['published_ts']) for r in segment
+                    ])
+                    self.conn.execute('INSERT INTO ingested_segments VALUES (?, ?)', [path, count])
+                    loaded += count
+        
+        logging.info(f"Analytics store synced {loaded} rows")
+        return loaded
+    
+    def _sync_hot(self, db_path: str) -> int:
+        """Load one database file's rows inserted since its watermark, and rows whose category changed"""
+        key = 'hot_created_at' if len(self.db_paths) == 1 else f'hot_created_at:{db_path}'
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", [key]).fetchone()
+        watermark = row[0] if row else ''
+        
+        source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            if source.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles'").fetchone() is None:
+                raise ValueError(f"{db_path} has no articles table; for sharded storage pass shard_count")
+            
+            # Everything inserted since the last watermark. The boundary
+            # second is re-read; the primary key absorbs the overlap.
+            rows = source.execute(HOT_ROWS_SQL + ' WHERE a.created_at >= ?', (watermark,)).fetchall()
+            
+            # Reclassification and tag mapping rewrite category_id in place
+            # without touching created_at, so older rows are compared too
+            # (the hot table only spans the retention window)
+            older = source.execute(HOT_ROWS_SQL + ' WHERE a.created_at < ?', (watermark,)).fetchall()
+        finally:
+            source.close()
+        
+        if older:
+            current = pd.DataFrame([(str(r[0]), r[3]) for r in older], columns=['id', 'category'])
+            self.conn.register('current_categories', current)
+            changed = {r[0] for r in self.conn.execute('''
+                SELECT c.id FROM current_categories c
+                JOIN articles a ON a.id = c.id
+                WHERE a.category IS DISTINCT FROM c.category
+            ''').fetchall()}
+            self.conn.unregister('current_categories')
+            rows += [r for r in older if str(r[0]) in changed]
+        
+        loaded = self._load_rows([r[:5] for r in rows])
+        if rows:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?)",
+                [key, max(watermark, *(r[5] for r in rows))]
+            )
+        return loaded
+    
+    def _since(self, days: int):
+        """First UTC day included in a `days` long window ending today"""
+        return (datetime.now(timezone.utc) - timedelta(days=days - 1)).date()
+    
+    def volume_by_source(self, days: int = 90) -> pd.DataFrame:
+        """Articles per source per day"""
+        return self.conn.execute('''
+            SELECT day, source, COUNT(*) AS articles
+            FROM articles
+            WHERE day >= ?
+            GROUP BY day, source
+            ORDER BY day, articles DESC
+        ''', [self._since(days)]).df()
+    
+    def volume_by_category(self, days: int = 90) -> pd.DataFrame:
+        """Articles per category per day"""
+        return self.conn.execute('''
+            SELECT day, category, COUNT(*) AS articles
+            FROM articles
+            WHERE day >= ?
+            GROUP BY day, category
+            ORDER BY day, articles DESC
+        ''', [self._since(days)]).df()
+    
+    def volume_by_hour(self, days: int = 7) -> pd.DataFrame:
+        """Articles per UTC hour"""
+        return self.conn.execute('''
+            SELECT date_trunc('hour', published_at) AS hour, COUNT(*) AS articles
+            FROM articles
+            WHERE day >= ?
+            GROUP BY hour
+            ORDER BY hour
+        ''', [self._since(days)]).df()
+    
+    def share_of_voice(self, category: str, days: int = 90) -> pd.DataFrame:
+        """Share of each source's daily articles that fall into `category`"""
+        return self.conn.execute('''
+            SELECT day, source,
+                   COUNT(*) FILTER (WHERE category = ?) AS category_articles,
+                   COUNT(*) AS articles,
+                   COUNT(*) FILTER (WHERE category = ?) / COUNT(*) AS share
+            FROM articles
+            WHERE day >= ?
+            GROUP BY day, source
+            ORDER BY day, share DESC
+        ''', [category, category, self._since(days)]).df()
+    
+    def top_movers(self, dimension: str = 'source', window_days: int = 7, limit: int = 10) -> pd.DataFrame:
+        """Largest volume changes between the last window and the one before it"""
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"dimension must be one of {DIMENSIONS}")
+        
+        current_start = self._since(window_days)
+        previous_start = current_start - timedelta(days=window_days)
+        return self.conn.execute(f'''
+            WITH windows AS (
+                SELECT {dimension} AS name,
+                       COUNT(*) FILTER (WHERE day >= ?) AS current,
+                       COUNT(*) FILTER (WHERE day < ?) AS previous
+                FROM articles
+                WHERE day >= ?
+                GROUP BY name
+            )
+            SELECT name, current, previous,
+                   current - previous AS change,
+                   CASE WHEN previous > 0 THEN (current - previous) / previous END AS pct_change
+            FROM windows
+            ORDER BY abs(change) DESC, name
+            LIMIT ?
+        ''', [current_start, current_start, previous_start, limit]).df()
+    
+    def source_overlap(self, days: int = 30, limit: int = 20) -> pd.DataFrame:
+        """Source pairs that ran the same story (same normalized title) on the same day"""
+        return self.conn.execute('''
+            WITH stories AS (
+                SELECT DISTINCT day, source, lower(trim(title)) AS story
+                FROM articles
+                WHERE day >= ?
+            )
+            SELECT a.source AS source_a, b.source AS source_b, COUNT(*) AS shared_stories
+            FROM stories a
+            JOIN stories b ON a.day = b.day AND a.story = b.story AND a.source < b.source
+            GROUP BY source_a, source_b
+            ORDER BY shared_stories DESC
+            LIMIT ?
+        ''', [self._since(days), limit]).df()
+
+def main():
+    """Sync the analytics store and print a short report"""
+    store = AnalyticsStore(archive=ArticleArchive())
+    store.sync()
+    
+    print("Top movers (sources, 7 days):")
+    print(store.top_movers().to_string(index=False))
+    print("\nSource overlap (30 days):")
+    print(store.source_overlap().to_string(index=False))
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import os
+import json
+import zlib
+import struct
+import hashlib
+import logging
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable
+from src.database import parse_published_date
+
+# Segment layout (footer-indexed, like Parquet):
+#   MAGIC | column block 0 | column block 1 | ... | footer JSON | footer length (u32) | MAGIC
+# Each column block is a zlib-compressed JSON array. Low-cardinality string
+# columns are dictionary encoded; the footer carries per-segment min/max and
+# value sets so whole segments can be skipped without reading any block.
+MAGIC = b'FNSEG1'
+FOOTER_TAIL = struct.Struct('>I')
+
+DICTIONARY_COLUMNS = ('source', 'category')
+
+# What a truncated or corrupted segment raises while its footer or blocks are decoded
+DECODE_ERRORS = (ValueError, struct.error, zlib.error, KeyError, IndexError, TypeError)
+
+# Segments a day may collect (one per cleanup cycle) before they are merged into one
+MAX_SEGMENTS_PER_DAY = 4
+
+class ArticleArchive:
+    """Immutable, day-partitioned columnar segments holding expired articles"""
+    
+    def __init__(self, archive_dir: str = "archive", max_segments_per_day: int = MAX_SEGMENTS_PER_DAY):
+        self.archive_dir = archive_dir
+        self.max_segments_per_day = max_segments_per_day
+        os.makedirs(self.archive_dir, exist_ok=True)
+    
+    def list_days(self) -> List[str]:
+        """Return archived days (YYYYMMDD), newest first"""
+        days = [d for d in os.listdir(self.archive_dir)
+                if d.isdigit() and os.path.isdir(os.path.join(self.archive_dir, d))]
+        return sorted(days, reverse=True)
+    
+    def list_segments(self, day: str) -> List[str]:
+        """Return segment file paths for one archived day"""
+        day_dir = os.path.join(self.archive_dir, day)
+        return sorted(os.path.join(day_dir, f) for f in os.listdir(day_dir) if f.endswith('.seg'))
+    
+    def archive_articles(self, articles: Iterable[Dict]) -> int:
+        """Write articles into one new segment per published day, return rows archived.
+        
+        A day that has collected more than `max_segments_per_day` segments is
+        merged back into a single one, so repeated cleanups don't leave reads
+        scanning ever more tiny files.
+        """
+        by_day = {}
+        for article in articles:
+            published = parse_published_date(article.get('published_date') or article.get('created_at'))
+            row = dict(article)
+            row['published_ts'] = int(published.timestamp())
+            by_day.setdefault(published.strftime('%Y%m%d'), []).append(row)
+        
+        archived = 0
+        for day, rows in by_day.items():
+            self._write_segment(day, rows)
+            archived += len(rows)
+            if len(self.list_segments(day)) > self.max_segments_per_day:
+                self.merge_day(day)
+        
+        return archived
+    
+    def merge_day(self, day: str) -> int:
+        """Rewrite all readable segments of one day as a single segment, return the segments merged.
+        
+        The merged segment is published before its inputs are removed; if a
+        crash leaves both behind, the next merge drops the duplicate rows by id.
+        Unreadable segments are logged and left in place.
+        """
+        rows_by_id = {}
+        merged_paths = []
+        for path in self.list_segments(day):
+            try:
+                rows = self.read_segment(path)
+            except (OSError, ValueError) as e:
+                logging.error(f"Not merging unreadable archive segment {path}: {e}")
+                continue
+            for row in rows:
+                rows_by_id[row['id']] = row
+            merged_paths.append(path)
+        
+        if len(merged_paths) < 2:
+            return 0
+        
+        columns = {}
+        for row in rows_by_id.values():
+            columns.update(dict.fromkeys(row))
+        rows = [{column: row.get(column) for column in columns} for row in rows_by_id.values()]
+        merged_path = self._write_segment(day, rows)
+        for path in merged_paths:
+            if path != merged_path:
+                os.remove(path)
+        
+        logging.info(f"Merged {len(merged_paths)} archive segments of {day} ({len(rows)} rows)")
+        return len(merged_paths)
+    
+    def _write_segment(self, day: str, rows: List[Dict]) -> str:
+        """Encode rows column by column and publish the segment atomically, return its path"""
+        rows.sort(key=lambda r: r['published_ts'], reverse=True)
+        columns = list(rows[0].keys())
+        
+        # Naming the segment after its row ids makes re-archiving the same
+        # rows (e.g. after a crash before the hot delete) idempotent
+        digest = hashlib.sha1('|'.join(sorted(str(r['id']) for r in rows)).encode()).hexdigest()[:16]
+        day_dir = os.path.join(self.archive_dir, day)
+        os.makedirs(day_dir, exist_ok=True)
+        path = os.path.join(day_dir, f'segment-{digest}.seg')
+        tmp_path = path + '.tmp'
+        
+        footer = {'rows': len(rows), 'columns': {}, 'stats': {}}
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC)
+            for column in columns:
+                values = [r.get(column) for r in rows]
+                if column in DICTIONARY_COLUMNS:
+                    dictionary = sorted({v for v in values if v is not None})
+                    codes = {v: i for i, v in enumerate(dictionary)}
+                    payload = {'dict': dictionary, 'codes': [codes.get(v, -1) for v in values]}
+                    footer['stats'][column] = dictionary
+                    encoding = 'dict'
+                else:
+                    payload = values
+                    encoding = 'plain'
+                
+                block = zlib.compress(json.dumps(payload, default=str).encode(), 9)
+                footer['columns'][column] = [f.tell(), len(block), encoding]
+                f.write(block)
+            
+            footer['stats']['published_ts'] = [rows[-1]['published_ts'], rows[0]['published_ts']]
+            footer_bytes = json.dumps(footer).encode()
+            f.write(footer_bytes)
+            f.write(FOOTER_TAIL.pack(len(footer_bytes)))
+            f.write(MAGIC)
+            f.flush()
+            os.fsync(f.fileno())
+        
+        os.replace(tmp_path, path)
+        return path
+    
+    def _read_footer(self, f) -> Dict:
+        """Read a segment footer without touching any column block"""
+        f.seek(-(FOOTER_TAIL.size + len(MAGIC)), os.SEEK_END)
+        footer_length = FOOTER_TAIL.unpack(f.read(FOOTER_TAIL.size))[0]
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not an archive segment: {f.name}")
+        f.seek(-(FOOTER_TAIL.size + len(MAGIC) + footer_length), os.SEEK_END)
+        return json.loads(f.read(footer_length))
+    
+    def _read_column(self, f, footer: Dict, column: str) -> List:
+        """Decompress and decode one column block"""
+        offset, length, encoding = footer['columns'][column]
+        f.seek(offset)
+        payload = json.loads(zlib.decompress(f.read(length)))
+        if encoding == 'dict':
+            dictionary = payload['dict']
+            return [dictionary[c] if c >= 0 else None for c in payload['codes']]
+        return payload
+    
+    def query(self,
+              start: Optional[datetime] = None,
+              end: Optional[datetime] = None,
+              source: Optional[str] = None,
+              category: Optional[str] = None,
+              limit: Optional[int] = None,
+              columns: Optional[List[str]] = None) -> List[Dict]:
+        """Scan archived articles newest first, pushing date/source/category filters down"""
+        start_ts = int(parse_published_date(start).timestamp()) if start else None
+        end_ts = int(parse_published_date(end).timestamp()) if end else None
+        start_day = parse_published_date(start).strftime('%Y%m%d') if start else None
+        end_day = parse_published_date(end).strftime('%Y%m%d') if end else None
+        
+        results = []
+        for day in self.list_days():
+            # Day directories prune the date range before any file is opened
+            if (start_day and day < start_day) or (end_day and day > end_day):
+                continue
+            
+            day_rows = []
+            for path in self.list_segments(day):
+                try:
+                    day_rows.extend(self._scan_segment(path, start_ts, end_ts, source, category, columns))
+                except (OSError, ValueError) as e:
+                    # One bad file must not hide the rest of the archive
+                    logging.error(f"Skipping unreadable archive segment {path}: {e}")
+            
+            day_rows.sort(key=lambda r: r['published_ts'], reverse=True)
+            results.extend(day_rows)
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+        
+        return results
+    
+    def read_segment(self, path: str, columns: Optional[List[str]] = None) -> List[Dict]:
+        """Read every row of one segment (optionally only some columns); ValueError if it is corrupt"""
+        return self._scan_segment(path, None, None, None, None, columns)
+    
+    def _scan_segment(self, path, start_ts, end_ts, source, category, columns) -> List[Dict]:
+        """Return matching rows of one segment, skipping it early via footer stats"""
+        with open(path, 'rb') as f:
+            try:
+                footer = self._read_footer(f)
+                stats = footer['stats']
+                
+                min_ts, max_ts = stats['published_ts']
+                if (start_ts is not None and max_ts < start_ts) or (end_ts is not None and min_ts > end_ts):
+                    return []
+                if source and source not in stats.get('source', []):
+                    return []
+                if category and category not in stats.get('category', []):
+                    return []
+                
+                # Decode only the filter columns to find matching rows
+                published = self._read_column(f, footer, 'published_ts')
+                matches = range(footer['rows'])
+                if start_ts is not None or end_ts is not None:
+                    matches = [i for i in matches
+                               if (start_ts is None or published[i] >= start_ts)
+                               and (end_ts is None or published[i] <= end_ts)]
+                for column, value in (('source', source), ('category', category)):
+                    if value:
+                        values = self._read_column(f, footer, column)
+                        matches = [i for i in matches if values[i] == value]
+                
+                if not matches:
+                    return []
+                
+                wanted = [c for c in (columns or footer['columns']) if c in footer['columns']]
+                if 'published_ts' not in wanted:
+                    wanted.append('published_ts')
+                decoded = {c: published if c == 'published_ts' else self._read_column(f, footer, c)
+                           for c in wanted}
+                return [{c: decoded[c][i] for c in wanted} for i in matches]
+            except DECODE_ERRORS as e:
+                raise ValueError(f"Corrupt archive segment {path}: {e!r}") from e
@@ -0,0 +1,102 @@
+import html
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Cards rendered per page; only one page of cards is sent to the browser
+PAGE_SIZE = 50
+
+# Badges for articles published within the last hour / two hours
+HOT_BADGE = ' <span style="background: #EF4444; color: white; padding: 0.2rem 0.4rem; border-radius: 10px; font-size: 0.7rem; font-weight: bold;">🔥 HOT</span>'
+NEW_BADGE = ' <span style="background: #F59E0B; color: white; padding: 0.2rem 0.4rem; border-radius: 10px; font-size: 0.7rem; font-weight: bold;">✨ NEW</span>'
+
+def published_datetime(published_date) -> Optional[datetime]:
+    """published_date (ISO string or datetime) as a datetime, None if missing or unparseable"""
+    if not published_date:
+        return None
+    if not isinstance(published_date, str):
+        return published_date
+    try:
+        return datetime.fromisoformat(published_date.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+def hours_since(published_date) -> Optional[float]:
+    """Hours since publication (None if unknown)"""
+    pub_date = published_datetime(published_date)
+    if pub_date is None:
+        return None
+    now = datetime.now(pub_date.tzinfo) if pub_date.tzinfo else datetime.now()
+    return (now - pub_date).total_seconds() / 3600
+
+def format_time_ago(published_date, precise: bool = False) -> str:
+    """Format time ago string (`precise` adds minutes to hours under 12)"""
+    hours = hours_since(published_date)
+    if hours is None:
+        return "Unknown time"
+    
+    total_minutes = hours * 60
+    days = int(hours // 24)
+    if days > 0:
+        return f"{days} day{'s' if days > 1 else ''} ago"
+    elif total_minutes >= 60:
+        whole_hours = int(total_minutes // 60)
+        remaining_minutes = int(total_minutes % 60)
+        if precise and remaining_minutes > 0 and whole_hours < 12:
+            return f"{whole_hours}h {remaining_minutes}m ago"
+        return f"{whole_hours} hour{'s' if whole_hours > 1 else ''} ago"
+    elif total_minutes >= 1:
+        minutes = int(total_minutes)
+        return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
+    else:
+        return "Just now"
+
+def html_text(value) -> str:
+    """Escaped text on one line (a blank line would end the HTML block in markdown)"""
+    return html.escape(' '.join(str(value or '').split()))
+
+def html_url(url) -> str:
+    """Escaped link target; anything but http(s) becomes a dead link"""
+    url = (url or '').strip()
+    return html.escape(url) if url.lower().startswith(('http://', 'https://')) else '#'
+
+def paginate(articles: List[Dict], page: int, page_size: int = PAGE_SIZE) -> Tuple[List[Dict], int]:
+    """The articles on 1-based `page` (clamped to the pages there are) and the page count"""
+    pages = max(1, -(-len(articles) // page_size))
+    page = min(max(page, 1), pages)
+    return articles[(page - 1) * page_size:page * page_size], pages
+
+def render_articles(articles: List[Dict], badges: bool = False, precise_times: bool = False) -> str:
+    """The article cards as one HTML block, built from escaped fields.
+    
+    Callers pass one page (see `paginate`): every card given is sent and
+    built into the DOM. The `content-visibility: auto` card style only
+    lets the browser skip layout and paint of the off-screen ones.
+    """
+    cards = []
+    for article in articles:
+        fresh_indicator = ''
+        card_class = "article-card"
+        if badges:
+            # Flag very fresh articles (under 2 hours)
+            hours = hours_since(article.get('published_date'))
+            is_fresh = hours is not None and hours <= 1
+            fresh_indicator = HOT_BADGE if is_fresh else NEW_BADGE if hours is not None and hours <= 2 else ''
+            if is_fresh:
+                card_class += " fresh-article"
+        
+        description = ''
+        if article.get('snippet'):
+            description = f'<div class="article-description">{html_text(article["snippet"])}</div>'
+        cards.append(
+            f'<div class="{card_class}">'
+            f'<div class="article-title">{html_text(article["title"])}{fresh_indicator}</div>'
+            f'<div class="article-meta">'
+            f'<span class="article-source">{html_text(article["source"])}</span> • '
+            f'{html_text(format_time_ago(article.get("published_date"), precise_times))} • '
+            f'<span class="article-category">{html_text(article.get("category") or "Uncategorized")}</span>'
+            f'</div>'
+            f'{description}'
+            f'<a href="{html_url(article["url"])}" target="_blank" rel="noopener" class="read-more-btn">Read Full Article →</a>'
+            f'</div>'
+        )
+    return f'<div class="article-list">{"".join(cards)}</div>'
@@ -0,0 +1,90 @@
+import sqlite3
+from typing import Dict, List, Optional, Union
+
+# Scores (0..1, relative to the article's best category) are stored as one
+# byte each: 0..SCORE_LEVELS
+SCORE_LEVELS = 255
+
+# Minimum score for the dashboards' opt-in multi-label category filter:
+# categories at least half as strong as the article's best one. Scores are
+# relative keyword counts, so one incidental match in a short article can
+# reach it; the dashboards filter by primary category unless asked
+DEFAULT_MIN_SCORE = 0.5
+
+CATEGORY_SCORE_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS article_category_scores (
+        category_id INTEGER NOT NULL,
+        score INTEGER NOT NULL,
+        article_id {key_type} NOT NULL,
+        published_ts INTEGER,
+        PRIMARY KEY (category_id, score, article_id)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_article_category_scores_published_ts ON article_category_scores(published_ts)',
+    'CREATE INDEX IF NOT EXISTS idx_article_category_scores_article_id ON article_category_scores(article_id)'
+]
+
+def score_level(score: float) -> int:
+    """Stored byte value of a 0..1 score"""
+    return min(max(round(score * SCORE_LEVELS), 0), SCORE_LEVELS)
+
+def pack_scores(levels: Dict[int, int]) -> Optional[bytes]:
+    """Pack category id -> level into bytes, byte i holding category id i + 1 (None if all zero)"""
+    levels = {category_id: level for category_id, level in levels.items() if level}
+    if not levels:
+        return None
+    packed = bytearray(max(levels))
+    for category_id, level in levels.items():
+        packed[category_id - 1] = level
+    return bytes(packed)
+
+def unpack_scores(packed: Optional[bytes]) -> Dict[int, int]:
+    """Category id -> level of the nonzero scores in a packed value"""
+    return {i + 1: level for i, level in enumerate(packed or b'') if level}
+
+class CategoryScoreIndex:
+    """Index of (category, score) -> article, for multi-label category filters.
+    
+    Every article row carries its scores packed in `category_scores`; this
+    table holds one row per nonzero score, so "category X scoring at least
+    t" is a range scan of the primary key rather than a scan of the
+    articles. Like the near-duplicate index it is one table per database
+    file (shared by all partitions) and is pruned by published_ts.
+    """
+    
+    def init_tables(self, conn: sqlite3.Connection, key_type: str = 'TEXT'):
+        """Create the index table, keyed like the articles table"""
+        for statement in CATEGORY_SCORE_TABLES:
+            conn.execute(statement.format(key_type=key_type))
+    
+    def add(self, conn: sqlite3.Connection, article_id: Union[str, int], published_ts: Optional[int],
+            packed: Optional[bytes]):
+        """Index the packed scores of an article"""
+        conn.executemany(
+            'INSERT OR REPLACE INTO article_category_scores (category_id, score, article_id, published_ts) '
+            'VALUES (?, ?, ?, ?)',
+            [(category_id, level, article_id, published_ts) for category_id, level in unpack_scores(packed).items()]
+        )
+    
+    def remove(self, conn: sqlite3.Connection, article_ids: List[Union[str, int]]):
+        """Drop articles from the index"""
+        conn.executemany('DELETE FROM article_category_scores WHERE article_id = ?',
+                         [(article_id,) for article_id in article_ids])
+    
+    def prune(self, conn: sqlite3.Connection, cutoff_ts: int) -> int:
+        """Drop articles published before `cutoff_ts`, return the rows removed"""
+        return conn.execute('DELETE FROM article_category_scores WHERE published_ts < ?', (cutoff_ts,)).rowcount
+    
+    def backfill(self, conn: sqlite3.Connection, table: str):
+        """Index the rows of `table` scored before multi-label scores existed: their category at full score"""
+        conn.execute(f'''
+            INSERT OR IGNORE INTO article_category_scores (category_id, score, article_id, published_ts)
+            SELECT category_id, {SCORE_LEVELS}, id, published_ts FROM {table}
+            WHERE category_id IS NOT NULL AND category_scores IS NULL
+        ''')
+    
+    def filter_sql(self, column: str = 'a.id') -> str:
+        """WHERE condition matching articles scoring at least ? in the category named ?"""
+        return (f"{column} IN (SELECT article_id FROM article_category_scores "
+                "WHERE category_id = (SELECT id FROM categories WHERE name = ?) AND score >= ?)")
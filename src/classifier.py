@@ -1,8 +1,80 @@
-import re
-from typing import Dict, Optional
+import json
+import time
+import hashlib
+import threading
+from itertools import chain
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+from src.keyword_matcher import KeywordMatcher
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Substrings tried in order when no keyword matches as a whole word
+FALLBACK_KEYWORDS = {
+    'Fashion Business': ['business', 'financial', 'earnings', 'revenue'],
+    'Beauty': ['beauty', 'makeup', 'skincare'],
+    'Luxury': ['luxury', 'haute', 'premium'],
+    'E-commerce': ['ecommerce', 'online', 'digital'],
+    'Retail': ['retail', 'store', 'shopping'],
+}
+
+DEFAULT_CATEGORY = 'Fashion Trends'
+
+def top_category(category_scores: Dict[str, float]) -> str:
+    """Best category of a score dict (the first of tied ones)"""
+    return max(category_scores, key=category_scores.get)
+
+class ClassificationCache:
+    """Bounded LRU cache of classification results whose entries expire after `ttl` seconds"""
+    
+    def __init__(self, max_entries: int = 20000, ttl: float = 86400.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def get(self, key: Hashable) -> Optional[Dict[str, float]]:
+        """Cached category scores for `key`, or None (counted as a miss)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key: Hashable, category_scores: Dict[str, float]):
+        """Store a result, evicting the least recently used entries beyond `max_entries`"""
+        with self.lock:
+            self.entries[key] = (category_scores, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def stats(self) -> Dict:
+        """Entry count, hits, misses and hit rate since creation"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
 
 class ContentClassifier:
-    def __init__(self):
+    def __init__(self, cache_size: int = 20000, cache_ttl: float = 86400.0):
         # Keywords for different categories
         self.category_keywords = {
             'Fashion Business': [
@@ -63,22 +135,120 @@ class ContentClassifier:
             ]
         }
         
-        # Compile regex patterns for efficiency
-        self.category_patterns = {}
-        for category, keywords in self.category_keywords.items():
-            pattern = r'\b(?:' + '|'.join(re.escape(keyword) for keyword in keywords) + r')\b'
-            self.category_patterns[category] = re.compile(pattern, re.IGNORECASE)
-    
-    def classify_article(self, title: str, description: str = '') -> str:
-        """Classify article based on title and description"""
+        # Results keyed by (version, content hash); a keyword change moves
+        # to a new version, so stale entries are never served
+        self.cache = ClassificationCache(cache_size, cache_ttl) if cache_size else None
+        self.build_matcher()
+    
+    def build_matcher(self):
+        """Compile the keyword automaton and the keyword x category weight matrix"""
+        # Stable across processes: a digest of everything that decides a result
+        config = json.dumps([self.category_keywords, FALLBACK_KEYWORDS, DEFAULT_CATEGORY])
+        self.version = hashlib.blake2b(config.encode(), digest_size=6).hexdigest()
+        
+        # One automaton for every category's keywords and the fallback words
+        self.matcher = KeywordMatcher(self.category_keywords, FALLBACK_KEYWORDS)
+        
+        # Each whole-word keyword scores 1 for its category; fallback
+        # substrings score nothing
+        self.keyword_weights = None
+        if NUMPY_AVAILABLE:
+            categories = self.matcher.categories
+            self.keyword_weights = np.zeros((len(self.matcher.patterns), len(categories)))
+            for pattern_id, (group, _, whole_word) in enumerate(self.matcher.patterns):
+                if whole_word:
+                    self.keyword_weights[pattern_id, categories.index(group)] = 1.0
+    
+    def classify_article(self, title: str, description: str = '', content_hash: Optional[Hashable] = None) -> str:
+        """Classify article based on title and description (cached under `content_hash`, if given)"""
+        return top_category(self.score_article(title, description, content_hash))
+    
+    def score_article(self, title: str, description: str = '',
+                      content_hash: Optional[Hashable] = None) -> Dict[str, float]:
+        """Score of every category, relative to the best one (which scores 1.0).
+        
+        Articles about several things score high in several categories, e.g.
+        a luxury house's earnings in both Luxury and Fashion Business.
+        """
+        if content_hash is not None and self.cache is not None:
+            category_scores = self.cache.get((self.version, content_hash))
+            if category_scores is not None:
+                return category_scores
+        
+        category_scores = self.score_uncached(title, description)
+        if content_hash is not None and self.cache is not None:
+            self.cache.put((self.version, content_hash), category_scores)
+        return category_scores
+    
+    def classify_uncached(self, title: str, description: Optional[str]) -> str:
+        """Classify one article, bypassing the cache"""
+        return top_category(self.score_uncached(title, description))
+    
+    def score_uncached(self, title: str, description: Optional[str]) -> Dict[str, float]:
+        """Score one article by its keyword counts, bypassing the cache"""
         text = f"{title} {description or ''}"
         
-        category_scores = {}
+        category_counts, fallback = self.matcher.scan(text)
+        return self.relative_scores(category_counts, fallback)
+    
+    def classify_many(self, texts: Iterable[Tuple[str, str]],
+                      content_hashes: Optional[Iterable[Hashable]] = None) -> List[str]:
+        """Classify a batch of (title, description) pairs, same results as classify_article"""
+        return [top_category(category_scores) for category_scores in self.score_many(texts, content_hashes)]
+    
+    def score_many(self, texts: Iterable[Tuple[str, str]],
+                   content_hashes: Optional[Iterable[Hashable]] = None) -> List[Dict[str, float]]:
+        """Score a batch of (title, description) pairs, same results as score_article.
+        
+        With `content_hashes` (from ArticleDatabase.generate_content_hash),
+        cached results are reused and only the rest are scored.
+        """
+        texts = list(texts)
+        if content_hashes is None or self.cache is None:
+            return self.score_batch(texts)
+        
+        keys = [(self.version, content_hash) for content_hash in content_hashes]
+        results = [self.cache.get(key) for key in keys]
+        misses = [i for i, category_scores in enumerate(results) if category_scores is None]
+        for i, category_scores in zip(misses, self.score_batch([texts[i] for i in misses])):
+            results[i] = category_scores
+            self.cache.put(keys[i], category_scores)
+        return results
+    
+    def score_batch(self, texts: List[Tuple[str, str]]) -> List[Dict[str, float]]:
+        """Score a batch without the cache.
+        
+        Each text is tokenized into keyword ids by one automaton pass; the
+        batch is then scored at once as a sparse document x keyword count
+        matrix times the keyword x category weight matrix (NumPy, if installed).
+        """
+        matched = [self.matcher.match(f"{title} {description or ''}") for title, description in texts]
+        if not matched:
+            return []
+        if not NUMPY_AVAILABLE:
+            return [self.relative_scores(self.matcher.category_counts(ids), fallback) for ids, fallback in matched]
         
-        for category, pattern in self.category_patterns.items():
-            matches = pattern.findall(text)
-            category_scores[category] = len(matches)
+        categories = self.matcher.categories
+        rows = np.repeat(np.arange(len(matched)), [len(ids) for ids, _ in matched])
+        cols = np.fromiter(chain.from_iterable(ids for ids, _ in matched), dtype=np.intp, count=len(rows))
+        scores = np.zeros((len(matched), len(categories)))
+        np.add.at(scores, rows, self.keyword_weights[cols])
         
+        top = scores.max(axis=1, keepdims=True)
+        relative = (scores / np.where(top > 0, top, 1)).tolist()
+        return [dict(zip(categories, row)) if t > 0 else self.relative_scores({}, fallback)
+                for row, t, (_, fallback) in zip(relative, top[:, 0].tolist(), matched)]
+    
+    def relative_scores(self, category_counts: Dict[str, int], fallback: Set[str]) -> Dict[str, float]:
+        """Scores for match counts: each count over the highest, or the fallback category alone at 1.0"""
+        top = max(category_counts.values(), default=0)
+        if top > 0:
+            return {category: count / top for category, count in category_counts.items()}
+        chosen = self.choose_category({}, fallback)
+        return {category: float(category == chosen) for category in self.matcher.categories}
+    
+    def choose_category(self, category_scores: Dict[str, int], fallback: Set[str]) -> str:
+        """Category for match counts and the fallback words found"""
         # Return category with highest score
         if category_scores:
             best_category = max(category_scores, key=category_scores.get)
@@ -86,20 +256,10 @@ class ContentClassifier:
                 return best_category
         
         # Fallback: simple heuristics based on source patterns
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['business', 'financial', 'earnings', 'revenue']):
-            return 'Fashion Business'
-        elif any(word in text_lower for word in ['beauty', 'makeup', 'skincare']):
-            return 'Beauty'
-        elif any(word in text_lower for word in ['luxury', 'haute', 'premium']):
-            return 'Luxury'
-        elif any(word in text_lower for word in ['ecommerce', 'online', 'digital']):
-            return 'E-commerce'
-        elif any(word in text_lower for word in ['retail', 'store', 'shopping']):
-            return 'Retail'
-        else:
-            return 'Fashion Trends'  # Default category
+        for category in FALLBACK_KEYWORDS:
+            if category in fallback:
+                return category
+        return DEFAULT_CATEGORY
     
     def get_categories(self) -> list:
         """Get list of available categories"""
@@ -109,6 +269,5 @@ class ContentClassifier:
         """Add keywords to existing category"""
         if category in self.category_keywords:
             self.category_keywords[category].extend(keywords)
-            # Recompile pattern
-            pattern = r'\b(?:' + '|'.join(re.escape(keyword) for keyword in self.category_keywords[category]) + r')\b'
-            self.category_patterns[category] = re.compile(pattern, re.IGNORECASE)
\ No newline at end of file
+            # Rebuild the automaton
+            self.build_matcher()
\ No newline at end of file
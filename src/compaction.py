@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from typing import Dict, Optional
+
+# PRAGMA auto_vacuum values
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+def storage_metrics(conn: sqlite3.Connection) -> Dict:
+    """Size and fragmentation of a database: page counts, free pages and the auto_vacuum mode"""
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    freelist_count = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+    
+    return {
+        'page_size': page_size,
+        'page_count': page_count,
+        'freelist_count': freelist_count,
+        'size_bytes': page_size * page_count,
+        'free_bytes': page_size * freelist_count,
+        'free_fraction': round(freelist_count / page_count, 4) if page_count else 0.0,
+        'auto_vacuum': AUTO_VACUUM_MODES.get(auto_vacuum, str(auto_vacuum))
+    }
+
+class Compactor:
+    """Hands free pages of an article database back to the OS in small steps.
+    
+    Deletes (retention cleanup, dropped partitions) leave pages on SQLite's
+    freelist and the file never shrinks. With `auto_vacuum = INCREMENTAL`,
+    which new databases get from ArticleDatabase, each `step()` moves up to
+    `pages_per_step` pages off the end of the file in its own short write
+    transaction; `compact()` repeats steps, pausing between them so readers
+    and the writer interleave, until the freelist is empty or its time
+    budget is spent. Nothing ever rewrites the whole file the way VACUUM does.
+    """
+    
+    def __init__(self, db_path: str, pages_per_step: int = 256, max_seconds: float = 2.0,
+                 pause: float = 0.05, metrics_path: Optional[str] = None):
+        self.db_path = db_path
+        self.pages_per_step = pages_per_step
+        self.max_seconds = max_seconds
+        self.pause = pause
+        self.metrics_path = metrics_path
+        self._warned = False
+    
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+    
+    def metrics(self) -> Dict:
+        """Current size and fragmentation metrics of the database"""
+        conn = self.connect()
+        metrics = storage_metrics(conn)
+        conn.close()
+        return metrics
+    
+    def enable_incremental(self) -> Dict:
+        """Switch an existing database to incremental auto-vacuum (one full VACUUM), return its metrics.
+        
+        Run this once, off-peak: it rewrites the whole file and blocks other
+        connections until it finishes.
+        """
+        conn = self.connect()
+        if storage_metrics(conn)['auto_vacuum'] != 'incremental':
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+            logging.info(f"Enabled incremental auto-vacuum on {self.db_path}")
+        metrics = storage_metrics(conn)
+        conn.close()
+        return metrics
+    
+    def step(self) -> int:
+        """Reclaim up to `pages_per_step` free pages, return how many were reclaimed"""
+        conn = self.connect()
+        before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if before:
+            # executescript steps the pragma to completion; execute() would
+            # free a single page per call
+            conn.executescript(f'PRAGMA incremental_vacuum({self.pages_per_step});')
+        after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        conn.close()
+        return before - after
+    
+    def compact(self) -> Dict:
+        """Reclaim free pages in bounded steps within the time budget, return the metrics afterwards"""
+        metrics = self.metrics()
+        if metrics['auto_vacuum'] != 'incremental':
+            if metrics['freelist_count'] and not self._warned:
+                logging.warning(f"{self.db_path} has {metrics['freelist_count']} free pages but no incremental "
+                                f"auto-vacuum; run `python -m src.compaction {self.db_path} --enable` once")
+                self._warned = True
+            return self.write_metrics(metrics)
+        
+        reclaimed = 0
+        deadline = time.monotonic() + self.max_seconds
+        while time.monotonic() < deadline:
+            try:
+                pages = self.step()
+            except sqlite3.OperationalError as e:
+                # Busy with the writer or a reader; try again next round
+                logging.error(f"Error compacting {self.db_path}: {e}")
+                break
+            reclaimed += pages
+            if pages < self.pages_per_step:
+                break
+            time.sleep(self.pause)
+        
+        metrics = self.metrics()
+        metrics['reclaimed_pages'] = reclaimed
+        if reclaimed:
+            logging.info(f"Reclaimed {reclaimed} pages from {self.db_path} "
+                         f"({metrics['freelist_count']} free of {metrics['page_count']})")
+        return self.write_metrics(metrics)
+    
+    def write_metrics(self, metrics: Dict) -> Dict:
+        """Write metrics to `metrics_path` (if set) for monitoring"""
+        if self.metrics_path:
+            tmp_path = f"{self.metrics_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(metrics, f)
+            os.replace(tmp_path, self.metrics_path)
+        return metrics
+    
+    def run(self, interval: float = 60.0, stop_event: Optional[threading.Event] = None):
+        """Compact every `interval` seconds until `stop_event` is set"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.compact()
+            except Exception as e:
+                logging.error(f"Error compacting {self.db_path}: {e}")
+            stop_event.wait(interval)
+
+def main():
+    """Report, enable or run incremental compaction of an article database"""
+    parser = argparse.ArgumentParser(description="Reclaim free pages of an article database in small steps")
+    parser.add_argument('db_path', nargs='?', default='articles.db')
+    parser.add_argument('--enable', action='store_true', help="switch an existing file to incremental auto-vacuum (full VACUUM)")
+    parser.add_argument('--loop', type=float, metavar='SECONDS', help="keep compacting at this interval")
+    parser.add_argument('--pages-per-step', type=int, default=256)
+    parser.add_argument('--max-seconds', type=float, default=2.0)
+    parser.add_argument('--metrics-path')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    compactor = Compactor(args.db_path, args.pages_per_step, args.max_seconds, metrics_path=args.metrics_path)
+    if args.enable:
+        compactor.enable_incremental()
+    if args.loop:
+        compactor.run(args.loop)
+    else:
+        print(json.dumps(compactor.compact(), indent=2))
+
+if __name__ == "__main__":
+    main()
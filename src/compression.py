@@ -0,0 +1,148 @@
+import re
+import zlib
+import struct
+import sqlite3
+from collections import Counter
+from typing import Dict, Iterable, Optional, Union
+
+# zlib preset dictionaries only help within the 32 KB deflate window
+DICTIONARY_SIZE = 32768
+
+# Shorter text is stored as is; header and deflate overhead eat the savings
+MIN_LENGTH = 64
+
+# Descriptions a dictionary is trained on (at least MIN_TRAINING_SAMPLES)
+TRAINING_SAMPLES = 2000
+MIN_TRAINING_SAMPLES = 100
+
+# Compressed values are BLOBs: dictionary id (0 = none) then raw deflate
+HEADER = struct.Struct('>H')
+
+# Dictionary fragments: tags and entities, and runs of up to NGRAM words
+# of the text between tags
+MARKUP_RE = re.compile(r'<[^<>]{1,300}>|&#?\w+;')
+TAG_RE = re.compile(r'<[^<>]*>')
+WORD_RE = re.compile(r'[^\s<>]+')
+NGRAM = 3
+
+TEXT_DICTIONARIES_SQL = '''
+    CREATE TABLE IF NOT EXISTS text_dictionaries (
+        id INTEGER PRIMARY KEY,
+        dictionary BLOB NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+def fragments(text: str) -> set:
+    """Distinct dictionary candidates in one text"""
+    found = set(MARKUP_RE.findall(text))
+    for segment in TAG_RE.split(text):
+        words = WORD_RE.findall(segment)
+        for n in range(1, NGRAM + 1):
+            for i in range(len(words) - n + 1):
+                found.add(' '.join(words[i:i + n]) + ' ')
+    return found
+
+def train_dictionary(samples: Iterable[str], size: int = DICTIONARY_SIZE) -> bytes:
+    """Build a zlib preset dictionary from the fragments that recur across `samples`.
+    
+    Fragments are scored by how many samples contain them times their
+    length; the best ones go last, where deflate reaches them with the
+    shortest back-references.
+    """
+    samples = list(samples)
+    counts = Counter()
+    for text in samples:
+        counts.update(fragments(text))
+    
+    min_count = max(2, len(samples) // 100)
+    scored = sorted(
+        ((count * len(fragment), fragment) for fragment, count in counts.items() if count >= min_count),
+        reverse=True
+    )
+    
+    chosen, total = [], 0
+    for score, fragment in scored:
+        data = fragment.encode()
+        if total + len(data) <= size:
+            chosen.append(data)
+            total += len(data)
+    
+    return b''.join(reversed(chosen))
+
+class TextCompressor:
+    """Stores large text values as zlib BLOBs compressed with a trained dictionary.
+    
+    Dictionaries live in the `text_dictionaries` table and never change once
+    written, so each value names the dictionary it was compressed with and
+    retraining only affects new rows. Text below `min_length`, or text that
+    does not get smaller, is stored unchanged; readers tell the two apart
+    by type (str vs bytes).
+    """
+    
+    def __init__(self, level: int = 9, min_length: int = MIN_LENGTH):
+        self.level = level
+        self.min_length = min_length
+        self.dictionaries: Dict[int, bytes] = {0: b''}
+        self.current_id = 0
+        self.loaded = False
+    
+    def init_tables(self, conn: sqlite3.Connection):
+        """Create the dictionary table"""
+        conn.execute(TEXT_DICTIONARIES_SQL)
+    
+    def load(self, conn: sqlite3.Connection):
+        """Load the stored dictionaries; the newest one compresses new values"""
+        for dictionary_id, dictionary in conn.execute('SELECT id, dictionary FROM text_dictionaries ORDER BY id'):
+            self.dictionaries[dictionary_id] = dictionary
+            self.current_id = dictionary_id
+        self.loaded = True
+    
+    def train(self, conn: sqlite3.Connection, samples: Iterable[str]) -> int:
+        """Train and store a new dictionary from `samples`, return its id"""
+        dictionary = train_dictionary(samples)
+        if dictionary:
+            cursor = conn.execute('INSERT INTO text_dictionaries (dictionary) VALUES (?)', (dictionary,))
+            self.dictionaries[cursor.lastrowid] = dictionary
+            self.current_id = cursor.lastrowid
+        return self.current_id
+    
+    def compress(self, text: Optional[str]) -> Union[str, bytes, None]:
+        """Compressed BLOB for large text, otherwise the text itself"""
+        if text is None or len(text) < self.min_length:
+            return text
+        
+        data = text.encode()
+        dictionary = self.dictionaries[self.current_id]
+        if dictionary:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=dictionary)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        packed = HEADER.pack(self.current_id) + compressor.compress(data) + compressor.flush()
+        return packed if len(packed) < len(data) else text
+    
+    def decompress(self, conn: sqlite3.Connection, value: Union[str, bytes, None],
+                   max_chars: Optional[int] = None) -> Optional[str]:
+        """Text of a stored value; with `max_chars`, only as much is inflated as that prefix needs"""
+        if not isinstance(value, bytes):
+            return value if max_chars is None or value is None else value[:max_chars]
+        
+        dictionary_id = HEADER.unpack_from(value)[0]
+        if dictionary_id not in self.dictionaries:
+            # Trained by another writer since we loaded
+            self.load(conn)
+        dictionary = self.dictionaries[dictionary_id]
+        
+        if dictionary:
+            decompressor = zlib.decompressobj(-15, zdict=dictionary)
+        else:
+            decompressor = zlib.decompressobj(-15)
+        
+        if max_chars is None:
+            data = decompressor.decompress(value[HEADER.size:]) + decompressor.flush()
+            return data.decode()
+        
+        # A character is at most 4 bytes of UTF-8; a cut multi-byte
+        # sequence at the end is dropped
+        data = decompressor.decompress(value[HEADER.size:], max_chars * 4)
+        return data.decode(errors='ignore')[:max_chars]
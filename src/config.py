@@ -0,0 +1,81 @@
+import os
+from dataclasses import dataclass, fields
+from typing import Mapping, Optional
+
+# Read snapshot the ingest side publishes and the dashboards serve
+DEFAULT_SNAPSHOT_PATH = "articles.snapshot.db"
+
+# Environment variable for each AggregatorConfig field
+ENV_VARS = {
+    'db_path': 'ARTICLES_DB_PATH',
+    'partitioned': 'ARTICLES_PARTITIONED',
+    'shards': 'ARTICLES_SHARDS',
+    'retention_days': 'ARTICLES_RETENTION_DAYS',
+    'archive_dir': 'ARTICLES_ARCHIVE_DIR',
+    'snapshot_path': 'ARTICLES_SNAPSHOT_PATH',
+    'in_memory_snapshot': 'ARTICLES_IN_MEMORY_SNAPSHOT',
+    'replication_dir': 'ARTICLES_REPLICATION_DIR',
+    'compress_descriptions': 'ARTICLES_COMPRESS_DESCRIPTIONS',
+    'classifier_model': 'ARTICLES_CLASSIFIER_MODEL',
+}
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+@dataclass(frozen=True)
+class AggregatorConfig:
+    """Storage, read snapshot, replication and classification options of a NewsAggregator.
+    
+    Entry points build one with `from_env()` (the dashboards, the CLI,
+    start.sh) so they all wire the aggregator the same way; library code and
+    tests construct it directly or override single fields on NewsAggregator.
+    """
+    db_path: str = "articles.db"
+    # One table per day, so retention drops whole tables
+    partitioned: bool = False
+    # Sources hashed over this many files, one writer each (0 or 1: one file)
+    shards: int = 0
+    retention_days: int = 5
+    # Expired articles move to a cold columnar archive here instead of being lost
+    archive_dir: Optional[str] = None
+    # Snapshot published after each ingest cycle for lock-free dashboard reads
+    snapshot_path: Optional[str] = None
+    in_memory_snapshot: bool = False
+    # Page-level changesets for replicas are shipped here after each cycle
+    replication_dir: Optional[str] = None
+    compress_descriptions: bool = False
+    # Trained naive Bayes model (see src/bayes_classifier.py)
+    classifier_model: Optional[str] = None
+    
+    def __post_init__(self):
+        if self.shards > 1 and (self.snapshot_path or self.replication_dir):
+            raise ValueError("Snapshots and replication need single-file storage; drop shards")
+    
+    @property
+    def sharded(self) -> bool:
+        """Whether articles are spread over several shard files"""
+        return self.shards > 1
+    
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None, **overrides) -> 'AggregatorConfig':
+        """Config from ARTICLES_* environment variables (unset or empty ones keep their defaults).
+        
+        Unlike the class defaults, the read snapshot is on by default, at
+        DEFAULT_SNAPSHOT_PATH, so ingest and dashboards meet at the same file.
+        """
+        environ = os.environ if environ is None else environ
+        values = {'snapshot_path': DEFAULT_SNAPSHOT_PATH}
+        for field in fields(cls):
+            value = environ.get(ENV_VARS[field.name])
+            if not value:
+                continue
+            if field.type is bool:
+                values[field.name] = value.strip().lower() in TRUE_VALUES
+            elif field.type is int:
+                try:
+                    values[field.name] = int(value)
+                except ValueError:
+                    raise ValueError(f"{ENV_VARS[field.name]} must be an integer, not {value!r}")
+            else:
+                values[field.name] = value
+        values.update(overrides)
+        return cls(**values)
@@ -1,30 +1,415 @@
 import sqlite3
 import hashlib
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import time
+import os
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Union
 import logging
+from src.seen_set import SeenSet
+from src.near_duplicates import NearDuplicateIndex, minhash
+from src.compression import TextCompressor, TRAINING_SAMPLES, MIN_TRAINING_SAMPLES
+from src.snippets import make_snippet
+from src.category_scores import CategoryScoreIndex, SCORE_LEVELS, score_level, pack_scores, unpack_scores
+from src.feed_tags import FeedTagIndex
+
+# Bumped whenever init_database needs to migrate an existing file
+SCHEMA_VERSION = 7
+
+# Formats for article keys (id, content_hash and the columns referencing
+# ids) and their column type. 'hex' is the original 32-character MD5 text;
+# 'int64' stores a 64-bit hash as an integer, so the key indexes hold 8-byte
+# keys. It is declared INT on purpose: INTEGER PRIMARY KEY would alias the
+# rowid and cluster the table by hash, scattering every insert
+KEY_FORMATS = {'hex': 'TEXT', 'int64': 'INT'}
+
+# An article id or content hash in either format
+ArticleKey = Union[str, int]
+
+# Format for new databases; existing ones keep theirs until migrated
+# with `python -m src.migrate_keys`
+DEFAULT_KEY_FORMAT = 'int64'
+
+# Column layout shared by the articles table and its daily partitions
+ARTICLE_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id {key_type} PRIMARY KEY,
+        title TEXT NOT NULL,
+        url TEXT NOT NULL UNIQUE,
+        description TEXT,
+        snippet TEXT,
+        published_date DATETIME,
+        published_ts INTEGER,
+        source_id INTEGER NOT NULL REFERENCES sources(id),
+        category_id INTEGER REFERENCES categories(id),
+        category_scores BLOB,
+        classifier_version TEXT,
+        content_hash {key_type} UNIQUE,
+        canonical_id {key_type},
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+ARTICLE_INDEXES_SQL = [
+    'CREATE INDEX IF NOT EXISTS idx_{table}_published_ts ON {table}(published_ts)',
+    'CREATE INDEX IF NOT EXISTS idx_{table}_source ON {table}(source_id)',
+    'CREATE INDEX IF NOT EXISTS idx_{table}_category ON {table}(category_id)',
+    'CREATE INDEX IF NOT EXISTS idx_{table}_canonical ON {table}(canonical_id) WHERE canonical_id IS NOT NULL'
+]
+
+# Explicit column order; tables migrated with ALTER TABLE have appended
+# columns, so views and copies must never rely on SELECT *
+ARTICLE_COLUMNS = [
+    'id', 'title', 'url', 'description', 'snippet', 'published_date', 'published_ts',
+    'source_id', 'category_id', 'category_scores', 'classifier_version', 'content_hash', 'canonical_id', 'created_at'
+]
+
+# Columns written by insert_article, in article_row() order
+INSERT_COLUMNS = ARTICLE_COLUMNS[:-1]
+
+INSERT_ARTICLE_SQL = (
+    'INSERT OR IGNORE INTO {table} (' + ', '.join(INSERT_COLUMNS) + ') '
+    'VALUES (' + ', '.join('?' for _ in INSERT_COLUMNS) + ')'
+)
+
+# Article fields as returned to callers, with the source and category names
+# joined back in place of their ids
+ARTICLE_FIELDS = [
+    {'source_id': 's.name AS source', 'category_id': 'c.name AS category'}.get(column, f'a.{column}')
+    for column in ARTICLE_COLUMNS
+]
+
+# Dimension tables holding the names behind the articles' integer
+# source_id/category_id columns (article column -> table)
+DIMENSION_TABLES = {'source': 'sources', 'category': 'categories'}
+
+CATEGORIES_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+'''
+
+def select_articles_sql(table: str, with_description: bool = True) -> str:
+    """SELECT of article rows from `table` (aliased `a`) in the shape callers get"""
+    fields = [f for f in ARTICLE_FIELDS if with_description or f != 'a.description']
+    # LEFT JOINs keep the articles table as the outer loop of the plan
+    return (f"SELECT {', '.join(fields)} FROM {table} a "
+            "LEFT JOIN sources s ON s.id = a.source_id LEFT JOIN categories c ON c.id = a.category_id")
+
+# Summary tables kept in step with an articles table by triggers, so
+# get_stats reads one row per group instead of scanning every article
+STATS_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS stats_by_category (
+        category_id INTEGER PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS stats_by_source (
+        source_id INTEGER PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS stats_by_hour (
+        hour_bucket INTEGER PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )
+    '''
+]
+
+# Epoch hour of a published_ts value (NULL when the date is missing)
+HOUR_BUCKET_SQL = "{col} / 3600"
+
+def _stats_delta_sql(row: str, delta: int) -> List[str]:
+    """Build statements applying +/-1 for one article row to the stats tables"""
+    bucket = HOUR_BUCKET_SQL.format(col=f'{row}.published_ts')
+    statements = []
+    for table, key, expr in (
+        ('stats_by_category', 'category_id', f'{row}.category_id'),
+        ('stats_by_source', 'source_id', f'{row}.source_id'),
+        ('stats_by_hour', 'hour_bucket', bucket),
+    ):
+        statements.append(
+            f'''INSERT INTO {table} ({key}, count) SELECT {expr}, {delta} WHERE {expr} IS NOT NULL
+               ON CONFLICT({key}) DO UPDATE SET count = count + ({delta})'''
+        )
+    if delta < 0:
+        statements.append('DELETE FROM stats_by_category WHERE count <= 0')
+        statements.append('DELETE FROM stats_by_source WHERE count <= 0')
+        statements.append('DELETE FROM stats_by_hour WHERE count <= 0')
+    return statements
+
+def create_stats_triggers(conn: sqlite3.Connection, table: str = 'articles'):
+    """(Re)create the triggers that maintain the stats tables for `table`"""
+    for event in ('insert', 'delete', 'update'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {table}_stats_{event}')
+    
+    conn.execute(f'''
+        CREATE TRIGGER {table}_stats_insert AFTER INSERT ON {table} BEGIN
+            {'; '.join(_stats_delta_sql('NEW', 1))};
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER {table}_stats_delete AFTER DELETE ON {table} BEGIN
+            {'; '.join(_stats_delta_sql('OLD', -1))};
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER {table}_stats_update
+        AFTER UPDATE OF category_id, source_id, published_ts ON {table} BEGIN
+            {'; '.join(_stats_delta_sql('OLD', -1) + _stats_delta_sql('NEW', 1))};
+        END
+    ''')
+
+def merge_table_stats(conn: sqlite3.Connection, table: str, sign: int = 1):
+    """Add (sign=1) or subtract (sign=-1) the grouped counts of `table` to the stats tables"""
+    for statement in (
+        f'''INSERT INTO stats_by_category (category_id, count)
+           SELECT category_id, {sign} * COUNT(*) FROM {table} WHERE category_id IS NOT NULL GROUP BY category_id
+           ON CONFLICT(category_id) DO UPDATE SET count = count + excluded.count''',
+        f'''INSERT INTO stats_by_source (source_id, count)
+           SELECT source_id, {sign} * COUNT(*) FROM {table} WHERE true GROUP BY source_id
+           ON CONFLICT(source_id) DO UPDATE SET count = count + excluded.count''',
+        f'''INSERT INTO stats_by_hour (hour_bucket, count)
+           SELECT {HOUR_BUCKET_SQL.format(col='published_ts')} AS bucket, {sign} * COUNT(*) FROM {table}
+           WHERE published_ts IS NOT NULL GROUP BY bucket
+           ON CONFLICT(hour_bucket) DO UPDATE SET count = count + excluded.count''',
+    ):
+        conn.execute(statement)
+    
+    if sign < 0:
+        for stats_table in ('stats_by_category', 'stats_by_source', 'stats_by_hour'):
+            conn.execute(f'DELETE FROM {stats_table} WHERE count <= 0')
+
+def rebuild_stats(conn: sqlite3.Connection, tables: Optional[List[str]] = None):
+    """Recompute the stats tables from scratch with one pass over `tables`"""
+    for stats_table in ('stats_by_category', 'stats_by_source', 'stats_by_hour'):
+        conn.execute(f'DELETE FROM {stats_table}')
+    
+    for table in (['articles'] if tables is None else tables):
+        merge_table_stats(conn, table)
+
+def parse_published_date(value) -> datetime:
+    """Normalize a stored or feed-supplied date to an aware UTC datetime"""
+    if value is None:
+        return datetime.now(timezone.utc)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def to_epoch(value) -> Optional[int]:
+    """Convert a published date to integer UTC epoch seconds (None stays None)"""
+    if value is None:
+        return None
+    return int(parse_published_date(value).timestamp())
+
+def hash_key(content: str, key_format: str, salt: int = 0) -> ArticleKey:
+    """Hash `content` to a key in `key_format`; a non-zero salt gives the fallback keys used on collision"""
+    if salt:
+        content = f"{content}|{salt}"
+    if key_format == 'hex':
+        return hashlib.md5(content.encode()).hexdigest()
+    return int.from_bytes(hashlib.blake2b(content.encode(), digest_size=8).digest(), 'big', signed=True)
+
+def detect_key_format(conn: sqlite3.Connection, table: str) -> Optional[str]:
+    """Key format of an existing articles table (None if there is no such table)"""
+    row = conn.execute("SELECT type FROM pragma_table_info(?) WHERE name = 'id'", (table,)).fetchone()
+    if row is None:
+        return None
+    return 'int64' if row[0].upper() in ('INT', 'INTEGER') else 'hex'
+
+def migrate_published_ts(conn: sqlite3.Connection, table: str):
+    """Add and backfill the integer published_ts column on a pre-epoch table"""
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    if 'published_ts' in columns:
+        return
+    
+    conn.execute(f'ALTER TABLE {table} ADD COLUMN published_ts INTEGER')
+    # strftime understands the stored "+00:00" offsets and normalizes to UTC
+    conn.execute(f"UPDATE {table} SET published_ts = CAST(strftime('%s', published_date) AS INTEGER)")
+    conn.execute(f'DROP INDEX IF EXISTS idx_{table}_published')
+
+def migrate_canonical_id(conn: sqlite3.Connection, table: str):
+    """Add the near-duplicate canonical_id column (and its index) to an older table"""
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    if 'canonical_id' not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN canonical_id TEXT')
+    conn.execute(ARTICLE_INDEXES_SQL[3].format(table=table))
+
+def migrate_snippet(conn: sqlite3.Connection, table: str, compressor: TextCompressor, batch_size: int = 5000):
+    """Add the plain-text snippet column to an older table and fill it from the descriptions"""
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    if 'snippet' in columns:
+        return
+    
+    conn.execute(f'ALTER TABLE {table} ADD COLUMN snippet TEXT')
+    last_rowid = -1
+    while True:
+        rows = conn.execute(
+            f'SELECT rowid, description FROM {table} WHERE rowid > ? AND description IS NOT NULL ORDER BY rowid LIMIT ?',
+            (last_rowid, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+        conn.executemany(
+            f'UPDATE {table} SET snippet = ? WHERE rowid = ?',
+            [(make_snippet(compressor.decompress(conn, description)), rowid) for rowid, description in rows]
+        )
+        last_rowid = rows[-1][0]
+
+def migrate_category_scores(conn: sqlite3.Connection, table: str):
+    """Add the packed per-category scores column to an older table (NULL: only its category is known)"""
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    if 'category_scores' not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN category_scores BLOB')
+
+def migrate_classifier_version(conn: sqlite3.Connection, table: str):
+    """Add the classifier version stamp to an older table (NULL: classified by an unknown version)"""
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    if 'classifier_version' not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN classifier_version TEXT')
+
+def migrate_stats_keys(conn: sqlite3.Connection):
+    """Drop stats tables keyed by source/category name; they are recreated by id and rebuilt"""
+    for table, column in (('stats_by_category', 'category'), ('stats_by_source', 'source')):
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+        if column in columns:
+            conn.execute(f'DROP TABLE {table}')
+    
+    # Their triggers name the old columns, and any of them would fail the
+    # schema check of the table renames in migrate_dimensions
+    triggers = conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name GLOB '*_stats_*'").fetchall()
+    for (trigger,) in triggers:
+        conn.execute(f'DROP TRIGGER {trigger}')
+
+def migrate_dimensions(conn: sqlite3.Connection, table: str, table_sql: str):
+    """Rebuild an older articles table with integer source_id/category_id instead of the names.
+    
+    The table's indexes and triggers are dropped with it; the caller
+    recreates them and rebuilds the stats.
+    """
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    if 'source_id' in columns:
+        return
+    
+    conn.execute(f"INSERT OR IGNORE INTO sources (name, url, active) SELECT DISTINCT source, '', 0 FROM {table}")
+    conn.execute(f"INSERT OR IGNORE INTO categories (name) SELECT DISTINCT category FROM {table} WHERE category IS NOT NULL")
+    
+    conn.execute(f'ALTER TABLE {table} RENAME TO {table}_names')
+    conn.execute(table_sql)
+    
+    selected = {'source_id': 's.id', 'category_id': 'c.id'}
+    conn.execute(f'''
+        INSERT INTO {table} ({', '.join(ARTICLE_COLUMNS)})
+        SELECT {', '.join(selected.get(column, f'o.{column}') for column in ARTICLE_COLUMNS)}
+        FROM {table}_names o
+        JOIN sources s ON s.name = o.source
+        LEFT JOIN categories c ON c.name = o.category
+    ''')
+    conn.execute(f'DROP TABLE {table}_names')
+
+def publish_snapshot(db_path: str, snapshot_path: str):
+    """Publish a consistent copy of `db_path` at `snapshot_path`.
+    
+    The copy is written next to `snapshot_path` with the SQLite backup API
+    and renamed into place, so readers see either the old or the new file.
+    """
+    tmp_path = f"{snapshot_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    conn = sqlite3.connect(db_path)
+    snapshot = sqlite3.connect(tmp_path)
+    conn.backup(snapshot)
+    snapshot.close()
+    conn.close()
+    
+    os.replace(tmp_path, snapshot_path)
+    logging.info(f"Published read snapshot {snapshot_path}")
 
 class ArticleDatabase:
-    def __init__(self, db_path: str = "articles.db"):
+    # False for a file holding only shared tables (a sharded database's
+    # catalog): no articles, stats, score, tag or dictionary tables
+    stores_articles = True
+    
+    def __init__(self, db_path: str = "articles.db", archive=None, near_duplicates: bool = True,
+                 key_format: Optional[str] = None, compress_descriptions: bool = False):
         self.db_path = db_path
+        # Detected from the file by init_database unless given
+        self.key_format = key_format
+        # Optional ArticleArchive receiving rows before retention deletes them
+        self.archive = archive
+        # Links syndicated copies of a story to the first one stored
+        self.near_duplicates = NearDuplicateIndex() if near_duplicates else None
+        # Per-category scores of every article, for multi-label filters
+        self.score_index = CategoryScoreIndex()
+        # Publisher tags of every article, for tag filters
+        self.tag_index = FeedTagIndex()
+        
+        # URLs already stored, loaded lazily by seen_urls()
+        self._seen = None
+        self._seen_lock = threading.Lock()
+        
+        # Source/category name -> id, filled in as articles are written
+        self._dimension_ids = {column: {} for column in DIMENSION_TABLES}
+        
+        # Large descriptions are stored zlib-compressed when enabled; reads
+        # decompress either way
+        self.compress_descriptions = compress_descriptions
+        self.compressor = TextCompressor()
+        
         self.init_database()
     
+    def __getstate__(self):
+        # The seen-set is rebuilt from the database by whoever unpickles us
+        state = self.__dict__.copy()
+        state.update(_seen=None, _seen_lock=None)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._seen_lock = threading.Lock()
+    
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection to the article database"""
+        return sqlite3.connect(self.db_path)
+    
+    def seen_urls(self) -> SeenSet:
+        """Fingerprints of every stored URL, loaded from the database on first use"""
+        with self._seen_lock:
+            if self._seen is None:
+                conn = self.connect()
+                self._seen = SeenSet(row[0] for row in conn.execute('SELECT url FROM articles'))
+                conn.close()
+            return self._seen
+    
+    def forget_seen(self):
+        """Drop the seen-set after deletes; the next lookup reloads it"""
+        with self._seen_lock:
+            self._seen = None
+    
+    def is_known(self, url: str) -> bool:
+        """True if an article with this URL is already stored (skip hashing and classifying it)"""
+        return url in self.seen_urls()
+    
+    def publish_snapshot(self, snapshot_path: str):
+        """Publish a consistent copy of the database for lock-free readers"""
+        publish_snapshot(self.db_path, snapshot_path)
+    
     def init_database(self):
         """Initialize database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS articles (
-                id TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                url TEXT NOT NULL UNIQUE,
-                description TEXT,
-                published_date DATETIME,
-                source TEXT NOT NULL,
-                category TEXT,
-                content_hash TEXT UNIQUE,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        conn = self.connect()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if conn.execute('PRAGMA page_count').fetchone()[0] == 0:
+            # Only takes effect before the first table is created; lets the
+            # Compactor return pages freed by retention to the OS in steps
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        self.key_format = self.key_format or self.detect_key_format(conn) or DEFAULT_KEY_FORMAT
         
         conn.execute('''
             CREATE TABLE IF NOT EXISTS sources (
@@ -38,117 +423,445 @@ class ArticleDatabase:
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        conn.execute(CATEGORIES_TABLE_SQL)
         
-        # Create indexes for better query performance
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published_date)')
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source)')
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_articles_category ON articles(category)')
+        if self.near_duplicates is not None:
+            self.near_duplicates.init_tables(conn, KEY_FORMATS[self.key_format])
+        
+        if self.stores_articles:
+            # Incrementally maintained statistics
+            if version < 4:
+                migrate_stats_keys(conn)
+            for statement in STATS_TABLES:
+                conn.execute(statement)
+            
+            self.score_index.init_tables(conn, KEY_FORMATS[self.key_format])
+            self.tag_index.init_tables(conn, KEY_FORMATS[self.key_format])
+            self.compressor.init_tables(conn)
+            
+            self.init_article_storage(conn, version)
         
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
         conn.commit()
         conn.close()
     
-    def generate_article_id(self, title: str, url: str) -> str:
+    def init_article_storage(self, conn: sqlite3.Connection, version: int):
+        """Create the articles table, its indexes and stats triggers"""
+        row = conn.execute("SELECT type FROM sqlite_master WHERE name = 'articles'").fetchone()
+        if row and row[0] == 'view':
+            raise ValueError(f"{self.db_path} uses partitioned storage; open it with PartitionedArticleDatabase")
+        
+        if version < 2 and row:
+            migrate_published_ts(conn, 'articles')
+        if version < 3 and row:
+            migrate_canonical_id(conn, 'articles')
+        if version < 5 and row:
+            migrate_snippet(conn, 'articles', self.compressor)
+        if version < 6 and row:
+            migrate_category_scores(conn, 'articles')
+        if version < 7 and row:
+            migrate_classifier_version(conn, 'articles')
+        if version < 4 and row:
+            migrate_dimensions(conn, 'articles', self.table_sql('articles'))
+        
+        conn.execute(self.table_sql('articles'))
+        
+        # Create indexes for better query performance
+        for statement in ARTICLE_INDEXES_SQL:
+            conn.execute(statement.format(table='articles'))
+        
+        create_stats_triggers(conn)
+        
+        if version < 4:
+            # Existing databases predate the stats tables (or their epoch hour
+            # buckets, or their integer keys); backfill them once
+            rebuild_stats(conn)
+        if version < 6 and row:
+            self.score_index.backfill(conn, 'articles')
+    
+    def detect_key_format(self, conn: sqlite3.Connection) -> Optional[str]:
+        """Key format of the stored articles (None for a new database)"""
+        return detect_key_format(conn, 'articles')
+    
+    def table_sql(self, table: str) -> str:
+        """CREATE TABLE statement for an articles table in this database's key format"""
+        return ARTICLE_TABLE_SQL.format(table=table, key_type=KEY_FORMATS[self.key_format])
+    
+    def generate_article_id(self, title: str, url: str, salt: int = 0) -> ArticleKey:
         """Generate unique ID for article based on title and URL"""
-        content = f"{title}|{url}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return hash_key(f"{title}|{url}", self.key_format, salt)
     
-    def generate_content_hash(self, title: str, description: str) -> str:
+    def generate_content_hash(self, title: str, description: str) -> ArticleKey:
         """Generate hash for content deduplication"""
-        content = f"{title}|{description or ''}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return hash_key(f"{title}|{description or ''}", self.key_format)
+    
+    def dimension_id(self, conn: sqlite3.Connection, column: str, name: Optional[str]) -> Optional[int]:
+        """Integer id of a source or category name, registering names not seen before"""
+        if name is None:
+            return None
+        
+        ids = self._dimension_ids[column]
+        if name not in ids:
+            table = DIMENSION_TABLES[column]
+            # Sources found only in articles are registered inactive, without a feed
+            values = "(name, url, active) VALUES (?, '', 0)" if table == 'sources' else "(name) VALUES (?)"
+            conn.execute(f"INSERT OR IGNORE INTO {table} {values}", (name,))
+            ids[name] = conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+        return ids[name]
+    
+    def forget_write_caches(self):
+        """Drop cached dimension ids and dictionaries after a rolled back write that may have created them"""
+        self.forget_dimension_ids()
+        self.compressor = TextCompressor()
+    
+    def forget_dimension_ids(self):
+        """Drop cached source/category ids after a rolled back write that may have created them"""
+        self._dimension_ids = {column: {} for column in DIMENSION_TABLES}
+    
+    def prepare_compressor(self, conn: sqlite3.Connection, articles: List[Dict]):
+        """Load the description dictionary, training one once enough descriptions exist"""
+        if not self.compress_descriptions:
+            return
+        if not self.compressor.loaded:
+            self.compressor.load(conn)
+        if self.compressor.current_id:
+            return
+        
+        min_length = self.compressor.min_length
+        samples = [a['description'] for a in articles if len(a.get('description') or '') >= min_length]
+        samples += [row[0] for row in conn.execute(
+            "SELECT description FROM articles WHERE typeof(description) = 'text' AND length(description) >= ? LIMIT ?",
+            (min_length, TRAINING_SAMPLES)
+        )]
+        if len(samples) >= MIN_TRAINING_SAMPLES:
+            self.compressor.train(conn, samples[:TRAINING_SAMPLES])
+            logging.info(f"Trained description dictionary {self.compressor.current_id} on {len(samples[:TRAINING_SAMPLES])} descriptions")
+    
+    def article_row(self, conn: sqlite3.Connection, article: Dict) -> tuple:
+        """Build the INSERT_ARTICLE_SQL parameters (INSERT_COLUMNS order) for an article dict"""
+        # Generate IDs and hashes
+        article_id = self.generate_article_id(article['title'], article['url'])
+        content_hash = self.generate_content_hash(article['title'], article.get('description', ''))
+        published = article.get('published_date')
+        description = article.get('description')
+        
+        return (
+            article_id,
+            article['title'],
+            article['url'],
+            self.compressor.compress(description) if self.compress_descriptions else description,
+            # Plain text for article cards, so readers never parse the HTML
+            make_snippet(description),
+            # Stored normalized to UTC so the text and epoch columns agree
+            str(parse_published_date(published)) if published is not None else None,
+            to_epoch(published),
+            self.dimension_id(conn, 'source', article['source']),
+            self.dimension_id(conn, 'category', article.get('category')),
+            self.pack_category_scores(conn, article),
+            # Articles classified by another version are redone by src/reclassify.py
+            article.get('classifier_version'),
+            content_hash,
+            article.get('canonical_id')
+        )
+    
+    def pack_category_scores(self, conn: sqlite3.Connection, article: Dict) -> Optional[bytes]:
+        """Packed `category_scores` of an article dict (its category at full score when it has none)"""
+        scores = article.get('category_scores')
+        if not scores:
+            scores = {article['category']: 1.0} if article.get('category') else {}
+        return pack_scores({self.dimension_id(conn, 'category', name): score_level(score)
+                            for name, score in scores.items()})
+    
+    def link_near_duplicate(self, conn: sqlite3.Connection, article: Dict):
+        """Link an article to the stored story it near-duplicates; returns (article, signature to index if new)"""
+        if self.near_duplicates is None or article.get('canonical_id'):
+            return article, None
+        
+        signature = minhash(article['title'], article.get('description'))
+        if signature is None:
+            return article, None
+        
+        canonical_id = self.near_duplicates.find(conn, signature)
+        if canonical_id is None:
+            return article, signature
+        
+        return dict(article, canonical_id=canonical_id), None
+    
+    def index_canonical(self, conn: sqlite3.Connection, row: tuple, signature):
+        """Index a newly stored canonical article so later copies link to it"""
+        if signature is not None:
+            values = dict(zip(INSERT_COLUMNS, row))
+            self.near_duplicates.add(conn, values['id'], values['published_ts'], signature)
+    
+    def index_scores(self, conn: sqlite3.Connection, row: tuple):
+        """Add a newly stored article's category scores to the multi-label index"""
+        values = dict(zip(INSERT_COLUMNS, row))
+        self.score_index.add(conn, values['id'], values['published_ts'], values['category_scores'])
+    
+    def index_tags(self, conn: sqlite3.Connection, row: tuple, tags: Optional[List[str]]):
+        """Store a newly stored article's publisher tags"""
+        values = dict(zip(INSERT_COLUMNS, row))
+        self.tag_index.add(conn, values['id'], values['published_ts'], tags)
+    
+    def resolve_key_collision(self, conn: sqlite3.Connection, source: str, row: tuple) -> Optional[tuple]:
+        """Return an ignored row with colliding keys fixed, or None if it duplicates a stored article.
+        
+        Hashed keys can collide: an id held by a different article is
+        replaced by the next salted hash, and a content_hash shared with
+        different content is dropped (the row is then only deduplicated by URL).
+        """
+        values = dict(zip(INSERT_COLUMNS, row))
+        existing = conn.execute(
+            f"SELECT id, title, url, description, content_hash FROM {source} WHERE id = ? OR url = ? OR content_hash = ?",
+            (values['id'], values['url'], values['content_hash'])
+        ).fetchall()
+        
+        for article_id, title, url, description, content_hash in existing:
+            if url == values['url'] or (title == values['title'] and self.compressor.decompress(conn, description)
+                                        == self.compressor.decompress(conn, values['description'])):
+                return None
+            if content_hash == values['content_hash']:
+                values['content_hash'] = None
+        
+        salt = 0
+        while conn.execute(f"SELECT 1 FROM {source} WHERE id = ?", (values['id'],)).fetchone():
+            salt += 1
+            values['id'] = self.generate_article_id(values['title'], values['url'], salt)
+        
+        return tuple(values[column] for column in INSERT_COLUMNS)
+    
+    def table_for(self, conn: sqlite3.Connection, published_date) -> str:
+        """Table a row published at `published_date` is stored in"""
+        return 'articles'
+    
+    def store_row(self, conn: sqlite3.Connection, article: Dict, row: tuple) -> Optional[tuple]:
+        """Write an article's row, return it as stored (keys fixed) or None if it duplicates a stored article"""
+        sql = INSERT_ARTICLE_SQL.format(table=self.table_for(conn, article.get('published_date')))
+        if conn.execute(sql, row).rowcount > 0:
+            return row
+        row = self.resolve_key_collision(conn, 'articles', row)
+        if row is not None and conn.execute(sql, row).rowcount > 0:
+            return row
+        return None
     
     def insert_article(self, article: Dict) -> bool:
         """Insert new article, return True if successful"""
+        return self.insert_articles([article])[0]
+    
+    def insert_articles(self, articles: List[Dict]) -> List[bool]:
+        """Insert a batch of articles in one transaction, return which ones were new.
+        
+        Each article is written under its own savepoint, so one that fails
+        (say, an unparseable date) is rolled back and logged on its own
+        while the rest of the batch is committed.
+        """
+        articles = list(articles)
+        seen = self.seen_urls()
+        conn = self.connect()
         try:
-            conn = sqlite3.connect(self.db_path)
-            
-            # Generate IDs and hashes
-            article_id = self.generate_article_id(article['title'], article['url'])
-            content_hash = self.generate_content_hash(article['title'], article.get('description', ''))
+            self.prepare_compressor(conn, articles)
+            if not conn.in_transaction:
+                # Savepoints nest inside it instead of committing on release
+                conn.execute('BEGIN')
             
-            conn.execute('''
-                INSERT OR IGNORE INTO articles 
-                (id, title, url, description, published_date, source, category, content_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                article_id,
-                article['title'],
-                article['url'],
-                article.get('description'),
-                article.get('published_date'),
-                article['source'],
-                article.get('category'),
-                content_hash
-            ))
+            inserted = []
+            stored = []
+            for article in articles:
+                # Known URLs never reach SQLite
+                if article['url'] in seen:
+                    inserted.append(False)
+                    continue
+                
+                conn.execute('SAVEPOINT article')
+                try:
+                    article, signature = self.link_near_duplicate(conn, article)
+                    row = self.store_row(conn, article, self.article_row(conn, article))
+                    is_new = row is not None
+                    if is_new:
+                        self.index_canonical(conn, row, signature)
+                        self.index_scores(conn, row)
+                        self.index_tags(conn, row, article.get('tags'))
+                    conn.execute('RELEASE article')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO article')
+                    conn.execute('RELEASE article')
+                    # Ids of sources/categories it registered were rolled back too
+                    self.forget_dimension_ids()
+                    logging.error(f"Error inserting article {article.get('url')}: {e}")
+                    inserted.append(False)
+                    continue
+                inserted.append(is_new)
+                stored.append(article['url'])
             
-            rows_affected = conn.total_changes
             conn.commit()
-            conn.close()
             
-            return rows_affected > 0
-            
-        except sqlite3.IntegrityError:
-            # Article already exists
-            return False
+            # Failed articles stay unseen so the next cycle retries them
+            for url in stored:
+                seen.add(url)
+            return inserted
+        
         except Exception as e:
-            logging.error(f"Error inserting article: {e}")
-            return False
+            conn.rollback()
+            logging.error(f"Error inserting articles: {e}")
+            self.forget_write_caches()
+            return [False] * len(articles)
+        finally:
+            conn.close()
     
     def get_articles(self, 
                     limit: int = 200,
                     category: Optional[str] = None,
                     source: Optional[str] = None,
-                    hours_old: Optional[float] = None) -> List[Dict]:
-        """Get articles with optional filtering"""
+                    hours_old: Optional[float] = None,
+                    include_duplicates: bool = False,
+                    description_chars: Optional[int] = None,
+                    with_description: bool = True,
+                    min_score: Optional[float] = None,
+                    tag: Optional[str] = None) -> List[Dict]:
+        """Get articles with optional filtering (near-duplicates hidden unless asked for).
         
-        conn = sqlite3.connect(self.db_path)
+        With `description_chars`, descriptions are cut to that many
+        characters and compressed ones are only inflated that far. Views
+        that only show the `snippet` pass `with_description=False` and skip
+        reading the description at all. With `min_score`, `category` matches
+        every article scoring at least that in it (see `category_scores`),
+        not only the ones filed under it. `tag` matches articles their
+        publisher tagged with it, in any case.
+        """
+        
+        conn = self.connect()
         conn.row_factory = sqlite3.Row
         
-        query = "SELECT * FROM articles WHERE 1=1"
+        where, params = self.build_filters(category, source, hours_old, include_duplicates, min_score, tag)
+        query = f"{select_articles_sql('articles', with_description)} WHERE {where}"
+        
+        query += " ORDER BY published_ts DESC LIMIT ?"
+        params.append(limit)
+        
+        cursor = conn.execute(query, params)
+        articles = self.article_dicts(conn, cursor.fetchall(), description_chars)
+        conn.close()
+        
+        return articles
+    
+    def article_dicts(self, conn: sqlite3.Connection, rows, description_chars: Optional[int] = None) -> List[Dict]:
+        """Article dicts for fetched rows, with descriptions decompressed and category scores by name"""
+        articles = [dict(row) for row in rows]
+        names = dict(conn.execute('SELECT id, name FROM categories')) if articles else {}
+        for article in articles:
+            if 'description' in article:
+                article['description'] = self.compressor.decompress(conn, article['description'], description_chars)
+            if article['category_scores'] is None:
+                # Stored before scores were kept: only the category is known
+                article['category_scores'] = {article['category']: 1.0} if article['category'] else {}
+            else:
+                levels = sorted(unpack_scores(article['category_scores']).items(), key=lambda item: -item[1])
+                article['category_scores'] = {names[c]: round(level / SCORE_LEVELS, 3) for c, level in levels}
+        return articles
+    
+    def build_filters(self,
+                      category: Optional[str] = None,
+                      source: Optional[str] = None,
+                      hours_old: Optional[float] = None,
+                      include_duplicates: bool = False,
+                      min_score: Optional[float] = None,
+                      tag: Optional[str] = None):
+        """Build the WHERE clause and parameters shared by article queries"""
+        where = "1=1"
         params = []
         
-        if category:
-            query += " AND category = ?"
+        if not include_duplicates:
+            where += " AND canonical_id IS NULL"
+        
+        if category and min_score is not None:
+            # Multi-label: served from the (category, score) index
+            where += f" AND {self.score_index.filter_sql('a.id')}"
+            params.extend([category, max(score_level(min_score), 1)])
+        elif category:
+            where += " AND category_id = (SELECT id FROM categories WHERE name = ?)"
             params.append(category)
         
         if source:
-            query += " AND source = ?"
+            where += " AND source_id = (SELECT id FROM sources WHERE name = ?)"
             params.append(source)
         
+        if tag:
+            where += f" AND {self.tag_index.filter_sql('a.id')}"
+            params.append(tag)
+        
         if hours_old is not None:
-            cutoff_time = datetime.now() - timedelta(hours=hours_old)
-            query += " AND published_date >= ?"
-            params.append(cutoff_time.isoformat())
+            where += " AND published_ts >= ?"
+            params.append(int(time.time() - hours_old * 3600))
         
-        query += " ORDER BY published_date DESC LIMIT ?"
-        params.append(limit)
+        return where, params
+    
+    def get_duplicates(self, article_id: ArticleKey) -> List[Dict]:
+        """Get the near-duplicates linked to a canonical article, oldest first"""
+        conn = self.connect()
+        conn.row_factory = sqlite3.Row
         
-        cursor = conn.execute(query, params)
-        articles = [dict(row) for row in cursor.fetchall()]
+        cursor = conn.execute(
+            f"{select_articles_sql('articles')} WHERE canonical_id = ? ORDER BY published_ts",
+            (article_id,)
+        )
+        articles = self.article_dicts(conn, cursor.fetchall())
         conn.close()
         
         return articles
     
+    def retention_cutoff(self, days_old: int) -> int:
+        """Epoch seconds before which cleanup_old_articles removes articles"""
+        return int(time.time() - days_old * 86400)
+    
+    def release_duplicates(self, conn: sqlite3.Connection, canonical_ids: List[ArticleKey]):
+        """Unlink duplicates whose canonical article expired so they show again"""
+        conn.executemany(
+            "UPDATE articles SET canonical_id = NULL WHERE canonical_id = ?",
+            [(article_id,) for article_id in canonical_ids]
+        )
+    
     def cleanup_old_articles(self, days_old: int = 5):
-        """Remove articles older than specified days"""
-        cutoff_date = datetime.now() - timedelta(days=days_old)
+        """Remove articles older than specified days, archiving them first if configured"""
+        cutoff_ts = self.retention_cutoff(days_old)
+        
+        conn = self.connect()
+        conn.row_factory = sqlite3.Row
+        
+        # Hold the write lock so nothing changes between archiving and deleting
+        conn.execute('BEGIN IMMEDIATE')
+        if self.archive is not None:
+            expired = conn.execute(
+                f"{select_articles_sql('articles')} WHERE published_ts < ?",
+                (cutoff_ts,)
+            ).fetchall()
+            if expired:
+                archived = self.archive.archive_articles(self.article_dicts(conn, expired))
+                logging.info(f"Archived {archived} old articles")
         
-        conn = sqlite3.connect(self.db_path)
         cursor = conn.execute(
-            "DELETE FROM articles WHERE published_date < ?",
-            (cutoff_date.isoformat(),)
+            "DELETE FROM articles WHERE published_ts < ?",
+            (cutoff_ts,)
         )
         
         deleted_count = cursor.rowcount
+        self.score_index.prune(conn, cutoff_ts)
+        self.tag_index.prune(conn, cutoff_ts)
+        
+        if self.near_duplicates is not None:
+            self.release_duplicates(conn, self.near_duplicates.prune(conn, cutoff_ts))
+        
         conn.commit()
         conn.close()
         
+        if deleted_count:
+            self.forget_seen()
+        
         logging.info(f"Cleaned up {deleted_count} old articles")
         return deleted_count
     
     def get_sources(self) -> List[Dict]:
         """Get all sources"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         conn.row_factory = sqlite3.Row
         
         cursor = conn.execute("SELECT * FROM sources WHERE active = 1")
@@ -160,10 +873,15 @@ class ArticleDatabase:
     def insert_source(self, name: str, url: str, rss_url: str, category: str = None):
         """Insert new source"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.connect()
+            # Fills in a source first registered by one of its articles
             conn.execute('''
-                INSERT OR IGNORE INTO sources (name, url, rss_url, category)
+                INSERT INTO sources (name, url, rss_url, category)
                 VALUES (?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    url = excluded.url, rss_url = excluded.rss_url,
+                    category = excluded.category, active = 1
+                WHERE sources.url = ''
             ''', (name, url, rss_url, category))
             conn.commit()
             conn.close()
@@ -173,34 +891,41 @@ class ArticleDatabase:
             return False
     
     def get_stats(self) -> Dict:
-        """Get database statistics"""
-        conn = sqlite3.connect(self.db_path)
+        """Get database statistics from the incrementally maintained stats tables"""
+        conn = self.connect()
         
-        # Total articles
-        total_articles = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        # Total articles (every article has a source)
+        total_articles = conn.execute("SELECT COALESCE(SUM(count), 0) FROM stats_by_source").fetchone()[0]
         
         # Articles by category
         category_counts = dict(conn.execute('''
-            SELECT category, COUNT(*) 
-            FROM articles 
-            WHERE category IS NOT NULL 
-            GROUP BY category
+            SELECT c.name, s.count
+            FROM stats_by_category s
+            JOIN categories c ON c.id = s.category_id
+            ORDER BY c.name
         ''').fetchall())
         
         # Articles by source
         source_counts = dict(conn.execute('''
-            SELECT source, COUNT(*) 
-            FROM articles 
-            GROUP BY source 
-            ORDER BY COUNT(*) DESC 
+            SELECT src.name, s.count 
+            FROM stats_by_source s
+            JOIN sources src ON src.id = s.source_id
+            ORDER BY s.count DESC 
             LIMIT 10
         ''').fetchall())
         
-        # Recent articles (last 24h)
-        cutoff = datetime.now() - timedelta(hours=24)
+        # Recent articles (last 24h): whole hour buckets after the cutoff,
+        # plus an indexed count of the partial hour the cutoff falls into
+        cutoff_ts = int(time.time()) - 24 * 3600
+        cutoff_bucket = cutoff_ts // 3600
+        
         recent_count = conn.execute(
-            "SELECT COUNT(*) FROM articles WHERE published_date >= ?",
-            (cutoff.isoformat(),)
+            "SELECT COALESCE(SUM(count), 0) FROM stats_by_hour WHERE hour_bucket > ?",
+            (cutoff_bucket,)
+        ).fetchone()[0]
+        recent_count += conn.execute(
+            "SELECT COUNT(*) FROM articles WHERE published_ts >= ? AND published_ts < ?",
+            (cutoff_ts, (cutoff_bucket + 1) * 3600)
         ).fetchone()[0]
         
         conn.close()
@@ -210,4 +935,4 @@ class ArticleDatabase:
             'recent_articles_24h': recent_count,
             'by_category': category_counts,
             'top_sources': source_counts
-        }
\ No newline at end of file
+        }
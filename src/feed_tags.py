@@ -0,0 +1,117 @@
+import re
+import json
+import sqlite3
+import hashlib
+from typing import Dict, Iterable, List, Optional, Union
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+FEED_TAG_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS article_tags (
+        tag TEXT NOT NULL COLLATE NOCASE,
+        article_id {key_type} NOT NULL,
+        published_ts INTEGER,
+        PRIMARY KEY (tag, article_id)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_article_tags_published_ts ON article_tags(published_ts)',
+    'CREATE INDEX IF NOT EXISTS idx_article_tags_article_id ON article_tags(article_id)'
+]
+
+def normalize_tag(tag: str) -> str:
+    """Lookup form of a publisher tag: lowercase with whitespace collapsed"""
+    return WHITESPACE_RE.sub(' ', tag).strip().lower()
+
+def entry_tags(entry) -> List[str]:
+    """Distinct raw tags of a feed entry (`<category>` elements), in feed order"""
+    tags = []
+    seen = set()
+    for tag in entry.get('tags') or []:
+        term = WHITESPACE_RE.sub(' ', tag.get('term') or '').strip()
+        if term and normalize_tag(term) not in seen:
+            seen.add(normalize_tag(term))
+            tags.append(term)
+    return tags
+
+class TagMapper:
+    """Maps publisher tags to our categories, so tagged entries skip the classifier.
+    
+    `tag_categories` applies to every source and `source_tag_categories`
+    overrides it per source; mapping a tag to None makes a source's use of
+    it count for nothing. Each mapped tag is a vote for its category, and
+    an entry is decided by its tags only when one category has strictly
+    the most votes; anything else (no mapped tags, a tie) goes to the
+    classifier.
+    """
+    
+    def __init__(self, tag_categories: Dict[str, Optional[str]],
+                 source_tag_categories: Optional[Dict[str, Dict[str, Optional[str]]]] = None):
+        self.tag_categories = {normalize_tag(t): c for t, c in tag_categories.items()}
+        self.source_tag_categories = {
+            source: {normalize_tag(t): c for t, c in mapping.items()}
+            for source, mapping in (source_tag_categories or {}).items()
+        }
+        config = json.dumps([self.tag_categories, self.source_tag_categories], sort_keys=True)
+        self.version = hashlib.blake2b(config.encode(), digest_size=6).hexdigest()
+    
+    def stamp(self, classifier_version: str) -> str:
+        """Version recorded on articles classified with this mapping in front of a classifier"""
+        return f"{classifier_version}+tags-{self.version}"
+    
+    def scores(self, source: str, tags: Iterable[str]) -> Optional[Dict[str, float]]:
+        """Category scores from an entry's tags (votes over the top count), or None when they do not decide"""
+        overrides = self.source_tag_categories.get(source, {})
+        votes = {}
+        for tag in tags:
+            key = normalize_tag(tag)
+            category = overrides[key] if key in overrides else self.tag_categories.get(key)
+            if category is not None:
+                votes[category] = votes.get(category, 0) + 1
+        if not votes:
+            return None
+        
+        ranked = sorted(votes.values(), reverse=True)
+        if len(ranked) > 1 and ranked[0] == ranked[1]:
+            return None
+        return {category: count / ranked[0] for category, count in votes.items()}
+
+class FeedTagIndex:
+    """Raw publisher tags of stored articles, indexed by tag (case-insensitive).
+    
+    Like the category score index it is one table per database file,
+    shared by all partitions and pruned by published_ts.
+    """
+    
+    def init_tables(self, conn: sqlite3.Connection, key_type: str = 'TEXT'):
+        """Create the tag table, keyed like the articles table"""
+        for statement in FEED_TAG_TABLES:
+            conn.execute(statement.format(key_type=key_type))
+    
+    def add(self, conn: sqlite3.Connection, article_id: Union[str, int], published_ts: Optional[int],
+            tags: Optional[List[str]]):
+        """Store an article's tags"""
+        conn.executemany(
+            'INSERT OR IGNORE INTO article_tags (tag, article_id, published_ts) VALUES (?, ?, ?)',
+            [(tag, article_id, published_ts) for tag in tags or []]
+        )
+    
+    def tags_for(self, conn: sqlite3.Connection, article_ids: List[Union[str, int]]) -> Dict[Union[str, int], List[str]]:
+        """article id -> tags, for the given articles, sorted (feed order is not kept; TagMapper votes ignore it)"""
+        tags = {}
+        for start in range(0, len(article_ids), 500):
+            batch = article_ids[start:start + 500]
+            for tag, article_id in conn.execute(
+                f"SELECT tag, article_id FROM article_tags WHERE article_id IN ({', '.join('?' for _ in batch)}) "
+                "ORDER BY article_id, tag", batch
+            ):
+                tags.setdefault(article_id, []).append(tag)
+        return tags
+    
+    def prune(self, conn: sqlite3.Connection, cutoff_ts: int) -> int:
+        """Drop tags of articles published before `cutoff_ts`, return the rows removed"""
+        return conn.execute('DELETE FROM article_tags WHERE published_ts < ?', (cutoff_ts,)).rowcount
+    
+    def filter_sql(self, column: str = 'a.id') -> str:
+        """WHERE condition matching articles tagged ? (any case)"""
+        return f"{column} IN (SELECT article_id FROM article_tags WHERE tag = ?)"
@@ -76,6 +76,77 @@ FEED_SOURCES = {
     'Fashionista Street Style': 'https://fashionista.com/category/street-style/feed'
 }
 
+# Publisher tags (RSS `<category>` elements) that decide an article's
+# category without the classifier. Matched case-insensitively; a tag the
+# entries of a source use loosely can be remapped, or ignored with None,
+# in SOURCE_TAG_CATEGORIES
+TAG_CATEGORIES = {
+    # Beauty
+    'beauty': 'Beauty',
+    'skincare': 'Beauty',
+    'skin care': 'Beauty',
+    'makeup': 'Beauty',
+    'hair': 'Beauty',
+    'fragrance': 'Beauty',
+    'nails': 'Beauty',
+    'cosmetics': 'Beauty',
+    
+    # Fashion Business
+    'business': 'Fashion Business',
+    'finance': 'Fashion Business',
+    'earnings': 'Fashion Business',
+    'mergers and acquisitions': 'Fashion Business',
+    'm&a': 'Fashion Business',
+    'investment': 'Fashion Business',
+    'sourcing': 'Fashion Business',
+    'supply chain': 'Fashion Business',
+    
+    # Luxury
+    'luxury': 'Luxury',
+    'luxury goods': 'Luxury',
+    'haute couture': 'Luxury',
+    'couture': 'Luxury',
+    'jewelry': 'Luxury',
+    'watches': 'Luxury',
+    
+    # Retail
+    'retail': 'Retail',
+    'stores': 'Retail',
+    'store openings': 'Retail',
+    'department stores': 'Retail',
+    'brick and mortar': 'Retail',
+    
+    # E-commerce
+    'e-commerce': 'E-commerce',
+    'ecommerce': 'E-commerce',
+    'online shopping': 'E-commerce',
+    'dtc': 'E-commerce',
+    'direct-to-consumer': 'E-commerce',
+    'marketplaces': 'E-commerce',
+    
+    # Fashion Trends
+    'trends': 'Fashion Trends',
+    'runway': 'Fashion Trends',
+    'fashion week': 'Fashion Trends',
+    'street style': 'Fashion Trends',
+    'collections': 'Fashion Trends',
+}
+
+# Per-source overrides of TAG_CATEGORIES
+SOURCE_TAG_CATEGORIES = {
+    # Section names rather than topics
+    'Business of Fashion': {'news & analysis': None, 'fashion': 'Fashion Trends'},
+    'The Business of Fashion Tech': {'technology': 'E-commerce'},
+    # Every entry carries the publication's beat; only the other tags tell
+    # its articles apart
+    'Luxury Daily': {'luxury': None, 'commerce': 'E-commerce', 'marketing': 'Fashion Business'},
+    'Retail Dive': {'retail': None, 'e-commerce': 'E-commerce', 'omnichannel': 'E-commerce'},
+    'Modern Retail': {'retail': None, 'marketplaces': 'E-commerce', 'amazon': 'E-commerce'},
+    'Chain Store Age': {'retail': None},
+    'Sourcing Journal': {'sourcing': None, 'denim': 'Fashion Trends'},
+    'Beauty Independent': {'beauty': None, 'funding': 'Fashion Business'},
+}
+
 def get_all_feeds():
     """Return all RSS feed URLs"""
     return FEED_SOURCES
@@ -0,0 +1,175 @@
+import re
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+def is_word_char(char: str) -> bool:
+    """True for characters `\\w` matches (what `\\b` boundaries are between)"""
+    return char.isalnum() or char == '_'
+
+def lower_keyword(keyword: str) -> str:
+    """Keyword lowercased character by character, keeping its length"""
+    return ''.join(c.lower() if len(c.lower()) == 1 else c for c in keyword)
+
+class _FoldTable(dict):
+    """str.translate table folding text onto the keyword alphabet the way re.IGNORECASE compares.
+    
+    Each character maps to the first alphabet character re.IGNORECASE
+    treats as equal to it (itself if none), resolved on first sight and
+    cached. Ones whose fold differs from `str.lower()` (long s, Kelvin
+    sign, dotless i, ...) are recorded in `irregular`.
+    """
+    
+    def __init__(self, alphabet: Set[str]):
+        super().__init__()
+        self.patterns = [(char, re.compile(re.escape(char), re.IGNORECASE)) for char in sorted(alphabet)]
+        self.alphabet = alphabet
+        self.irregular: Set[str] = set()
+    
+    def __missing__(self, code: int) -> str:
+        char = chr(code)
+        folded = char
+        for target, pattern in self.patterns:
+            if pattern.fullmatch(char):
+                folded = target
+                break
+        lowered = char.lower()
+        if folded != lowered and (folded in self.alphabet or any(c in self.alphabet for c in lowered)):
+            self.irregular.add(char)
+        self[code] = folded
+        return folded
+
+class KeywordMatcher:
+    """Counts keyword matches for many categories in a single pass over the text.
+    
+    All keywords go into one Aho-Corasick automaton, compiled to a DFA so
+    each character costs one dict lookup. Matches follow the semantics of
+    `re.findall(r'\\b(?:kw1|kw2|...)\\b', text, re.IGNORECASE)` run per
+    category: whole words only, case-insensitive, non-overlapping within a
+    category (the earliest listed keyword wins at a position) and
+    overlapping freely across categories.
+    
+    `substrings` are plain case-insensitive substrings (`word in
+    text.lower()`); `scan` reports which groups had any of theirs.
+    """
+    
+    def __init__(self, category_keywords: Dict[str, List[str]],
+                 substrings: Optional[Dict[str, List[str]]] = None):
+        self.categories = list(category_keywords)
+        
+        # (group, length, whole_word) per pattern; ids follow list order,
+        # which settles which keyword wins when several start at one position
+        self.patterns: List[Tuple[str, int, bool]] = []
+        words = []
+        for category, keywords in category_keywords.items():
+            for keyword in keywords:
+                if keyword:
+                    words.append(lower_keyword(keyword))
+                    self.patterns.append((category, len(keyword), True))
+        for group, group_words in (substrings or {}).items():
+            for word in group_words:
+                if word:
+                    words.append(word.lower())
+                    self.patterns.append((group, len(words[-1]), False))
+        
+        self.words = words
+        self.fold = _FoldTable({char for word in words for char in word})
+        self._build([word.translate(self.fold) for word in words])
+    
+    def _build(self, words: List[str]):
+        """Build the trie, its failure links and the DFA transition table"""
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for pattern_id, word in enumerate(words):
+            state = 0
+            for char in word:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].append(pattern_id)
+        
+        # Breadth-first, so a state's failure target is complete before it;
+        # transitions that lead back to the root are left out (the default)
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions = dict(delta[fail[state]])
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+                transitions[char] = child
+                queue.append(child)
+            delta[state] = transitions
+        
+        self.delta = delta
+        self.outputs = [tuple(ids) for ids in outputs]
+        # Per state: (id, length, category) of its whole-word keywords, and
+        # the substring groups it completes
+        self.keyword_outputs = [
+            tuple((i, self.patterns[i][1], self.patterns[i][0]) for i in ids if self.patterns[i][2]) for ids in outputs
+        ]
+        self.group_outputs = [frozenset(self.patterns[i][0] for i in ids if not self.patterns[i][2]) for ids in outputs]
+    
+    def match(self, text: str) -> Tuple[List[int], Set[str]]:
+        """Ids of the counted whole-word matches (one per match) and the substring groups present"""
+        folded = text.translate(self.fold)
+        delta, outputs = self.delta, self.outputs
+        
+        hits = []
+        state = 0
+        for end, char in enumerate(folded, 1):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                hits.append((end, state))
+        
+        length = len(text)
+        matches = []
+        found = set()
+        keyword_outputs, group_outputs = self.keyword_outputs, self.group_outputs
+        for end, state in hits:
+            if group_outputs[state]:
+                found |= group_outputs[state]
+            for pattern_id, size, category in keyword_outputs[state]:
+                # \b at both ends, checked on the original text
+                start = end - size
+                if (start > 0 and is_word_char(text[start - 1])) == is_word_char(text[start]):
+                    continue
+                if is_word_char(text[end - 1]) == (end < length and is_word_char(text[end])):
+                    continue
+                matches.append((start, pattern_id, size, category))
+        
+        counted = []
+        next_free = dict.fromkeys(self.categories, 0)
+        for start, pattern_id, size, category in sorted(matches):
+            if start >= next_free[category]:
+                counted.append(pattern_id)
+                next_free[category] = start + size
+        
+        if not text.isascii() and not self.fold.irregular.isdisjoint(text):
+            # Folding no longer agrees with str.lower() here; check the
+            # substrings the plain way
+            lowered = text.lower()
+            found = {group for (group, _, whole_word), word in zip(self.patterns, self.words)
+                     if not whole_word and word in lowered}
+        
+        return counted, found
+    
+    def scan(self, text: str) -> Tuple[Dict[str, int], Set[str]]:
+        """Whole-word match counts per category (in category order) and the substring groups present"""
+        counted, found = self.match(text)
+        return self.category_counts(counted), found
+    
+    def category_counts(self, pattern_ids: List[int]) -> Dict[str, int]:
+        """Match counts per category (in category order) for ids from `match`"""
+        counts = dict.fromkeys(self.categories, 0)
+        for pattern_id in pattern_ids:
+            counts[self.patterns[pattern_id][0]] += 1
+        return counts
+    
+    def count(self, text: str) -> Dict[str, int]:
+        """Whole-word match counts per category"""
+        return self.scan(text)[0]
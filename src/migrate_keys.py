@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import logging
+import argparse
+from typing import Dict
+from src.database import ArticleDatabase, ARTICLE_COLUMNS, KEY_FORMATS, detect_key_format
+from src.compression import TextCompressor
+from src.partitioned_database import PartitionedArticleDatabase, TEMPLATE_TABLE
+
+def migrate_keys(db_path: str, key_format: str = 'int64') -> Dict:
+    """Rewrite a database with article keys in `key_format`, keeping the original as `<db_path>.bak`.
+    
+    Ids and content hashes are recomputed, and canonical_id links, the
+    near-duplicate index, the category score index and the publisher tags
+    are carried over through the old-to-new id map.
+    Stop ingestion while this runs: the file is replaced when it finishes.
+    """
+    if key_format not in KEY_FORMATS:
+        raise ValueError(f"key_format must be one of {list(KEY_FORMATS)}")
+    
+    source = sqlite3.connect(db_path)
+    row = source.execute("SELECT type FROM sqlite_master WHERE name = 'articles'").fetchone()
+    partitioned = row is not None and row[0] == 'view'
+    target_class = PartitionedArticleDatabase if partitioned else ArticleDatabase
+    
+    # Bring an older file up to the current schema before copying it
+    target_class(db_path)
+    current = detect_key_format(source, TEMPLATE_TABLE if partitioned else 'articles')
+    if current == key_format:
+        source.close()
+        logging.info(f"{db_path} already uses {key_format} keys")
+        return {'migrated': 0, 'size_before': os.path.getsize(db_path), 'size_after': os.path.getsize(db_path)}
+    
+    tmp_path = f"{db_path}.migrating"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    target = target_class(tmp_path, key_format=key_format)
+    conn = target.connect()
+    
+    # New ids first, so canonical_id links can be rewritten as rows are copied
+    id_map = {}
+    used = set()
+    for old_id, title, url in source.execute('SELECT id, title, url FROM articles'):
+        salt = 0
+        new_id = target.generate_article_id(title, url)
+        while new_id in used:
+            salt += 1
+            new_id = target.generate_article_id(title, url, salt)
+        used.add(new_id)
+        id_map[old_id] = new_id
+    
+    # Dimension rows keep their ids, which the copied articles refer to
+    conn.executemany(
+        'INSERT OR REPLACE INTO sources (id, name, url, rss_url, category, active, last_updated, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        source.execute('SELECT id, name, url, rss_url, category, active, last_updated, created_at FROM sources')
+    )
+    conn.executemany(
+        'INSERT OR REPLACE INTO categories (id, name) VALUES (?, ?)',
+        source.execute('SELECT id, name FROM categories')
+    )
+    # Compressed descriptions are copied as is, with the dictionaries they name
+    conn.executemany(
+        'INSERT OR REPLACE INTO text_dictionaries (id, dictionary, created_at) VALUES (?, ?, ?)',
+        source.execute('SELECT id, dictionary, created_at FROM text_dictionaries')
+    )
+    compressor = TextCompressor()
+    
+    columns = ', '.join(ARTICLE_COLUMNS)
+    placeholders = ', '.join('?' for _ in ARTICLE_COLUMNS)
+    migrated = 0
+    for row in source.execute(f'SELECT {columns} FROM articles'):
+        values = dict(zip(ARTICLE_COLUMNS, row))
+        values['id'] = id_map[values['id']]
+        values['canonical_id'] = id_map.get(values['canonical_id'])
+        description = compressor.decompress(source, values['description'])
+        values['content_hash'] = target.generate_content_hash(values['title'], description)
+        
+        table = target.table_for(conn, values['published_date'] or values['created_at'])
+        sql = f'INSERT OR IGNORE INTO {table} ({columns}) VALUES ({placeholders})'
+        if conn.execute(sql, [values[c] for c in ARTICLE_COLUMNS]).rowcount == 0:
+            # Distinct content whose 64-bit hashes collide
+            values['content_hash'] = None
+            conn.execute(sql, [values[c] for c in ARTICLE_COLUMNS])
+        migrated += 1
+    
+    has_index = source.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'near_duplicate_signatures'"
+    ).fetchone()
+    if has_index:
+        conn.executemany(
+            'INSERT OR IGNORE INTO near_duplicate_signatures (article_id, published_ts, signature) VALUES (?, ?, ?)',
+            ((id_map[a], ts, sig) for a, ts, sig in source.execute(
+                'SELECT article_id, published_ts, signature FROM near_duplicate_signatures') if a in id_map)
+        )
+        conn.executemany(
+            'INSERT OR IGNORE INTO near_duplicate_buckets (band_key, article_id) VALUES (?, ?)',
+            ((key, id_map[a]) for key, a in source.execute(
+                'SELECT band_key, article_id FROM near_duplicate_buckets') if a in id_map)
+        )
+    
+    conn.executemany(
+        'INSERT OR IGNORE INTO article_category_scores (category_id, score, article_id, published_ts) VALUES (?, ?, ?, ?)',
+        ((category_id, score, id_map[a], ts) for category_id, score, a, ts in source.execute(
+            'SELECT category_id, score, article_id, published_ts FROM article_category_scores') if a in id_map)
+    )
+    conn.executemany(
+        'INSERT OR IGNORE INTO article_tags (tag, article_id, published_ts) VALUES (?, ?, ?)',
+        ((tag, id_map[a], ts) for tag, a, ts in source.execute(
+            'SELECT tag, article_id, published_ts FROM article_tags') if a in id_map)
+    )
+    
+    conn.commit()
+    conn.execute('VACUUM')
+    conn.close()
+    source.close()
+    
+    size_before = os.path.getsize(db_path)
+    os.replace(db_path, f"{db_path}.bak")
+    os.replace(tmp_path, db_path)
+    size_after = os.path.getsize(db_path)
+    
+    logging.info(f"Migrated {migrated} articles to {key_format} keys ({size_before} -> {size_after} bytes)")
+    return {'migrated': migrated, 'size_before': size_before, 'size_after': size_after}
+
+def main():
+    """Migrate an article database to another key format"""
+    parser = argparse.ArgumentParser(description="Rewrite article ids and content hashes in a compact key format")
+    parser.add_argument('db_path', nargs='?', default='articles.db')
+    parser.add_argument('--key-format', choices=list(KEY_FORMATS), default='int64')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    result = migrate_keys(args.db_path, args.key_format)
+    print(f"Migrated {result['migrated']} articles: {result['size_before']:,} -> {result['size_after']:,} bytes")
+
+if __name__ == "__main__":
+    main()
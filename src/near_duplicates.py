@@ -0,0 +1,171 @@
+import re
+import hashlib
+import sqlite3
+from array import array
+from typing import List, Optional, Union
+
+# MinHash signature of NUM_PERM values, split into BANDS bands of ROWS for
+# LSH: two articles share a bucket with probability 1 - (1 - J^ROWS)^BANDS,
+# an S-curve around J = (1/BANDS)^(1/ROWS) ~ 0.5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Estimated Jaccard similarity at which an article is linked to a candidate
+THRESHOLD = 0.6
+
+# Only the lead of the description is shingled; feeds append boilerplate
+DESCRIPTION_WORDS = 60
+
+# Candidates compared per lookup, those sharing the most bands first; keeps
+# lookups bounded even when boilerplate makes some buckets crowded
+MAX_CANDIDATES = 32
+
+# Offset added per bin borrowed while densifying empty bins
+DENSIFY_STEP = 1 << 57
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+TAG_RE = re.compile(r'<[^>]+>')
+
+NEAR_DUPLICATE_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS near_duplicate_signatures (
+        article_id {key_type} PRIMARY KEY,
+        published_ts INTEGER,
+        signature BLOB NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_near_duplicate_signatures_published_ts ON near_duplicate_signatures(published_ts)',
+    '''
+    CREATE TABLE IF NOT EXISTS near_duplicate_buckets (
+        band_key INTEGER NOT NULL,
+        article_id {key_type} NOT NULL,
+        PRIMARY KEY (band_key, article_id)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_near_duplicate_buckets_article_id ON near_duplicate_buckets(article_id)'
+]
+
+def shingles(title: str, description: Optional[str]) -> set:
+    """Word bigrams of the title and the lead of the description"""
+    words = WORD_RE.findall((title or '').lower())
+    words += WORD_RE.findall(TAG_RE.sub(' ', description or '').lower())[:DESCRIPTION_WORDS]
+    if len(words) < 2:
+        return set(words)
+    return {f'{a} {b}' for a, b in zip(words, words[1:])}
+
+def minhash(title: str, description: Optional[str]) -> Optional[List[int]]:
+    """One-permutation MinHash signature of an article (None when it has no words).
+    
+    Each shingle is hashed once and lands in one of NUM_PERM bins keeping
+    the bin minimum, instead of NUM_PERM hash functions per shingle; empty
+    bins borrow the next non-empty bin's value (rotation densification).
+    """
+    bins = [None] * NUM_PERM
+    for shingle in shingles(title, description):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+        index, value = h % NUM_PERM, h >> 6
+        if bins[index] is None or value < bins[index]:
+            bins[index] = value
+    
+    if all(value is None for value in bins):
+        return None
+    
+    signature = list(bins)
+    for i in range(NUM_PERM):
+        distance = 1
+        while signature[i] is None:
+            borrowed = bins[(i + distance) % NUM_PERM]
+            if borrowed is not None:
+                signature[i] = borrowed + distance * DENSIFY_STEP
+            distance += 1
+    return signature
+
+def band_keys(signature: List[int]) -> List[int]:
+    """One signed 64-bit LSH bucket key per band"""
+    keys = []
+    for band in range(BANDS):
+        rows = array('Q', [band] + signature[band * ROWS:(band + 1) * ROWS]).tobytes()
+        keys.append(int.from_bytes(hashlib.blake2b(rows, digest_size=8).digest(), 'big', signed=True))
+    return keys
+
+def pack_signature(signature: List[int]) -> bytes:
+    """Store the low 16 bits of each value (b-bit MinHash); plenty to estimate similarity"""
+    return array('H', [value & 0xFFFF for value in signature]).tobytes()
+
+def similarity(packed_a: bytes, packed_b: bytes) -> float:
+    """Estimated Jaccard similarity of two packed signatures"""
+    a, b = array('H', packed_a), array('H', packed_b)
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+class NearDuplicateIndex:
+    """MinHash/LSH index of canonical articles, stored in SQLite tables.
+    
+    Only canonical articles are indexed; a near-duplicate is linked to the
+    article it matched (its canonical_id) and never becomes a candidate
+    itself. Lookups touch only the BANDS bucket keys of the new article, so
+    their cost does not grow with the number of stored articles.
+    """
+    
+    def __init__(self, threshold: float = THRESHOLD):
+        self.threshold = threshold
+    
+    def init_tables(self, conn: sqlite3.Connection, key_type: str = 'TEXT'):
+        """Create the signature and bucket tables, keyed like the articles table"""
+        for statement in NEAR_DUPLICATE_TABLES:
+            conn.execute(statement.format(key_type=key_type))
+    
+    def find(self, conn: sqlite3.Connection, signature: List[int]) -> Optional[Union[str, int]]:
+        """Return the most similar indexed article above the threshold, if any"""
+        keys = band_keys(signature)
+        candidates = conn.execute(f'''
+            SELECT s.article_id, s.signature
+            FROM (
+                SELECT article_id, COUNT(*) AS shared_bands
+                FROM near_duplicate_buckets
+                WHERE band_key IN ({', '.join('?' for _ in keys)})
+                GROUP BY article_id
+                ORDER BY shared_bands DESC
+                LIMIT ?
+            ) b
+            JOIN near_duplicate_signatures s ON s.article_id = b.article_id
+        ''', keys + [MAX_CANDIDATES]).fetchall()
+        
+        packed = pack_signature(signature)
+        best_id, best_score = None, self.threshold
+        for article_id, other in candidates:
+            score = similarity(packed, other)
+            if score >= best_score:
+                best_id, best_score = article_id, score
+        
+        return best_id
+    
+    def add(self, conn: sqlite3.Connection, article_id: Union[str, int], published_ts: Optional[int], signature: List[int]):
+        """Index a canonical article"""
+        conn.execute(
+            'INSERT OR REPLACE INTO near_duplicate_signatures (article_id, published_ts, signature) VALUES (?, ?, ?)',
+            (article_id, published_ts, pack_signature(signature))
+        )
+        conn.executemany(
+            'INSERT OR IGNORE INTO near_duplicate_buckets (band_key, article_id) VALUES (?, ?)',
+            [(key, article_id) for key in band_keys(signature)]
+        )
+    
+    def remove(self, conn: sqlite3.Connection, article_ids: List[Union[str, int]]):
+        """Drop articles from the index"""
+        params = [(article_id,) for article_id in article_ids]
+        conn.executemany('DELETE FROM near_duplicate_signatures WHERE article_id = ?', params)
+        conn.executemany('DELETE FROM near_duplicate_buckets WHERE article_id = ?', params)
+    
+    def prune(self, conn: sqlite3.Connection, cutoff_ts: int) -> List[Union[str, int]]:
+        """Drop articles published before `cutoff_ts`, return their ids"""
+        expired = [row[0] for row in conn.execute(
+            'SELECT article_id FROM near_duplicate_signatures WHERE published_ts < ?', (cutoff_ts,)
+        )]
+        conn.execute(
+            'DELETE FROM near_duplicate_buckets WHERE article_id IN '
+            '(SELECT article_id FROM near_duplicate_signatures WHERE published_ts < ?)',
+            (cutoff_ts,)
+        )
+        conn.execute('DELETE FROM near_duplicate_signatures WHERE published_ts < ?', (cutoff_ts,))
+        return expired
@@ -0,0 +1,229 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional
+import logging
+from src.database import (
+    ArticleDatabase, ArticleKey, ARTICLE_INDEXES_SQL, ARTICLE_COLUMNS, INSERT_ARTICLE_SQL,
+    create_stats_triggers, merge_table_stats, rebuild_stats, parse_published_date,
+    migrate_published_ts, migrate_canonical_id, migrate_snippet, migrate_category_scores,
+    migrate_classifier_version, migrate_dimensions, detect_key_format, select_articles_sql
+)
+
+# Daily partitions are named articles_pYYYYMMDD (UTC day of published_date)
+PARTITION_PREFIX = 'articles_p'
+
+# Empty table with the article columns; keeps the `articles` view valid
+# even when no partition exists yet
+TEMPLATE_TABLE = 'articles_template'
+
+def partition_day(published_date) -> str:
+    """Return the UTC day (YYYYMMDD) an article's published_date falls into"""
+    return parse_published_date(published_date).strftime('%Y%m%d')
+
+class PartitionedArticleDatabase(ArticleDatabase):
+    """ArticleDatabase that keeps one articles table per day.
+    
+    Reads go through an `articles` view (UNION ALL of the partitions) or are
+    routed to the partitions a time range covers; retention drops whole
+    partitions instead of deleting rows. Batches are written like the base
+    class (one transaction, a savepoint per article), each row routed to
+    its day's partition.
+    """
+    
+    def init_article_storage(self, conn: sqlite3.Connection, version: int):
+        """Create the partition template and `articles` view, migrating a plain articles table"""
+        row = conn.execute("SELECT type FROM sqlite_master WHERE name = 'articles'").fetchone()
+        if version < 7:
+            if row and row[0] == 'view':
+                # Rebuilding the partitions would rewrite the view; it is recreated below
+                conn.execute('DROP VIEW articles')
+            
+            partitions = self.list_partitions(conn)
+            for table in [TEMPLATE_TABLE] + partitions:
+                if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table,)).fetchone():
+                    if version < 2:
+                        migrate_published_ts(conn, table)
+                    if version < 3:
+                        migrate_canonical_id(conn, table)
+                    migrate_snippet(conn, table, self.compressor)
+                    migrate_category_scores(conn, table)
+                    migrate_classifier_version(conn, table)
+                    migrate_dimensions(conn, table, self.table_sql(table))
+            
+            for table in partitions:
+                for statement in ARTICLE_INDEXES_SQL:
+                    conn.execute(statement.format(table=table))
+                create_stats_triggers(conn, table)
+        
+        conn.execute(self.table_sql(TEMPLATE_TABLE))
+        
+        if row and row[0] == 'table':
+            migrate_published_ts(conn, 'articles')
+            migrate_canonical_id(conn, 'articles')
+            migrate_snippet(conn, 'articles', self.compressor)
+            migrate_category_scores(conn, 'articles')
+            migrate_classifier_version(conn, 'articles')
+            migrate_dimensions(conn, 'articles', self.table_sql('articles'))
+            self._migrate_articles_table(conn)
+        elif version < 4:
+            rebuild_stats(conn, self.list_partitions(conn))
+        
+        if version < 6:
+            for table in self.list_partitions(conn):
+                self.score_index.backfill(conn, table)
+        
+        self._refresh_view(conn)
+    
+    def _migrate_articles_table(self, conn: sqlite3.Connection):
+        """Move rows from a single articles table into daily partitions"""
+        days = [row[0] for row in conn.execute(
+            "SELECT DISTINCT strftime('%Y%m%d', COALESCE(published_ts, CAST(strftime('%s', created_at) AS INTEGER)), 'unixepoch') FROM articles"
+        )]
+        
+        columns = ', '.join(ARTICLE_COLUMNS)
+        for day in days:
+            table = self._ensure_partition(conn, day, refresh_view=False)
+            conn.execute(f'''
+                INSERT OR IGNORE INTO {table} ({columns})
+                SELECT {columns} FROM articles
+                WHERE strftime('%Y%m%d', COALESCE(published_ts, CAST(strftime('%s', created_at) AS INTEGER)), 'unixepoch') = ?
+            ''', (day,))
+        
+        conn.execute('DROP TABLE articles')
+        rebuild_stats(conn, self.list_partitions(conn))
+        logging.info(f"Migrated articles table into {len(days)} daily partitions")
+    
+    def detect_key_format(self, conn: sqlite3.Connection) -> Optional[str]:
+        """Key format of the partition template, or of a plain articles table being migrated"""
+        return detect_key_format(conn, TEMPLATE_TABLE) or super().detect_key_format(conn)
+    
+    def list_partitions(self, conn: sqlite3.Connection) -> List[str]:
+        """Return partition table names, newest day first"""
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name DESC",
+            (f'{PARTITION_PREFIX}[0-9]*',)
+        ).fetchall()
+        return [row[0] for row in rows]
+    
+    def _ensure_partition(self, conn: sqlite3.Connection, day: str, refresh_view: bool = True) -> str:
+        """Create the partition for `day` if needed and return its table name"""
+        table = f'{PARTITION_PREFIX}{day}'
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        
+        if not exists:
+            conn.execute(self.table_sql(table))
+            for statement in ARTICLE_INDEXES_SQL:
+                conn.execute(statement.format(table=table))
+            create_stats_triggers(conn, table)
+            if refresh_view:
+                self._refresh_view(conn)
+        
+        return table
+    
+    def _refresh_view(self, conn: sqlite3.Connection):
+        """Recreate the `articles` view over the current partitions"""
+        tables = [TEMPLATE_TABLE] + self.list_partitions(conn)
+        conn.execute('DROP VIEW IF EXISTS articles')
+        columns = ', '.join(ARTICLE_COLUMNS)
+        conn.execute('CREATE VIEW articles AS ' + ' UNION ALL '.join(f'SELECT {columns} FROM {t}' for t in tables))
+    
+    def table_for(self, conn: sqlite3.Connection, published_date) -> str:
+        """Partition a row published at `published_date` is stored in (created if needed)"""
+        return self._ensure_partition(conn, partition_day(published_date))
+    
+    def store_row(self, conn: sqlite3.Connection, article: Dict, row: tuple) -> Optional[tuple]:
+        """Write an article's row into its day's partition, or return None if it duplicates a stored article"""
+        # Unique constraints only hold within one partition, so probe them
+        # all through the view (which sees this batch's earlier rows too)
+        row = self.resolve_key_collision(conn, 'articles', row)
+        if row is None:
+            return None
+        table = self.table_for(conn, article.get('published_date'))
+        return row if conn.execute(INSERT_ARTICLE_SQL.format(table=table), row).rowcount > 0 else None
+    
+    def get_articles(self,
+                    limit: int = 200,
+                    category: Optional[str] = None,
+                    source: Optional[str] = None,
+                    hours_old: Optional[float] = None,
+                    include_duplicates: bool = False,
+                    description_chars: Optional[int] = None,
+                    with_description: bool = True,
+                    min_score: Optional[float] = None,
+                    tag: Optional[str] = None) -> List[Dict]:
+        """Get articles with optional filtering, reading only the partitions needed"""
+        conn = self.connect()
+        conn.row_factory = sqlite3.Row
+        
+        partitions = self.list_partitions(conn)
+        if hours_old is not None:
+            first_day = partition_day(datetime.now(timezone.utc) - timedelta(hours=hours_old))
+            partitions = [t for t in partitions if t[len(PARTITION_PREFIX):] >= first_day]
+        
+        where, params = self.build_filters(category, source, hours_old, include_duplicates, min_score, tag)
+        
+        # Partitions cover disjoint days, so walking them newest first yields
+        # rows in published_ts order and can stop as soon as `limit` is met
+        articles = []
+        for table in partitions:
+            remaining = limit - len(articles)
+            if remaining <= 0:
+                break
+            cursor = conn.execute(
+                f"{select_articles_sql(table, with_description)} WHERE {where} ORDER BY published_ts DESC LIMIT ?",
+                params + [remaining]
+            )
+            articles.extend(self.article_dicts(conn, cursor.fetchall(), description_chars))
+        
+        conn.close()
+        
+        return articles
+    
+    def retention_cutoff(self, days_old: int) -> int:
+        """Epoch seconds of the first day whose partition cleanup_old_articles keeps"""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days_old)
+        return int(cutoff.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+    
+    def release_duplicates(self, conn: sqlite3.Connection, canonical_ids: List[ArticleKey]):
+        """Unlink duplicates whose canonical article expired so they show again"""
+        params = [(article_id,) for article_id in canonical_ids]
+        for table in self.list_partitions(conn):
+            conn.executemany(f"UPDATE {table} SET canonical_id = NULL WHERE canonical_id = ?", params)
+    
+    def cleanup_old_articles(self, days_old: int = 5):
+        """Drop daily partitions that are entirely older than specified days (archiving them if configured)"""
+        cutoff_ts = self.retention_cutoff(days_old)
+        cutoff_day = partition_day(datetime.fromtimestamp(cutoff_ts, timezone.utc))
+        
+        conn = self.connect()
+        expired = [t for t in self.list_partitions(conn) if t[len(PARTITION_PREFIX):] < cutoff_day]
+        
+        deleted_count = 0
+        for table in expired:
+            if self.archive is not None:
+                conn.row_factory = sqlite3.Row
+                rows = self.article_dicts(conn, conn.execute(select_articles_sql(table)))
+                self.archive.archive_articles(rows)
+            deleted_count += conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            # DROP TABLE does not fire the stats triggers
+            merge_table_stats(conn, table, sign=-1)
+            conn.execute(f'DROP TABLE {table}')
+        
+        if expired:
+            self._refresh_view(conn)
+        self.score_index.prune(conn, cutoff_ts)
+        self.tag_index.prune(conn, cutoff_ts)
+        
+        if self.near_duplicates is not None:
+            self.release_duplicates(conn, self.near_duplicates.prune(conn, cutoff_ts))
+        
+        conn.commit()
+        conn.close()
+        
+        if deleted_count:
+            self.forget_seen()
+        
+        logging.info(f"Dropped {len(expired)} partitions ({deleted_count} old articles)")
+        return deleted_count
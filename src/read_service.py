@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import logging
+from typing import Dict, List, Optional
+from src.database import ArticleDatabase, SCHEMA_VERSION
+from src.partitioned_database import PartitionedArticleDatabase
+from src.snapshot import SnapshotArticleDatabase
+from src.classifier import ContentClassifier
+from src.feeds import get_all_feeds
+
+def upgrade_primary(db_path: str):
+    """Bring the primary database up to the current schema (creating it if missing), once, before serving reads"""
+    if os.path.exists(db_path):
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        row = conn.execute("SELECT type FROM sqlite_master WHERE name = 'articles'").fetchone()
+        conn.close()
+        if version >= SCHEMA_VERSION:
+            return
+        storage_class = PartitionedArticleDatabase if row and row[0] == 'view' else ArticleDatabase
+        logging.info(f"Migrating {db_path} from schema version {version} to {SCHEMA_VERSION} before serving it")
+    else:
+        storage_class = ArticleDatabase
+    storage_class(db_path)
+
+class ArticleReadService:
+    """Read-only query side of the aggregator, built once per process and shared by every session.
+    
+    The dashboards keep one in `st.cache_resource` rather than a pickled
+    NewsAggregator per cache hit: it holds no HTTP session, no classifier
+    and no writable database, only a SnapshotArticleDatabase (the
+    published snapshot, or the primary opened `mode=ro` until one exists,
+    migrated first if it predates the current schema) and the source and
+    category names. Every query opens its own connection, and the only
+    shared mutable state (swapping to a newer snapshot) is behind the
+    snapshot reader's lock, so sessions may query it from their own
+    threads at the same time.
+    """
+    
+    def __init__(self, snapshot_path: str, db_path: str = "articles.db", in_memory: bool = False):
+        # Snapshots come from a current writer, but until one is published
+        # reads go to the primary, which the read-only reader never migrates
+        if not os.path.exists(snapshot_path):
+            upgrade_primary(db_path)
+        self.reader = SnapshotArticleDatabase(snapshot_path, db_path, in_memory=in_memory)
+        self.sources = list(get_all_feeds().keys())
+        # Names only; the classifier itself is not kept
+        self.categories = ContentClassifier(cache_size=0).get_categories()
+    
+    def get_recent_articles(self,
+                            limit: int = 200,
+                            category: Optional[str] = None,
+                            source: Optional[str] = None,
+                            hours_old: Optional[float] = None,
+                            description_chars: Optional[int] = None,
+                            with_description: bool = True,
+                            min_score: Optional[float] = None,
+                            tag: Optional[str] = None) -> List[Dict]:
+        """Get recent articles with filtering (same filters as NewsAggregator.get_recent_articles)"""
+        return self.reader.get_articles(
+            limit=limit,
+            category=category,
+            source=source,
+            hours_old=hours_old,
+            description_chars=description_chars,
+            with_description=with_description,
+            min_score=min_score,
+            tag=tag
+        )
+    
+    def get_stats(self) -> Dict:
+        """Get article statistics from the summary tables"""
+        return self.reader.get_stats()
+    
+    def get_sources(self) -> List[str]:
+        """Get list of all sources"""
+        return list(self.sources)
+    
+    def get_categories(self) -> List[str]:
+        """Get list of all categories"""
+        return list(self.categories)
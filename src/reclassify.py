@@ -0,0 +1,227 @@
+import time
+import sqlite3
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from src.database import ArticleDatabase
+from src.partitioned_database import PartitionedArticleDatabase
+from src.sharded_database import ShardedArticleDatabase, shard_paths
+from src.classifier import ContentClassifier, top_category
+from src.bayes_classifier import NaiveBayesClassifier, load_classifier
+from src.feed_tags import TagMapper
+from src.feeds import TAG_CATEGORIES, SOURCE_TAG_CATEGORIES
+
+# Consecutive failed attempts at one chunk before giving up
+MAX_RETRIES = 5
+
+# Classifier of each worker process, built once by _init_worker
+_worker_classifier = None
+
+def build_classifier(model_path: Optional[str], category_keywords: Dict[str, List[str]]) -> ContentClassifier:
+    """Uncached classifier with the given model and keywords (the same version wherever it is built)"""
+    classifier = NaiveBayesClassifier(model_path, cache_size=0) if model_path else ContentClassifier(cache_size=0)
+    classifier.category_keywords = category_keywords
+    classifier.build_matcher()
+    return classifier
+
+def _init_worker(model_path: Optional[str], category_keywords: Dict[str, List[str]]):
+    global _worker_classifier
+    _worker_classifier = build_classifier(model_path, category_keywords)
+
+def _score_batch(texts: List[Tuple[str, str]]) -> List[Dict[str, float]]:
+    return _worker_classifier.score_batch(texts)
+
+class Reclassifier:
+    """Brings stored articles up to the current classifier version in throttled chunks.
+    
+    Every article records the `classifier_version` that scored it. Rows of
+    any other version are read in rowid order, `chunk_size` at a time,
+    scored across a process pool and written back (category, scores,
+    version and the score index) in one short transaction per chunk, with
+    a `pause` after each so the ingest writer and dashboard readers get
+    the database in between. Progress is the data itself: an interrupted
+    run picks up where it stopped, since finished rows carry the new version.
+    With a `tag_mapper`, articles whose stored publisher tags decide their
+    category are settled by the tags, as at ingest, and the version covers
+    the tag mapping too.
+    """
+    
+    def __init__(self, db: ArticleDatabase, classifier: ContentClassifier, chunk_size: int = 1000,
+                 workers: int = 0, pause: float = 0.1, tag_mapper: Optional[TagMapper] = None):
+        self.db = db
+        self.classifier = classifier
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.pause = pause
+        self.tag_mapper = tag_mapper
+        self.version = tag_mapper.stamp(classifier.version) if tag_mapper is not None else classifier.version
+    
+    def targets(self) -> List[Tuple[ArticleDatabase, str]]:
+        """(database, table) pairs holding articles: every shard's articles table or partitions"""
+        targets = []
+        for db in getattr(self.db, 'shards', [self.db]):
+            if isinstance(db, PartitionedArticleDatabase):
+                conn = db.connect()
+                targets.extend((db, table) for table in db.list_partitions(conn))
+                conn.close()
+            else:
+                targets.append((db, 'articles'))
+        return targets
+    
+    def pending(self) -> int:
+        """Articles not yet classified by the current version"""
+        count = 0
+        for db, table in self.targets():
+            conn = db.connect()
+            count += conn.execute(f'SELECT COUNT(*) FROM {table} WHERE classifier_version IS NOT ?',
+                                  (self.version,)).fetchone()[0]
+            conn.close()
+        return count
+    
+    def score(self, texts: List[Tuple[str, str]], pool: Optional[ProcessPoolExecutor]) -> List[Dict[str, float]]:
+        """Category scores of a chunk, split across the pool's workers"""
+        if pool is None:
+            return self.classifier.score_batch(texts)
+        size = -(-len(texts) // self.workers)
+        return [scores for batch in pool.map(_score_batch, [texts[i:i + size] for i in range(0, len(texts), size)])
+                for scores in batch]
+    
+    def step(self, db: ArticleDatabase, table: str, after_rowid: int, pool=None) -> Tuple[int, int, Optional[int]]:
+        """Reclassify the next chunk of `table` after `after_rowid`.
+        
+        Returns (articles rewritten, categories changed, last rowid read or
+        None when the table is done).
+        """
+        conn = db.connect()
+        rows = conn.execute(
+            f'''SELECT a.rowid, a.id, a.title, a.description, a.published_ts, c.name, s.name FROM {table} a
+                LEFT JOIN categories c ON c.id = a.category_id
+                LEFT JOIN sources s ON s.id = a.source_id
+                WHERE a.rowid > ? AND a.classifier_version IS NOT ? ORDER BY a.rowid LIMIT ?''',
+            (after_rowid, self.version, self.chunk_size)
+        ).fetchall()
+        if not rows:
+            conn.close()
+            return 0, 0, None
+        
+        results = [None] * len(rows)
+        if self.tag_mapper is not None:
+            tags = db.tag_index.tags_for(conn, [row[1] for row in rows])
+            results = [self.tag_mapper.scores(row[6], tags.get(row[1], [])) for row in rows]
+        untagged = [i for i, scores in enumerate(results) if scores is None]
+        if untagged:
+            texts = [(rows[i][2], db.compressor.decompress(conn, rows[i][3])) for i in untagged]
+            for i, scores in zip(untagged, self.score(texts, pool)):
+                results[i] = scores
+        
+        updated = changed = 0
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for (rowid, article_id, _, _, published_ts, old_category, _), category_scores in zip(rows, results):
+                category = top_category(category_scores)
+                packed = db.pack_category_scores(conn, {'category': category, 'category_scores': category_scores})
+                cursor = conn.execute(
+                    f'UPDATE {table} SET category_id = ?, category_scores = ?, classifier_version = ? WHERE rowid = ?',
+                    (db.dimension_id(conn, 'category', category), packed, self.version, rowid)
+                )
+                if cursor.rowcount == 0:
+                    # Deleted by retention since it was read
+                    continue
+                db.score_index.remove(conn, [article_id])
+                db.score_index.add(conn, article_id, published_ts, packed)
+                updated += 1
+                changed += category != old_category
+            conn.commit()
+        except sqlite3.OperationalError:
+            conn.rollback()
+            db.forget_write_caches()
+            raise
+        finally:
+            conn.close()
+        
+        return updated, changed, rows[-1][0]
+    
+    def run(self, max_seconds: Optional[float] = None) -> Dict:
+        """Reclassify stale articles until none are left or `max_seconds` have passed"""
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        totals = {'reclassified': 0, 'changed': 0}
+        
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                       initargs=(getattr(self.classifier, 'model_path', None),
+                                                 self.classifier.category_keywords))
+        try:
+            for db, table in self.targets():
+                after_rowid, retries = -1, 0
+                while deadline is None or time.monotonic() < deadline:
+                    try:
+                        updated, changed, last_rowid = self.step(db, table, after_rowid, pool)
+                    except sqlite3.OperationalError as e:
+                        # Busy with the writer; retry the same chunk after a pause
+                        logging.error(f"Error reclassifying {db.db_path} ({table}): {e}")
+                        retries += 1
+                        if retries > MAX_RETRIES:
+                            raise
+                        time.sleep(self.pause * 2 ** retries)
+                        continue
+                    if last_rowid is None:
+                        break
+                    after_rowid, retries = last_rowid, 0
+                    totals['reclassified'] += updated
+                    totals['changed'] += changed
+                    time.sleep(self.pause)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        totals['pending'] = self.pending()
+        logging.info(f"Reclassified {totals['reclassified']} articles to version {self.version} "
+                     f"({totals['changed']} changed category, {totals['pending']} pending)")
+        return totals
+
+def is_partitioned(db_path: str) -> bool:
+    """True if the file keeps its articles in daily partitions (behind an `articles` view)"""
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = 'articles'").fetchone()
+    conn.close()
+    return row is not None and row[0] == 'view'
+
+def open_database(db_path: str, shards: int = 0) -> ArticleDatabase:
+    """Open an article database in whichever layout its files use"""
+    if shards > 1:
+        shard_class = PartitionedArticleDatabase if is_partitioned(shard_paths(db_path, shards)[0]) else ArticleDatabase
+        return ShardedArticleDatabase(db_path, shards, shard_class=shard_class)
+    return PartitionedArticleDatabase(db_path) if is_partitioned(db_path) else ArticleDatabase(db_path)
+
+def main():
+    """Reclassify stored articles with the current classifier"""
+    parser = argparse.ArgumentParser(description="Re-score stored articles classified by an older classifier version")
+    parser.add_argument('db_path', nargs='?', default='articles.db')
+    parser.add_argument('--shards', type=int, default=0, help="shard count, for sharded storage")
+    parser.add_argument('--model', help="naive Bayes model file (default: keyword classifier)")
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=0, help="classifier processes (0: classify in this process)")
+    parser.add_argument('--pause', type=float, default=0.1, help="seconds to yield the database between chunks")
+    parser.add_argument('--max-seconds', type=float, help="stop after this long; the next run resumes")
+    parser.add_argument('--no-tags', action='store_true', help="ignore publisher tags (classifier only)")
+    parser.add_argument('--status', action='store_true', help="only report how many articles are stale")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    # The same choice the aggregator makes, so both stamp the same version
+    classifier = load_classifier(args.model, cache_size=0)
+    tag_mapper = None if args.no_tags else TagMapper(TAG_CATEGORIES, SOURCE_TAG_CATEGORIES)
+    reclassifier = Reclassifier(open_database(args.db_path, args.shards), classifier,
+                                args.chunk_size, args.workers, args.pause, tag_mapper)
+    if args.status:
+        print(f"{reclassifier.pending()} articles not classified by version {reclassifier.version}")
+        return
+    
+    result = reclassifier.run(args.max_seconds)
+    print(f"Reclassified {result['reclassified']} articles ({result['changed']} changed category); "
+          f"{result['pending']} pending")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+import os
+import json
+import time
+import zlib
+import struct
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+from typing import Dict, List, Optional
+from src.database import publish_snapshot
+
+# Changeset layout (whole file zlib-compressed):
+#   MAGIC | header length (u32) | header JSON | (page number (u32) | page bytes)*
+# A ".base" changeset carries every page; a ".diff" only the pages whose
+# content changed since the previous sequence number.
+MAGIC = b'FNPAGES1'
+U32 = struct.Struct('>I')
+DIGEST_SIZE = 16
+
+def _changeset_name(seq: int, full: bool) -> str:
+    return f"{seq:012d}.{'base' if full else 'diff'}"
+
+def _list_changesets(transport_dir: str) -> Dict[int, bool]:
+    """Sequence numbers of the changesets in the transport directory, mapped to whether each is a base"""
+    changesets = {}
+    for name in os.listdir(transport_dir):
+        if name.endswith(('.base', '.diff')):
+            changesets[int(name.split('.')[0])] = name.endswith('.base')
+    return changesets
+
+def read_changeset(path: str):
+    """Return (header, [(page number, page bytes)]) for a changeset file"""
+    with open(path, 'rb') as f:
+        data = zlib.decompress(f.read())
+    if not data.startswith(MAGIC):
+        raise ValueError(f"Not a replication changeset: {path}")
+    
+    offset = len(MAGIC)
+    header_length = U32.unpack_from(data, offset)[0]
+    offset += U32.size
+    header = json.loads(data[offset:offset + header_length])
+    offset += header_length
+    
+    page_size = header['page_size']
+    pages = []
+    while offset < len(data):
+        page_number = U32.unpack_from(data, offset)[0]
+        offset += U32.size
+        pages.append((page_number, data[offset:offset + page_size]))
+        offset += page_size
+    
+    return header, pages
+
+class ReplicationPublisher:
+    """Ships page-level changesets of the primary database to a transport directory.
+    
+    Each `publish()` takes a consistent image of the primary with the backup
+    API, hashes its pages and writes only the pages that differ from the last
+    published image. A full base image is written on the first publish and
+    every `base_every` publishes so new or lagging replicas can catch up.
+    """
+    
+    def __init__(self, db_path: str, transport_dir: str, state_dir: Optional[str] = None,
+                 base_every: int = 48, keep_bases: int = 2):
+        self.db_path = db_path
+        self.transport_dir = transport_dir
+        self.state_dir = state_dir or f"{db_path}.replication"
+        self.base_every = base_every
+        self.keep_bases = keep_bases
+        
+        os.makedirs(self.transport_dir, exist_ok=True)
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.shadow_path = os.path.join(self.state_dir, 'shadow.db')
+        self.manifest_path = os.path.join(self.state_dir, 'manifest')
+        self.seq_path = os.path.join(self.state_dir, 'seq')
+    
+    def _last_seq(self) -> int:
+        try:
+            with open(self.seq_path) as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+    
+    def _write_atomic(self, path: str, data: bytes):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    def publish(self) -> Optional[int]:
+        """Publish the pages changed since the last call, return the new sequence (None if unchanged)"""
+        # A consistent page image regardless of the primary's journal mode
+        publish_snapshot(self.db_path, self.shadow_path)
+        
+        conn = sqlite3.connect(f"file:{self.shadow_path}?immutable=1", uri=True)
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        conn.close()
+        
+        try:
+            with open(self.manifest_path, 'rb') as f:
+                manifest = f.read()
+        except FileNotFoundError:
+            manifest = b''
+        
+        seq = self._last_seq() + 1
+        full = not manifest or (seq - 1) % self.base_every == 0
+        
+        # A changeset shipped just before a crash (local state not advanced)
+        # may already be applied somewhere; never reuse its number, and
+        # resynchronize everyone with a full image
+        while any(os.path.exists(os.path.join(self.transport_dir, _changeset_name(seq, f))) for f in (True, False)):
+            seq += 1
+            full = True
+        
+        digests = []
+        changed = []
+        with open(self.shadow_path, 'rb') as f:
+            page_number = 0
+            while True:
+                page = f.read(page_size)
+                if not page:
+                    break
+                page_number += 1
+                digest = hashlib.blake2b(page, digest_size=DIGEST_SIZE).digest()
+                digests.append(digest)
+                start = (page_number - 1) * DIGEST_SIZE
+                if full or manifest[start:start + DIGEST_SIZE] != digest:
+                    changed.append((page_number, page))
+        
+        page_count = len(digests)
+        if not full and not changed and len(manifest) == page_count * DIGEST_SIZE:
+            return None
+        
+        header = {
+            'seq': seq,
+            'full': full,
+            'page_size': page_size,
+            'page_count': page_count,
+            'published_at': time.time()
+        }
+        header_bytes = json.dumps(header).encode()
+        body = [MAGIC, U32.pack(len(header_bytes)), header_bytes]
+        for page_number, page in changed:
+            body.append(U32.pack(page_number))
+            body.append(page)
+        
+        # Ship the changeset before advancing local state (see above for the
+        # crash in between)
+        self._write_atomic(
+            os.path.join(self.transport_dir, _changeset_name(seq, full)),
+            zlib.compress(b''.join(body), 6)
+        )
+        self._write_atomic(self.manifest_path, b''.join(digests))
+        self._write_atomic(self.seq_path, str(seq).encode())
+        
+        logging.info(f"Published changeset {seq} ({len(changed)}/{page_count} pages{', base' if full else ''})")
+        self.prune()
+        return seq
+    
+    def prune(self):
+        """Drop changesets older than the oldest base image still kept"""
+        bases = sorted(seq for seq, full in _list_changesets(self.transport_dir).items() if full)
+        if len(bases) <= self.keep_bases:
+            return
+        
+        oldest_kept = bases[-self.keep_bases]
+        for name in os.listdir(self.transport_dir):
+            if name.endswith(('.base', '.diff')) and int(name.split('.')[0]) < oldest_kept:
+                os.remove(os.path.join(self.transport_dir, name))
+
+class ReplicaApplier:
+    """Applies changesets from a transport directory to a local replica.
+    
+    The replica file is private to the applier (it is patched in place);
+    dashboards read the snapshot published at `snapshot_path` after each
+    round, e.g. through SnapshotArticleDatabase.
+    """
+    
+    def __init__(self, transport_dir: str, replica_dir: str, snapshot_path: Optional[str] = None):
+        self.transport_dir = transport_dir
+        self.replica_dir = replica_dir
+        os.makedirs(self.replica_dir, exist_ok=True)
+        
+        self.replica_path = os.path.join(replica_dir, 'articles.db')
+        self.snapshot_path = snapshot_path or os.path.join(replica_dir, 'articles.snapshot.db')
+        self.state_path = os.path.join(replica_dir, 'applied.json')
+        self.dirty_path = os.path.join(replica_dir, 'applying')
+        self.metrics_path = os.path.join(replica_dir, 'metrics.json')
+        # Last applied changeset, read from disk once and then kept up to date by _apply
+        self._state = None
+    
+    def _applied(self) -> Dict:
+        if self._state is None:
+            self._state = self._read_state()
+        return self._state
+    
+    def _read_state(self) -> Dict:
+        # An interrupted apply leaves a half-patched file; start over from a base
+        if os.path.exists(self.dirty_path):
+            return {'seq': 0, 'published_at': None}
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'seq': 0, 'published_at': None}
+    
+    def _apply(self, path: str) -> Dict:
+        """Write one changeset's pages into the replica file"""
+        header, pages = read_changeset(path)
+        page_size = header['page_size']
+        
+        # Until the state is written, a failure leaves the replica dirty
+        self._state = None
+        open(self.dirty_path, 'w').close()
+        mode = 'r+b' if os.path.exists(self.replica_path) and not header['full'] else 'wb'
+        with open(self.replica_path, mode) as f:
+            for page_number, page in pages:
+                f.seek((page_number - 1) * page_size)
+                f.write(page)
+            f.truncate(header['page_count'] * page_size)
+            f.flush()
+            os.fsync(f.fileno())
+        
+        state = {'seq': header['seq'], 'published_at': header['published_at']}
+        with open(self.state_path, 'w') as f:
+            json.dump(state, f)
+        os.remove(self.dirty_path)
+        self._state = state
+        return header
+    
+    def apply_pending(self) -> int:
+        """Apply every available changeset after the replica's position, return how many"""
+        applied = self._applied()
+        changesets = _list_changesets(self.transport_dir)
+        bases = sorted(seq for seq, full in changesets.items() if full)
+        
+        plan = []
+        seq = applied['seq']
+        if seq == 0 or (seq + 1 not in changesets and bases and bases[-1] > seq):
+            # Fresh replica or the next diff was pruned: restart from the newest
+            # base. A gap with no newer base is a diff still in transit; wait for it.
+            if not bases:
+                self.write_metrics(changesets)
+                return 0
+            seq = bases[-1]
+            plan.append(_changeset_name(seq, True))
+        
+        while seq + 1 in changesets:
+            seq += 1
+            plan.append(_changeset_name(seq, changesets[seq]))
+        
+        for name in plan:
+            self._apply(os.path.join(self.transport_dir, name))
+        
+        if plan:
+            publish_snapshot(self.replica_path, self.snapshot_path)
+            logging.info(f"Replica applied {len(plan)} changesets (now at {seq})")
+        
+        self.write_metrics(changesets)
+        return len(plan)
+    
+    def lag(self, changesets: Optional[Dict[int, bool]] = None) -> Dict:
+        """Replication lag: changesets behind and seconds since the oldest unapplied one was published.
+        
+        `changesets` is a listing apply_pending already made; without it the
+        transport directory is listed once. Only a replica that is behind
+        reads a changeset header.
+        """
+        applied = self._applied()
+        if changesets is None:
+            changesets = _list_changesets(self.transport_dir)
+        latest = max(changesets, default=0)
+        
+        lag_seconds = 0.0
+        pending = [s for s in changesets if s > applied['seq']]
+        if pending:
+            oldest = min(pending)
+            header, _ = read_changeset(os.path.join(self.transport_dir, _changeset_name(oldest, changesets[oldest])))
+            lag_seconds = time.time() - header['published_at']
+        
+        return {
+            'applied_seq': applied['seq'],
+            'latest_seq': latest,
+            'lag_changesets': max(latest - applied['seq'], 0),
+            'lag_seconds': round(lag_seconds, 3),
+            'last_applied_published_at': applied['published_at']
+        }
+    
+    def write_metrics(self, changesets: Optional[Dict[int, bool]] = None) -> Dict:
+        """Write the current lag to metrics.json for monitoring"""
+        metrics = self.lag(changesets)
+        tmp_path = f"{self.metrics_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(metrics, f)
+        os.replace(tmp_path, self.metrics_path)
+        return metrics
+    
+    def run(self, poll_interval: float = 5.0, stop_event: Optional[threading.Event] = None):
+        """Apply changesets continuously until `stop_event` is set"""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.apply_pending()
+            except Exception as e:
+                logging.error(f"Error applying changesets: {e}")
+            stop_event.wait(poll_interval)
+
+def main():
+    """Run a replica applier against a shared transport directory"""
+    parser = argparse.ArgumentParser(description="Apply replicated article database changesets")
+    parser.add_argument('transport_dir')
+    parser.add_argument('replica_dir')
+    parser.add_argument('--poll-interval', type=float, default=5.0)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    ReplicaApplier(args.transport_dir, args.replica_dir).run(args.poll_interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import hashlib
+from array import array
+from bisect import bisect_left
+from typing import Iterable
+
+def fingerprint(key: str) -> int:
+    """64-bit fingerprint of a key (URL)"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+class SeenSet:
+    """Compact membership set of 64-bit fingerprints.
+    
+    Fingerprints live in a sorted `array('Q')` (8 bytes each, binary
+    searched); new keys go to a small pending set that is merged into the
+    array in batches. Two distinct keys collide with probability ~n²/2^65,
+    negligible for the article volumes here.
+    """
+    
+    def __init__(self, keys: Iterable[str] = (), merge_threshold: int = 4096):
+        self.merge_threshold = merge_threshold
+        self.sorted = array('Q', sorted({fingerprint(k) for k in keys}))
+        self.pending = set()
+    
+    def __len__(self) -> int:
+        return len(self.sorted) + len(self.pending)
+    
+    def __contains__(self, key: str) -> bool:
+        value = fingerprint(key)
+        if value in self.pending:
+            return True
+        i = bisect_left(self.sorted, value)
+        return i < len(self.sorted) and self.sorted[i] == value
+    
+    def add(self, key: str):
+        """Record a key as seen"""
+        self.pending.add(fingerprint(key))
+        if len(self.pending) >= self.merge_threshold:
+            self._merge()
+    
+    def _merge(self):
+        """Fold the pending fingerprints into the sorted array"""
+        merged = array('Q', sorted(set(self.sorted).union(self.pending)))
+        # Publish the new array before dropping the pending set so
+        # concurrent lookups always find a key in one or the other
+        self.sorted = merged
+        self.pending = set()
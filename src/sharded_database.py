@@ -0,0 +1,186 @@
+import os
+import zlib
+import heapq
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+from src.database import ArticleDatabase, ArticleKey, to_epoch
+
+def shard_paths(db_path: str, shard_count: int) -> List[str]:
+    """Files holding the articles of a `shard_count`-way sharded database at `db_path`"""
+    root, ext = os.path.splitext(db_path)
+    return [f"{root}.shard{i}{ext or '.db'}" for i in range(shard_count)]
+
+class ShardedArticleDatabase(ArticleDatabase):
+    """ArticleDatabase spread over N files, with articles hashed by source.
+    
+    Each shard is an independent database file with its own writer, so
+    batches for different shards are written concurrently. Reads fan out to
+    the shards and merge: get_articles does a k-way merge on published_ts and
+    get_stats sums the per-shard aggregates. The file at `db_path` keeps the
+    shared tables (sources, and the near-duplicate index, since syndicated
+    copies of a story come from sources in different shards).
+    
+    Near-duplicate links may cross shards. Only the catalog creates,
+    repairs and releases them, for every shard at once; shard reads only
+    test `canonical_id IS NULL`, which needs no local canonical row, and
+    get_duplicates looks for a story's copies in every shard.
+    """
+    
+    def __init__(self, db_path: str = "articles.db", shard_count: int = 4, archive=None,
+                 shard_class=ArticleDatabase, compress_descriptions: bool = False):
+        self.shards = [
+            shard_class(path, archive=archive, near_duplicates=False, compress_descriptions=compress_descriptions)
+            for path in shard_paths(db_path, shard_count)
+        ]
+        # The catalog's near-duplicate index refers to shard article ids
+        super().__init__(db_path, archive=archive, key_format=self.shards[0].key_format)
+    
+    # Articles, and the stats, scores and tags kept with them, live in the
+    # shard files; the catalog file holds sources and the near-duplicate index
+    stores_articles = False
+    
+    def shard_for(self, source: str) -> ArticleDatabase:
+        """Return the shard owning `source` (stable across processes and restarts)"""
+        return self.shards[zlib.crc32(source.encode()) % len(self.shards)]
+    
+    def is_known(self, url: str) -> bool:
+        """True if any shard already stores this URL"""
+        return any(shard.is_known(url) for shard in self.shards)
+    
+    def insert_article(self, article: Dict) -> bool:
+        """Insert new article into its source's shard, return True if successful"""
+        return self.insert_articles([article])[0]
+    
+    def insert_articles(self, articles: List[Dict]) -> List[bool]:
+        """Insert a batch, writing each shard's share concurrently"""
+        # Link near-duplicates against the shared index first; new stories
+        # are indexed up front so later copies in the same batch match them
+        conn = self.connect()
+        try:
+            articles = list(articles)
+            indexed = {}
+            for position, article in enumerate(articles):
+                if self.is_known(article['url']):
+                    continue
+                try:
+                    article, signature = self.link_near_duplicate(conn, article)
+                    if signature is not None:
+                        article_id = self.generate_article_id(article['title'], article['url'])
+                        self.near_duplicates.add(conn, article_id, to_epoch(article.get('published_date')), signature)
+                        indexed[position] = article_id
+                except Exception as e:
+                    # Left unlinked; its shard logs and skips it if it cannot be stored either
+                    logging.error(f"Error linking article {article.get('url')}: {e}")
+                    continue
+                articles[position] = article
+            
+            by_shard = {}
+            for position, article in enumerate(articles):
+                by_shard.setdefault(id(self.shard_for(article['source'])), []).append(position)
+            
+            shards = {id(shard): shard for shard in self.shards}
+            inserted = [False] * len(articles)
+            with ThreadPoolExecutor(max_workers=len(by_shard) or 1) as executor:
+                futures = {
+                    executor.submit(shards[key].insert_articles, [articles[p] for p in positions]): positions
+                    for key, positions in by_shard.items()
+                }
+                for future, positions in futures.items():
+                    for position, result in zip(positions, future.result()):
+                        inserted[position] = result
+            
+            failed = [article_id for position, article_id in indexed.items() if not inserted[position]]
+            self.near_duplicates.remove(conn, failed)
+            # Later copies in the batch may already be stored, linked to a
+            # story that was not; unlink them so they are not hidden
+            orphaned = set(failed) & {article.get('canonical_id') for article in articles}
+            if orphaned:
+                for shard in self.shards:
+                    shard_conn = shard.connect()
+                    shard.release_duplicates(shard_conn, list(orphaned))
+                    shard_conn.commit()
+                    shard_conn.close()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        return inserted
+    
+    def get_articles(self, 
+                    limit: int = 200,
+                    category: Optional[str] = None,
+                    source: Optional[str] = None,
+                    hours_old: Optional[float] = None,
+                    include_duplicates: bool = False,
+                    description_chars: Optional[int] = None,
+                    with_description: bool = True,
+                    min_score: Optional[float] = None,
+                    tag: Optional[str] = None) -> List[Dict]:
+        """Get articles with optional filtering, k-way merged across shards"""
+        shards = [self.shard_for(source)] if source else self.shards
+        
+        # Each shard returns its newest `limit` rows already sorted, so a
+        # lazy merge of the sorted runs yields the global newest `limit`
+        runs = [shard.get_articles(limit=limit, category=category, source=source, hours_old=hours_old,
+                                   include_duplicates=include_duplicates, description_chars=description_chars,
+                                   with_description=with_description, min_score=min_score, tag=tag)
+                for shard in shards]
+        merged = heapq.merge(*runs, key=lambda a: a.get('published_ts') or 0, reverse=True)
+        
+        return list(itertools.islice(merged, limit))
+    
+    def get_duplicates(self, article_id: ArticleKey) -> List[Dict]:
+        """Get the near-duplicates linked to a canonical article from every shard, oldest first"""
+        duplicates = [article for shard in self.shards for article in shard.get_duplicates(article_id)]
+        return sorted(duplicates, key=lambda a: a.get('published_ts') or 0)
+    
+    def cleanup_old_articles(self, days_old: int = 5):
+        """Remove articles older than specified days from every shard"""
+        deleted_count = sum(shard.cleanup_old_articles(days_old) for shard in self.shards)
+        
+        conn = self.connect()
+        expired = self.near_duplicates.prune(conn, self.shards[0].retention_cutoff(days_old))
+        for shard in self.shards:
+            shard_conn = shard.connect()
+            shard.release_duplicates(shard_conn, expired)
+            shard_conn.commit()
+            shard_conn.close()
+        conn.commit()
+        conn.close()
+        
+        return deleted_count
+    
+    def publish_snapshot(self, snapshot_path: str):
+        """Refused: the inherited copy would snapshot only the shared index file, not the shards"""
+        raise ValueError("Snapshots and replication need single-file storage; drop shards")
+    
+    def get_stats(self) -> Dict:
+        """Get database statistics summed over the shards"""
+        total_articles = 0
+        recent_count = 0
+        category_counts = {}
+        source_counts = {}
+        
+        for shard in self.shards:
+            stats = shard.get_stats()
+            total_articles += stats['total_articles']
+            recent_count += stats['recent_articles_24h']
+            for category, count in stats['by_category'].items():
+                category_counts[category] = category_counts.get(category, 0) + count
+            # A source lives in exactly one shard, so the global top 10 is
+            # contained in the union of the per-shard top 10s
+            source_counts.update(stats['top_sources'])
+        
+        top_sources = dict(sorted(source_counts.items(), key=lambda item: item[1], reverse=True)[:10])
+        
+        return {
+            'total_articles': total_articles,
+            'recent_articles_24h': recent_count,
+            'by_category': dict(sorted(category_counts.items())),
+            'top_sources': top_sources
+        }
@@ -0,0 +1,165 @@
+import os
+import sqlite3
+import threading
+import itertools
+import logging
+from typing import List, Dict
+from src.database import ArticleDatabase, DEFAULT_KEY_FORMAT, detect_key_format
+from src.partitioned_database import TEMPLATE_TABLE
+
+# Distinct names for shared-cache in-memory databases in this process
+_generation = itertools.count()
+
+# How far the primary may run ahead of the snapshot (an ingest cycle writes
+# for a while before publishing) before the reader warns that it is stale
+STALE_SNAPSHOT_SECONDS = 3600.0
+
+# Snapshot version whose key format has not been read yet
+_UNDETECTED = object()
+
+class SnapshotArticleDatabase(ArticleDatabase):
+    """Read-only ArticleDatabase serving queries from a published snapshot.
+    
+    The ingest side calls `ArticleDatabase.publish_snapshot` after each cycle;
+    this reader notices the new file on its next query and switches to it. By
+    default each query opens the snapshot with `immutable=1`, so SQLite takes
+    no locks at all. With `in_memory=True` the snapshot is loaded once into a
+    shared-cache `:memory:` database and queries never touch the disk.
+    
+    A snapshot that falls more than `stale_after` seconds behind the primary
+    (ingest running without `snapshot_path`, or publishing failing) is still
+    served, but logged once per snapshot file.
+    
+    Nothing is created or migrated here; the key format is read from the
+    file being served when it is opened, and again whenever a new snapshot
+    replaces it (e.g. after the primary was migrated to other keys).
+    """
+    
+    def __init__(self, snapshot_path: str, db_path: str = "articles.db", in_memory: bool = False,
+                 stale_after: float = STALE_SNAPSHOT_SECONDS):
+        self.snapshot_path = snapshot_path
+        self.in_memory = in_memory
+        self.stale_after = stale_after
+        
+        self._lock = threading.Lock()
+        self._stale_version = None
+        self._loaded_version = None
+        self._memory_uri = None
+        self._memory_anchor = None
+        self._key_version = _UNDETECTED
+        
+        # Queries fall back to a read-only view of the primary until a
+        # snapshot has been published
+        super().__init__(db_path)
+    
+    def __getstate__(self):
+        # Locks and the in-memory anchor connection are per process; a copy
+        # (e.g. from st.cache_data pickling) reloads the snapshot on first use
+        state = super().__getstate__()
+        state.update(_lock=None, _loaded_version=None, _memory_uri=None, _memory_anchor=None, _key_version=None)
+        return state
+    
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._lock = threading.Lock()
+        self._key_version = _UNDETECTED
+    
+    def init_database(self):
+        """Snapshots are produced by the writer; only read the key format of the file being served"""
+        try:
+            self.connect().close()
+        except sqlite3.OperationalError as e:
+            # Neither a snapshot nor the primary yet; detected on the first query
+            logging.warning(f"No snapshot or primary database to read yet: {e}")
+    
+    def _detect_key_format(self, conn: sqlite3.Connection, version):
+        """Read the key format of a newly opened snapshot (or of the primary until one exists)"""
+        key_format = detect_key_format(conn, TEMPLATE_TABLE) or detect_key_format(conn, 'articles')
+        self.key_format = key_format or DEFAULT_KEY_FORMAT
+        self._key_version = version
+    
+    def _snapshot_version(self):
+        """Identify the currently published snapshot file (None if missing)"""
+        try:
+            stat = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def snapshot_lag(self) -> float:
+        """Seconds the primary (including its WAL) was modified after the snapshot, 0 if not behind"""
+        try:
+            snapshot_mtime = os.stat(self.snapshot_path).st_mtime
+        except FileNotFoundError:
+            return 0.0
+        primary_mtime = 0.0
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            try:
+                primary_mtime = max(primary_mtime, os.stat(path).st_mtime)
+            except FileNotFoundError:
+                pass
+        return max(0.0, primary_mtime - snapshot_mtime)
+    
+    def _check_stale(self, version):
+        """Log (once per snapshot file) when the snapshot has fallen behind the primary"""
+        if version == self._stale_version:
+            return
+        lag = self.snapshot_lag()
+        if lag > self.stale_after:
+            self._stale_version = version
+            logging.warning(f"Read snapshot {self.snapshot_path} is {lag / 3600:.1f}h older than {self.db_path}; "
+                            f"is ingest running without snapshot_path?")
+    
+    def _load_into_memory(self, version):
+        """Copy the snapshot into a fresh shared in-memory database and swap to it"""
+        uri = f"file:article_snapshot_{next(_generation)}?mode=memory&cache=shared"
+        anchor = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        
+        source = sqlite3.connect(f"file:{self.snapshot_path}?immutable=1", uri=True)
+        source.backup(anchor)
+        source.close()
+        
+        # The anchor keeps the in-memory database alive; dropping the old one
+        # frees it once in-flight queries close their connections
+        old_anchor = self._memory_anchor
+        self._memory_uri, self._memory_anchor = uri, anchor
+        self._loaded_version = version
+        if old_anchor is not None:
+            old_anchor.close()
+        
+        logging.info(f"Loaded read snapshot {self.snapshot_path} into memory")
+    
+    def connect(self) -> sqlite3.Connection:
+        """Open a lock-free connection to the newest published snapshot"""
+        version = self._snapshot_version()
+        
+        if version is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        elif not self.in_memory:
+            self._check_stale(version)
+            conn = sqlite3.connect(f"file:{self.snapshot_path}?immutable=1", uri=True)
+        else:
+            self._check_stale(version)
+            with self._lock:
+                if version != self._loaded_version:
+                    self._load_into_memory(version)
+                conn = sqlite3.connect(self._memory_uri, uri=True)
+        
+        if version != self._key_version:
+            self._detect_key_format(conn, version)
+        return conn
+    
+    def insert_article(self, article: Dict) -> bool:
+        raise PermissionError("Read snapshots cannot be written to; insert through the primary database")
+    
+    def insert_articles(self, articles: List[Dict]) -> List[bool]:
+        raise PermissionError("Read snapshots cannot be written to; insert through the primary database")
+    
+    def insert_source(self, name: str, url: str, rss_url: str, category: str = None):
+        raise PermissionError("Read snapshots cannot be written to; insert through the primary database")
+    
+    def cleanup_old_articles(self, days_old: int = 5):
+        raise PermissionError("Read snapshots cannot be written to; clean up through the primary database")
+    
+    def publish_snapshot(self, snapshot_path: str):
+        raise PermissionError("Publish snapshots from the primary database")
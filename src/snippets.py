@@ -0,0 +1,65 @@
+import re
+from html.parser import HTMLParser
+from typing import Optional
+
+# Characters of plain text kept for article cards
+SNIPPET_CHARS = 200
+
+# Elements whose content is never shown
+HIDDEN_TAGS = {'script', 'style', 'noscript', 'template', 'head', 'title'}
+
+# Elements that run inline with their text; every other tag separates words
+INLINE_TAGS = {'a', 'abbr', 'b', 'cite', 'code', 'em', 'i', 'mark', 'q', 's', 'small', 'span', 'strong', 'sub', 'sup', 'u'}
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+class _TextExtractor(HTMLParser):
+    """Collects the visible text of an HTML fragment, entities decoded"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.hidden = 0
+    
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_TAGS:
+            self.hidden += 1
+        elif tag not in INLINE_TAGS:
+            self.parts.append(' ')
+    
+    def handle_startendtag(self, tag, attrs):
+        if tag not in INLINE_TAGS:
+            self.parts.append(' ')
+    
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TAGS:
+            self.hidden = max(self.hidden - 1, 0)
+        elif tag not in INLINE_TAGS:
+            self.parts.append(' ')
+    
+    def handle_data(self, data):
+        if not self.hidden:
+            self.parts.append(data)
+
+def plain_text(html_text: str) -> str:
+    """Visible text of an HTML fragment with entities decoded and whitespace collapsed"""
+    parser = _TextExtractor()
+    parser.feed(html_text)
+    parser.close()
+    return WHITESPACE_RE.sub(' ', ''.join(parser.parts)).strip()
+
+def make_snippet(html_text: Optional[str], max_chars: int = SNIPPET_CHARS) -> Optional[str]:
+    """Plain-text snippet of a description, cut at a word boundary with an ellipsis"""
+    if not html_text:
+        return None
+    
+    text = plain_text(html_text)
+    if len(text) <= max_chars:
+        return text or None
+    
+    cut = text[:max_chars + 1]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    else:
+        cut = cut[:max_chars]
+    return cut.rstrip(' ,;:.-') + '…'
@@ -14,13 +14,15 @@ else
 fi
 
 # Check if database exists and has data
-if [ ! -f "articles.db" ]; then
+if [ ! -f "${ARTICLES_DB_PATH:-articles.db}" ]; then
     echo "📊 Database not found. Running initial aggregation..."
     python -c "
 from src.aggregator import NewsAggregator
+from src.config import AggregatorConfig
 import sys
 try:
-    agg = NewsAggregator()
+    # Same ARTICLES_* settings as the dashboard, so it serves what this loads
+    agg = NewsAggregator(AggregatorConfig.from_env())
     print(f'📡 Fetching from {len(agg.feeds)} sources...')
     new = agg.fetch_all_feeds()
     stats = agg.get_stats()
@@ -3,16 +3,26 @@ import pandas as pd
 from datetime import datetime, timedelta
 import sys
 import os
+import threading
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 try:
     from aggregator import NewsAggregator
+    from config import AggregatorConfig
+    from read_service import ArticleReadService
+    from category_scores import DEFAULT_MIN_SCORE
+    from article_cards import paginate, render_articles
     AGGREGATOR_AVAILABLE = True
 except ImportError:
     AGGREGATOR_AVAILABLE = False
 
+# Dashboard queries use the read snapshot published after every ingest cycle
+# (ARTICLES_SNAPSHOT_PATH) instead of competing with the writer for the
+# database. Replica nodes point it at the snapshot their ReplicaApplier publishes.
+CONFIG = AggregatorConfig.from_env() if AGGREGATOR_AVAILABLE else None
+
 st.set_page_config(
     page_title="Fashion & Beauty News Aggregator",
     page_icon="👗",
@@ -32,6 +42,9 @@ st.markdown("""
         padding: 1rem; 
         margin-bottom: 0.5rem;
         transition: all 0.3s ease;
+        /* Off-screen cards of the page are still built, but skipped by layout and paint */
+        content-visibility: auto;
+        contain-intrinsic-size: auto 160px;
     }
     .article-card:hover {
         background: rgba(30, 41, 59, 0.8);
@@ -100,52 +113,36 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def format_time_ago(published_date):
-    if not published_date:
-        return "Unknown time"
-    try:
-        if isinstance(published_date, str):
-            pub_date = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
-        else:
-            pub_date = published_date
-        now = datetime.now(pub_date.tzinfo) if pub_date.tzinfo else datetime.now()
-        diff = now - pub_date
-        
-        # More precise time formatting for micro-targeting
-        total_minutes = diff.total_seconds() / 60
-        
-        if diff.days > 0:
-            return f"{diff.days} day{'s' if diff.days > 1 else ''} ago"
-        elif total_minutes >= 60:
-            hours = int(total_minutes // 60)
-            remaining_minutes = int(total_minutes % 60)
-            if remaining_minutes > 0 and hours < 12:  # Show minutes for recent articles
-                return f"{hours}h {remaining_minutes}m ago"
-            else:
-                return f"{hours} hour{'s' if hours > 1 else ''} ago"
-        elif total_minutes >= 1:
-            minutes = int(total_minutes)
-            return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
-        else:
-            return "Just now"
-    except:
-        return "Unknown time"
+# Built once per process and shared by every session: queries go through
+# the read-only service, fetches through the one ingest aggregator
+@st.cache_resource
+def _read_service():
+    return ArticleReadService(CONFIG.snapshot_path, CONFIG.db_path, in_memory=CONFIG.in_memory_snapshot)
 
-@st.cache_data(ttl=1800)
-def load_aggregator():
+@st.cache_resource
+def _ingest_aggregator():
+    return NewsAggregator(CONFIG), threading.Lock()
+
+def load_read_service():
     if not AGGREGATOR_AVAILABLE:
         return None
     try:
-        return NewsAggregator()
+        return _read_service()
     except Exception as e:
         st.error(f"Error loading aggregator: {e}")
         return None
 
+def fetch_feeds():
+    """Fetch all feeds with the shared aggregator, one session at a time"""
+    aggregator, lock = _ingest_aggregator()
+    with lock:
+        return aggregator.fetch_all_feeds()
+
 @st.cache_data(ttl=600)  # Reduced cache time for more frequent updates on short time ranges
-def get_articles_data(category_filter, source_filter, time_filter, limit):
-    aggregator = load_aggregator()
-    if not aggregator:
-        return [], {}, [], []
+def get_articles_data(category_filter, source_filter, time_filter, limit, related=False):
+    service = load_read_service()
+    if not service:
+        return []
     
     # More precise time filtering with minutes for micro-targeting
     hours_old = None
@@ -166,18 +163,32 @@ def get_articles_data(category_filter, source_filter, time_filter, limit):
     elif time_filter == "3 days":
         hours_old = 72
     
-    articles = aggregator.get_recent_articles(
+    articles = service.get_recent_articles(
         limit=limit,
         category=category_filter if category_filter != "All Categories" else None,
         source=source_filter if source_filter != "All Sources" else None,
-        hours_old=hours_old
+        hours_old=hours_old,
+        with_description=False,
+        # Opt-in: also list articles filed elsewhere that score high in the category
+        min_score=DEFAULT_MIN_SCORE if related else None
     )
     
-    stats = aggregator.get_stats()
-    sources = aggregator.get_sources()
-    categories = aggregator.get_categories()
-    
-    return articles, stats, sources, categories
+    return articles
+
+@st.cache_data(ttl=60)
+def get_stats_data():
+    service = load_read_service()
+    if not service:
+        return {}
+    # Served from the summary tables, so this stays cheap as the DB grows
+    return service.get_stats()
+
+@st.cache_data(ttl=1800)
+def get_filter_options():
+    service = load_read_service()
+    if not service:
+        return [], []
+    return service.get_sources(), service.get_categories()
 
 def main():
     st.markdown('<h1 class="stTitle">👗 Fashion & Beauty News Aggregator</h1>', unsafe_allow_html=True)
@@ -186,10 +197,10 @@ def main():
     # Success banner
     st.success("✅ Successfully deployed on Streamlit Cloud! Free fashion news aggregation is live!")
     
-    # Load aggregator
-    aggregator = load_aggregator()
+    # Load the shared read service
+    service = load_read_service()
     
-    if not aggregator:
+    if not service:
         st.info("🚀 Initializing news aggregator for first time...")
         
         # Show what we're building while initializing
@@ -206,8 +217,7 @@ def main():
         try:
             if AGGREGATOR_AVAILABLE:
                 with st.spinner("Fetching latest articles from fashion sources..."):
-                    aggregator = NewsAggregator()
-                    new_articles = aggregator.fetch_all_feeds()
+                    new_articles = fetch_feeds()
                 st.success(f"✅ Loaded {new_articles} articles!")
                 st.rerun()
             else:
@@ -226,11 +236,15 @@ def main():
         
         # Get data for filters
         try:
-            _, stats, sources, categories = get_articles_data("All Categories", "All Sources", "All time", 10)
+            sources, categories = get_filter_options()
+            stats = get_stats_data()
             
             # Category filter
             category_options = ["All Categories"] + categories
             category_filter = st.selectbox("🏷️ Category", category_options, index=0)
+            related = st.checkbox("Include related articles", value=False,
+                                  help="Also list articles filed under another category that mention this one often",
+                                  disabled=category_filter == "All Categories")
             
             # Source filter  
             source_options = ["All Sources"] + sorted(sources)
@@ -243,7 +257,7 @@ def main():
             st.markdown("### 📈 Statistics")
             st.metric("Total Articles", stats.get('total_articles', 0))
             st.metric("Last 24 Hours", stats.get('recent_articles_24h', 0))
-            
+        
         except Exception as e:
             st.error(f"Error loading filters: {e}")
             return
@@ -255,7 +269,7 @@ def main():
         if st.button("🔄 Refresh Articles", type="primary"):
             st.cache_data.clear()
             try:
-                new_articles = aggregator.fetch_all_feeds()
+                new_articles = fetch_feeds()
                 st.success(f"✅ Added {new_articles} new articles!")
             except Exception as e:
                 st.error(f"Error refreshing: {e}")
@@ -266,57 +280,22 @@ def main():
     
     # Load articles
     try:
-        articles, stats, sources, categories = get_articles_data(category_filter, source_filter, time_filter, article_limit)
+        articles = get_articles_data(category_filter, source_filter, time_filter, article_limit, related)
         
         if not articles:
             st.warning("No articles found. Try refreshing or adjusting filters.")
             return
         
-        # Display articles
-        for article in articles:
-            # Check if article is very fresh (under 2 hours)
-            is_fresh = False
-            fresh_indicator = ""
-            if article.get('published_date'):
-                try:
-                    if isinstance(article['published_date'], str):
-                        pub_date = datetime.fromisoformat(article['published_date'].replace('Z', '+00:00'))
-                    else:
-                        pub_date = article['published_date']
-                    now = datetime.now(pub_date.tzinfo) if pub_date.tzinfo else datetime.now()
-                    hours_diff = (now - pub_date).total_seconds() / 3600
-                    
-                    if hours_diff <= 1:
-                        is_fresh = True
-                        fresh_indicator = ' <span style="background: #EF4444; color: white; padding: 0.2rem 0.4rem; border-radius: 10px; font-size: 0.7rem; font-weight: bold;">🔥 HOT</span>'
-                    elif hours_diff <= 2:
-                        fresh_indicator = ' <span style="background: #F59E0B; color: white; padding: 0.2rem 0.4rem; border-radius: 10px; font-size: 0.7rem; font-weight: bold;">✨ NEW</span>'
-                except:
-                    pass
-            
-            card_class = "article-card" + (" fresh-article" if is_fresh else "")
-            st.markdown(f'<div class="{card_class}">', unsafe_allow_html=True)
-            st.markdown(f'<div class="article-title">{article["title"]}{fresh_indicator}</div>', unsafe_allow_html=True)
-            
-            time_ago = format_time_ago(article.get('published_date'))
-            st.markdown(
-                f'<div class="article-meta">'
-                f'<span class="article-source">{article["source"]}</span> • {time_ago} • '
-                f'<span class="article-category">{article.get("category", "Uncategorized")}</span>'
-                f'</div>',
-                unsafe_allow_html=True
-            )
-            
-            if article.get('description'):
-                description = article['description'][:200] + "..." if len(article['description']) > 200 else article['description']
-                st.markdown(f'<div class="article-description">{description}</div>', unsafe_allow_html=True)
-            
-            st.markdown(f'<a href="{article["url"]}" target="_blank" class="read-more-btn">Read Full Article →</a>', unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
-            
+        # Display one page of articles as a single element
+        page_count = paginate(articles, 1)[1]
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1) if page_count > 1 else 1
+        page_articles, page_count = paginate(articles, page)
+        st.markdown(render_articles(page_articles, badges=True, precise_times=True), unsafe_allow_html=True)
+        
         # Stats
         st.markdown(f"---")
-        st.markdown(f"**Showing {len(articles)} articles** (filtered from {stats.get('total_articles', 0)} total)")
+        st.markdown(f"**Showing {len(page_articles)} of {len(articles)} articles** (page {page} of {page_count}, "
+                    f"filtered from {stats.get('total_articles', 0)} total)")
         
         if stats.get('by_category'):
             st.markdown("### 📊 Articles by Category")
@@ -325,10 +304,10 @@ def main():
                 for cat, count in stats['by_category'].items()
             ])
             st.bar_chart(category_df.set_index('Category'))
-            
+    
     except Exception as e:
         st.error(f"Error loading articles: {e}")
-
+    
     # Footer
     st.markdown("---")
     st.info("🎉 **Deployed FREE on Streamlit Cloud** | Full-featured fashion news aggregator with 50+ international sources")
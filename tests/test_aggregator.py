@@ -0,0 +1,116 @@
+import pytest
+
+pytest.importorskip('feedparser')
+pytest.importorskip('requests')
+
+from src.aggregator import NewsAggregator
+from src.config import AggregatorConfig
+from src.partitioned_database import PartitionedArticleDatabase
+from src.sharded_database import ShardedArticleDatabase
+from src.snapshot import SnapshotArticleDatabase
+
+RSS = b'''<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Vogue</title>
+<item><title>Chanel couture luxury handbag collection</title><link>https://vogue.example/1</link>
+  <description>A luxury house shows haute couture.</description>
+  <category>Skincare</category><category>skincare</category><category>Beauty</category></item>
+<item><title>Retail store opening at the mall</title><link>https://vogue.example/2</link>
+  <description>A flagship store.</description></item>
+<item><title>Sephora lipstick and mascara launch</title><link>https://vogue.example/3</link>
+  <description>New makeup.</description>
+  <category>Beauty</category><category>Luxury</category></item>
+</channel></rss>'''
+
+class FakeResponse:
+    content = RSS
+    
+    def raise_for_status(self):
+        pass
+
+class FakeSession:
+    def __init__(self):
+        self.requests = 0
+    
+    def get(self, url, timeout=None):
+        self.requests += 1
+        return FakeResponse()
+
+@pytest.fixture
+def aggregator(tmp_path):
+    aggregator = NewsAggregator(db_path=str(tmp_path / 'articles.db'))
+    aggregator.feeds = {'Vogue': 'https://vogue.example/rss'}
+    aggregator.session = FakeSession()
+    return aggregator
+
+def test_tag_decided_entries_skip_the_classifier(aggregator):
+    classified = []
+    score_many = aggregator.classifier.score_many
+    def recording_score_many(texts, content_hashes=None):
+        texts = list(texts)
+        classified.extend(title for title, _ in texts)
+        return score_many(texts, content_hashes)
+    aggregator.classifier.score_many = recording_score_many
+    
+    assert aggregator.fetch_all_feeds() == 3
+    
+    # The tied entry (Beauty vs Luxury) and the untagged one are classified
+    assert classified == ['Retail store opening at the mall', 'Sephora lipstick and mascara launch']
+    by_url = {a['url']: a for a in aggregator.db.get_articles()}
+    assert by_url['https://vogue.example/1']['category'] == 'Beauty'
+    assert by_url['https://vogue.example/1']['category_scores'] == {'Beauty': 1.0}
+    assert by_url['https://vogue.example/2']['category'] == 'Retail'
+    assert by_url['https://vogue.example/3']['category'] == 'Beauty'
+    assert {a['classifier_version'] for a in by_url.values()} == {aggregator.classifier_version}
+    
+    assert [a['url'] for a in aggregator.db.get_articles(tag='SKINCARE')] == ['https://vogue.example/1']
+    conn = aggregator.db.connect()
+    assert aggregator.db.tag_index.tags_for(conn, [by_url['https://vogue.example/1']['id']]) == {
+        by_url['https://vogue.example/1']['id']: ['Beauty', 'Skincare']
+    }
+    conn.close()
+
+def test_known_entries_are_skipped_before_parsing(aggregator, monkeypatch):
+    assert aggregator.fetch_all_feeds() == 3
+    
+    parsed = []
+    parse_feed_date = aggregator.parse_feed_date
+    monkeypatch.setattr(aggregator, 'parse_feed_date', lambda entry: parsed.append(entry.link) or parse_feed_date(entry))
+    
+    assert aggregator.fetch_single_feed('Vogue', 'https://vogue.example/rss') == []
+    assert parsed == []
+    assert aggregator.session.requests == 2
+    
+    # Only the entry that is not stored yet is parsed and returned
+    aggregator.db.forget_seen()
+    conn = aggregator.db.connect()
+    conn.execute("DELETE FROM articles WHERE url = 'https://vogue.example/2'")
+    conn.commit()
+    conn.close()
+    articles = aggregator.fetch_single_feed('Vogue', 'https://vogue.example/rss')
+    assert [a['url'] for a in articles] == parsed == ['https://vogue.example/2']
+
+def test_aggregator_is_wired_from_config(tmp_path):
+    config = AggregatorConfig.from_env({
+        'ARTICLES_DB_PATH': str(tmp_path / 'articles.db'),
+        'ARTICLES_PARTITIONED': '1',
+        'ARTICLES_SNAPSHOT_PATH': str(tmp_path / 'articles.snapshot.db'),
+        'ARTICLES_ARCHIVE_DIR': str(tmp_path / 'archive'),
+        'ARTICLES_RETENTION_DAYS': '3',
+    })
+    aggregator = NewsAggregator(config)
+    
+    assert isinstance(aggregator.db, PartitionedArticleDatabase)
+    assert isinstance(aggregator.reader, SnapshotArticleDatabase)
+    assert aggregator.reader.snapshot_path == config.snapshot_path
+    assert aggregator.archive.archive_dir == str(tmp_path / 'archive')
+    assert aggregator.retention_days == 3 and aggregator.publisher is None
+    
+    # Keyword options override single fields of the config
+    sharded = NewsAggregator(config, db_path=str(tmp_path / 'sharded.db'), shards=2, snapshot_path=None)
+    assert isinstance(sharded.db, ShardedArticleDatabase)
+    assert sharded.reader is sharded.db
+    assert [c.db_path for c in sharded.compactors][0] == str(tmp_path / 'sharded.db')
+    assert len(sharded.compactors) == 3
+    assert sharded.config.retention_days == 3
+    with pytest.raises(ValueError, match='single-file storage'):
+        NewsAggregator(config, shards=2)
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+import pytest
+
+pytest.importorskip('duckdb')
+pytest.importorskip('pandas')
+
+from src.analytics import AnalyticsStore
+from src.classifier import ContentClassifier
+from src.database import ArticleDatabase
+from src.reclassify import Reclassifier
+from src.sharded_database import ShardedArticleDatabase
+
+def make_articles(count=6):
+    return [
+        {
+            'title': f'Zorblax story {i}',
+            'url': f'https://example.com/analytics/{i}',
+            'description': 'description',
+            'published_date': datetime.now(timezone.utc),
+            'source': f'Source {i % 3}',
+            'category': 'Beauty',
+        }
+        for i in range(count)
+    ]
+
+def category_totals(store):
+    frame = store.volume_by_category(days=2)
+    return frame.groupby('category')['articles'].sum().to_dict()
+
+def test_sync_picks_up_new_and_reclassified_rows(tmp_path):
+    db = ArticleDatabase(str(tmp_path / 'articles.db'))
+    db.insert_articles(make_articles())
+    store = AnalyticsStore(str(tmp_path / 'analytics.duckdb'), db.db_path)
+    
+    assert store.sync() == 6
+    assert category_totals(store) == {'Beauty': 6}
+    
+    classifier = ContentClassifier(cache_size=0)
+    classifier.add_keywords('Luxury', ['zorblax'])
+    assert Reclassifier(db, classifier, pause=0).run()['changed'] == 6
+    
+    store.sync()
+    assert category_totals(store) == {'Luxury': 6}
+    store.close()
+
+def test_sharded_storage_is_synced_per_shard(tmp_path):
+    db = ShardedArticleDatabase(str(tmp_path / 'articles.db'), 2)
+    db.insert_articles(make_articles())
+    
+    with pytest.raises(ValueError, match='shard_count'):
+        AnalyticsStore(str(tmp_path / 'catalog.duckdb'), db.db_path).sync()
+    
+    store = AnalyticsStore(str(tmp_path / 'analytics.duckdb'), db.db_path, shard_count=2)
+    store.sync()
+    assert category_totals(store) == {'Beauty': 6}
+    store.close()
@@ -0,0 +1,116 @@
+import logging
+import pytest
+from src.archive import ArticleArchive
+
+def make_archive(tmp_path):
+    archive = ArticleArchive(str(tmp_path / 'archive'))
+    archive.archive_articles([
+        {'id': 1, 'title': 'Kept', 'source': 'Vogue', 'category': 'Beauty', 'published_date': '2024-03-01T10:00:00+00:00'},
+    ])
+    archive.archive_articles([
+        {'id': 2, 'title': 'Lost', 'source': 'WWD', 'category': 'Retail', 'published_date': '2024-03-01T12:00:00+00:00'},
+    ])
+    good, bad = sorted(archive.list_segments('20240301'), key=lambda p: archive.read_segment(p)[0]['id'])
+    return archive, good, bad
+
+def truncate(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:len(data) // 2])
+
+def corrupt_block(path):
+    with open(path, 'r+b') as f:
+        f.seek(10)
+        f.write(b'\x00' * 8)
+
+@pytest.mark.parametrize('damage', [truncate, corrupt_block])
+def test_corrupt_segment_is_logged_and_skipped(tmp_path, caplog, damage):
+    archive, good, bad = make_archive(tmp_path)
+    damage(bad)
+    
+    with caplog.at_level(logging.ERROR):
+        rows = archive.query()
+    
+    assert [row['title'] for row in rows] == ['Kept']
+    assert any(bad in record.getMessage() for record in caplog.records)
+    with pytest.raises(ValueError, match='archive segment'):
+        archive.read_segment(bad)
+    assert archive.read_segment(good)[0]['title'] == 'Kept'
+
+def test_missing_segment_raises(tmp_path):
+    archive, good, bad = make_archive(tmp_path)
+    
+    with pytest.raises(OSError):
+        archive.read_segment(str(tmp_path / 'archive' / 'missing.seg'))
+
+def article(i, day='2024-03-01', hour=10, source='Vogue', category='Beauty'):
+    return {'id': i, 'title': f'Title {i}', 'url': f'https://example.com/{i}', 'source': source,
+            'category': category, 'description': None, 'published_date': f'{day}T{hour:02d}:00:00+00:00'}
+
+def test_round_trip(tmp_path):
+    archive = ArticleArchive(str(tmp_path / 'archive'))
+    articles = [article(1, hour=9), article(2, hour=11, source='WWD', category='Retail'), article(3, day='2024-03-02')]
+    
+    assert archive.archive_articles(articles) == 3
+    assert archive.list_days() == ['20240302', '20240301']
+    
+    rows = archive.query()
+    assert [row['id'] for row in rows] == [3, 2, 1]
+    for row, original in zip(rows, [articles[2], articles[1], articles[0]]):
+        assert {k: row[k] for k in original} == original
+    assert rows[0]['published_ts'] == 1709373600
+
+def test_filters_and_columns_are_pushed_down(tmp_path, monkeypatch):
+    archive = ArticleArchive(str(tmp_path / 'archive'))
+    archive.archive_articles([article(1, hour=9), article(2, hour=11)])
+    archive.archive_articles([article(3, hour=12, source='WWD', category='Retail')])
+    archive.archive_articles([article(4, day='2024-02-01')])
+    wwd_segments = [p for p in archive.list_segments('20240301') if archive.read_segment(p)[0]['source'] == 'WWD']
+    
+    read = []
+    original = ArticleArchive._read_column
+    monkeypatch.setattr(ArticleArchive, '_read_column',
+                        lambda self, f, footer, column: read.append((f.name, column)) or original(self, f, footer, column))
+    
+    # The footer's source dictionary rules out the Vogue segments without decoding a block
+    assert [row['id'] for row in archive.query(source='WWD')] == [3]
+    assert {name for name, _ in read} == set(wwd_segments)
+    
+    # Days outside the range are never opened; only requested columns are decoded
+    read.clear()
+    rows = archive.query(start='2024-03-01T10:00:00+00:00', category='Beauty', columns=['id'])
+    assert rows == [{'id': 2, 'published_ts': 1709290800}]
+    assert {column for _, column in read} == {'published_ts', 'category', 'id'}
+    assert not any('20240201' in name for name, _ in read)
+    
+    assert [row['id'] for row in archive.query(end='2024-03-01T10:00:00+00:00')] == [1, 4]
+    assert [row['id'] for row in archive.query(limit=2)] == [3, 2]
+
+def test_segments_of_a_day_are_merged(tmp_path):
+    archive = ArticleArchive(str(tmp_path / 'archive'), max_segments_per_day=3)
+    for i in range(1, 4):
+        archive.archive_articles([article(i, hour=i)])
+    assert len(archive.list_segments('20240301')) == 3
+    
+    # The fourth cleanup pushes the day over the limit and its segments become one
+    archive.archive_articles([article(4, hour=4), article(5, day='2024-03-02')])
+    assert len(archive.list_segments('20240301')) == 1
+    assert len(archive.list_segments('20240302')) == 1
+    assert [row['id'] for row in archive.query()] == [5, 4, 3, 2, 1]
+    assert [p.suffix for p in (tmp_path / 'archive' / '20240301').iterdir()] == ['.seg']
+
+def test_merge_drops_duplicate_rows_and_keeps_unreadable_segments(tmp_path):
+    archive = ArticleArchive(str(tmp_path / 'archive'))
+    archive.archive_articles([article(1), article(2, hour=11)])
+    # The same row archived again (a crash before the hot delete) and a damaged segment
+    archive.archive_articles([article(2, hour=11)])
+    archive.archive_articles([article(3, hour=12)])
+    bad = [p for p in archive.list_segments('20240301') if archive.read_segment(p)[0]['id'] == 3][0]
+    truncate(bad)
+    
+    assert archive.merge_day('20240301') == 2
+    segments = archive.list_segments('20240301')
+    assert len(segments) == 2 and bad in segments
+    assert sorted(row['id'] for row in archive.read_segment(next(p for p in segments if p != bad))) == [1, 2]
+    assert archive.merge_day('20240301') == 0
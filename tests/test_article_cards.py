@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+from src.article_cards import HOT_BADGE, NEW_BADGE, format_time_ago, html_url, paginate, render_articles
+
+def article(i, minutes_ago=300, **fields):
+    return dict({
+        'title': f'Story {i}',
+        'url': f'https://example.com/{i}',
+        'source': 'Vogue',
+        'category': 'Beauty',
+        'snippet': 'Snippet',
+        'published_date': (datetime.now(timezone.utc) - timedelta(minutes=minutes_ago)).isoformat(),
+    }, **fields)
+
+def test_fields_are_escaped_and_kept_on_one_line():
+    html = render_articles([article(1, title='<script>x</script>\n\nBold', snippet='a & b',
+                                    url='javascript:alert(1)', category=None)])
+    
+    assert '<script>' not in html and '&lt;script&gt;x&lt;/script&gt; Bold' in html
+    assert 'a &amp; b' in html and 'Uncategorized' in html
+    assert 'href="#"' in html and '\n' not in html
+    assert html_url(' https://example.com/?a=1&b=2 ') == 'https://example.com/?a=1&amp;b=2'
+
+def test_badges_and_times():
+    fresh, recent, old = article(1, 30), article(2, 90), article(3, 600)
+    
+    assert HOT_BADGE not in render_articles([fresh])
+    html = render_articles([fresh, recent, old], badges=True)
+    assert html.count(HOT_BADGE) == 1 and html.count(NEW_BADGE) == 1 and html.count('fresh-article') == 1
+    
+    assert format_time_ago(recent['published_date']) == '1 hour ago'
+    assert format_time_ago(recent['published_date'], precise=True) == '1h 30m ago'
+    assert format_time_ago(article(4, 3 * 24 * 60)['published_date']) == '3 days ago'
+    assert format_time_ago('not a date') == 'Unknown time'
+    assert format_time_ago(None) == 'Unknown time'
+
+def test_only_one_page_is_rendered():
+    articles = [article(i) for i in range(120)]
+    
+    page, pages = paginate(articles, 3)
+    assert pages == 3 and [a['title'] for a in page] == [f'Story {i}' for i in range(100, 120)]
+    assert paginate(articles, 99)[0] == page
+    assert paginate([], 1) == ([], 1)
+    assert render_articles(paginate(articles, 1)[0]).count('class="article-card"') == 50
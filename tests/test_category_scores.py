@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+from src.category_scores import DEFAULT_MIN_SCORE
+from src.classifier import ContentClassifier
+from src.database import ArticleDatabase
+
+def store(db, classifier, title, description=''):
+    scores = classifier.score_article(title, description)
+    db.insert_articles([{
+        'title': title,
+        'url': f'https://example.com/{abs(hash(title))}',
+        'description': description,
+        'published_date': datetime.now(timezone.utc),
+        'source': 'Vogue',
+        'category': max(scores, key=scores.get),
+        'category_scores': scores,
+    }])
+    return scores
+
+def titles(db, category, min_score=None):
+    return sorted(a['title'] for a in db.get_articles(category=category, min_score=min_score))
+
+def test_single_label_by_default_multi_label_when_asked(tmp_path):
+    db = ArticleDatabase(str(tmp_path / 'articles.db'))
+    classifier = ContentClassifier(cache_size=0)
+    
+    # Two Luxury keywords and one incidental E-commerce one ("app")
+    incidental = 'Chanel opens a luxury salon, booked through its app'
+    assert store(db, classifier, incidental) == {
+        'Fashion Business': 0.0, 'Beauty': 0.0, 'Luxury': 1.0, 'Retail': 0.0, 'E-commerce': 0.5, 'Fashion Trends': 0.0
+    }
+    # Three Luxury keywords to one: below the multi-label threshold
+    weak = 'Chanel and Dior luxury goods sold in a boutique'
+    store(db, classifier, weak)
+    
+    assert titles(db, 'Luxury') == sorted([incidental, weak])
+    assert titles(db, 'E-commerce') == []
+    assert titles(db, 'Retail') == []
+    
+    # The opt-in filter: a category at least half as strong as the best one
+    assert DEFAULT_MIN_SCORE == 0.5
+    assert titles(db, 'E-commerce', DEFAULT_MIN_SCORE) == [incidental]
+    assert titles(db, 'Retail', DEFAULT_MIN_SCORE) == []
+    assert titles(db, 'Retail', 0.25) == [weak]
+    assert titles(db, 'Luxury', DEFAULT_MIN_SCORE) == sorted([incidental, weak])
@@ -0,0 +1,72 @@
+import pytest
+
+from src.classifier import ContentClassifier, DEFAULT_CATEGORY
+from src.keyword_matcher import KeywordMatcher
+from benchmarks.bench_classifier import EDGE_CASES, EXTRA_KEYWORDS, RegexClassifier, fuzz_texts
+
+TEXTS = EDGE_CASES + [
+    # Overlapping keywords: a longer keyword and the shorter ones inside it
+    'retail strategy', 'retail space retail technology', 'skincare routine and skincare',
+    'fashion week', 'fashion influencer fashion', 'luxury goods luxury market luxury',
+    'online shopping online store', 'buy online pick up in store', 'digital marketing digital',
+    # Word boundaries
+    'trendy trendsetter', 'stores restore', 'apps application app', 'pre-fall fall-out',
+    'AIR fair AI.', 'e-commerce, retail; luxury!', '(runway)', 'designer-led designers',
+    # Case
+    'FASHION WEEK', 'Fashion Week', 'fAsHiOn wEeK', 'ceo Ceo CEO', 'LOUIS VUITTON louis vuitton',
+    # Empty and keyword-free
+    '', '   ', '\n\t', 'nothing to see', 'an online retailer', 'premiums',
+]
+
+@pytest.fixture
+def classifier():
+    return ContentClassifier(cache_size=0)
+
+def extended(classifier):
+    for category, keywords in EXTRA_KEYWORDS.items():
+        classifier.add_keywords(category, keywords)
+    return classifier
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_matcher_counts_match_regex(classifier, text):
+    reference = RegexClassifier(classifier.category_keywords)
+    
+    assert classifier.matcher.count(text) == reference.scores(text)
+    assert classifier.classify_uncached(text, '') == reference.classify(text)[1]
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_added_keywords_match_regex(classifier, text):
+    classifier = extended(classifier)
+    reference = RegexClassifier(classifier.category_keywords)
+    
+    assert classifier.matcher.count(text) == reference.scores(text)
+    assert classifier.classify_uncached(text, '') == reference.classify(text)[1]
+
+def test_overlapping_keywords_follow_regex_semantics():
+    # Non-overlapping within a category (the earliest listed keyword wins),
+    # overlapping freely across categories
+    category_keywords = {'A': ['retail', 'retail strategy', 'strategy'], 'B': ['retail strategy'], 'C': ['strategy']}
+    matcher = KeywordMatcher(category_keywords)
+    reference = RegexClassifier(category_keywords)
+    
+    for text in ['Retail strategy', 'retail strategy strategy', 'retailstrategy', 'retail-strategy']:
+        assert matcher.count(text) == reference.scores(text)
+    assert matcher.count('Retail strategy') == {'A': 2, 'B': 1, 'C': 1}
+
+def test_empty_text_falls_back_to_default(classifier):
+    assert classifier.matcher.scan('') == ({category: 0 for category in classifier.get_categories()}, set())
+    assert classifier.classify_article('', '') == DEFAULT_CATEGORY
+    assert classifier.classify_article('', None) == DEFAULT_CATEGORY
+    assert classifier.classify_many([('', ''), ('', None)]) == [DEFAULT_CATEGORY, DEFAULT_CATEGORY]
+
+@pytest.mark.parametrize('add_extra', [False, True])
+def test_classify_many_matches_regex(classifier, add_extra):
+    if add_extra:
+        classifier = extended(classifier)
+    reference = RegexClassifier(classifier.category_keywords)
+    keywords = [k for words in classifier.category_keywords.values() for k in words]
+    pairs = [(text, '') for text in TEXTS] + [(text, 'Store opening') for text in TEXTS]
+    pairs += [(text, '') for text in fuzz_texts(keywords, 2000)]
+    
+    assert classifier.classify_many(pairs) == [reference.classify(t, d)[1] for t, d in pairs]
+    assert classifier.classify_many(pairs) == [classifier.classify_uncached(t, d) for t, d in pairs]
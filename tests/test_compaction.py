@@ -0,0 +1,64 @@
+import json
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from src.compaction import Compactor, storage_metrics
+from src.database import ArticleDatabase
+
+def fill(db, days_ago, count=300):
+    published = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    db.insert_articles([
+        {'title': f'Story {days_ago} {i:04x}', 'url': f'https://example.com/{days_ago}/{i}',
+         'description': f'{i:08x} ' * 200, 'source': 'Vogue', 'category': 'Fashion', 'published_date': published}
+        for i in range(count)
+    ])
+
+def test_cleanup_pages_are_reclaimed_in_steps(tmp_path):
+    db = ArticleDatabase(str(tmp_path / 'articles.db'))
+    fill(db, days_ago=10)
+    fill(db, days_ago=0, count=20)
+    compactor = Compactor(db.db_path, pages_per_step=8, pause=0, metrics_path=str(tmp_path / 'metrics.json'))
+    assert compactor.metrics()['auto_vacuum'] == 'incremental'
+    
+    db.cleanup_old_articles(days_old=5)
+    before = compactor.metrics()
+    assert before['freelist_count'] > 8
+    
+    # One step frees at most pages_per_step pages
+    assert compactor.step() == 8
+    # A spent time budget leaves the rest for the next round
+    assert Compactor(db.db_path, max_seconds=0).compact()['reclaimed_pages'] == 0
+    
+    after = compactor.compact()
+    assert after['freelist_count'] == 0
+    assert after['reclaimed_pages'] == before['freelist_count'] - 8
+    assert after['page_count'] == before['page_count'] - before['freelist_count']
+    with open(tmp_path / 'metrics.json') as f:
+        assert json.load(f) == after
+    
+    # Nothing left behind by the deletes is lost
+    assert db.get_stats()['total_articles'] == 20
+    conn = sqlite3.connect(db.db_path)
+    assert conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+    conn.close()
+
+def test_legacy_database_warns_until_enabled(tmp_path, caplog):
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE t (value TEXT)')
+    conn.executemany('INSERT INTO t VALUES (?)', [('x' * 1000,)] * 500)
+    conn.commit()
+    conn.execute('DELETE FROM t')
+    conn.commit()
+    assert storage_metrics(conn)['auto_vacuum'] == 'none'
+    conn.close()
+    
+    compactor = Compactor(path)
+    with caplog.at_level(logging.WARNING):
+        metrics = compactor.compact()
+        compactor.compact()
+    assert metrics['freelist_count'] > 0 and 'reclaimed_pages' not in metrics
+    assert sum('--enable' in record.getMessage() for record in caplog.records) == 1
+    
+    metrics = compactor.enable_incremental()
+    assert metrics['auto_vacuum'] == 'incremental' and metrics['freelist_count'] == 0
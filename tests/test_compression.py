@@ -0,0 +1,96 @@
+import random
+import sqlite3
+from datetime import datetime, timezone
+from src.compression import TextCompressor, train_dictionary, HEADER
+from src.database import ArticleDatabase
+
+BOILERPLATE = ('<p>{body}</p><p>The post <a href="https://example.com/{i}">{title}</a> '
+               'appeared first on Fashion Daily &amp; Co.</p>')
+
+def descriptions(seed, count):
+    rng = random.Random(seed)
+    words = 'runway couture handbag retail luxury beauty skincare denim café résumé naïve'.split()
+    texts = []
+    for i in range(count):
+        title = ' '.join(rng.choice(words) for _ in range(5))
+        body = ' '.join(rng.choice(words) for _ in range(40))
+        texts.append(BOILERPLATE.format(body=body, title=title, i=i))
+    return texts
+
+def store():
+    conn = sqlite3.connect(':memory:')
+    compressor = TextCompressor()
+    compressor.init_tables(conn)
+    return conn, compressor
+
+def test_round_trip_across_retraining():
+    conn, writer = store()
+    first = descriptions(1, 200)
+    assert writer.train(conn, first) == 1
+    packed_first = [writer.compress(text) for text in first]
+    
+    second = descriptions(2, 200)
+    assert writer.train(conn, second) == 2
+    packed_second = [writer.compress(text) for text in second]
+    
+    assert all(isinstance(value, bytes) for value in packed_first + packed_second)
+    assert {HEADER.unpack_from(value)[0] for value in packed_first} == {1}
+    assert {HEADER.unpack_from(value)[0] for value in packed_second} == {2}
+    
+    # A reader that has not loaded any dictionary picks them up on demand
+    reader = TextCompressor()
+    assert [reader.decompress(conn, value) for value in packed_first] == first
+    assert [reader.decompress(conn, value) for value in packed_second] == second
+    assert [writer.decompress(conn, value) for value in packed_first] == first
+
+def test_dictionary_beats_plain_deflate():
+    conn, compressor = store()
+    texts = descriptions(3, 300)
+    plain = [compressor.compress(text) for text in texts]
+    compressor.train(conn, texts[:200])
+    trained = [compressor.compress(text) for text in texts[200:]]
+    
+    assert sum(map(len, trained)) < 0.8 * sum(map(len, plain[200:]))
+
+def test_prefix_and_uncompressed_values():
+    conn, compressor = store()
+    compressor.train(conn, descriptions(4, 200))
+    text = descriptions(5, 1)[0]
+    packed = compressor.compress(text)
+    
+    for max_chars in (0, 1, 17, 100, len(text), len(text) + 10):
+        assert compressor.decompress(conn, packed, max_chars) == text[:max_chars]
+    
+    # Short and incompressible text is stored as is
+    assert compressor.compress('short') == 'short'
+    rng = random.Random(0)
+    noise = ''.join(chr(rng.randrange(33, 127)) for _ in range(100))
+    assert compressor.compress(noise) == noise
+    assert compressor.compress(None) is None
+    assert compressor.decompress(conn, noise, 10) == noise[:10]
+    assert compressor.decompress(conn, None) is None
+
+def test_empty_training_keeps_current_dictionary():
+    conn, compressor = store()
+    assert train_dictionary(['one', 'two']) == b''
+    assert compressor.train(conn, ['one', 'two']) == 0
+    assert compressor.decompress(conn, compressor.compress(descriptions(6, 1)[0])) == descriptions(6, 1)[0]
+
+def test_database_descriptions_round_trip(tmp_path):
+    db = ArticleDatabase(str(tmp_path / 'articles.db'), compress_descriptions=True)
+    texts = descriptions(7, 150)
+    now = datetime.now(timezone.utc)
+    db.insert_articles([
+        {'title': f'Story {i:04x}', 'url': f'https://example.com/{i}', 'description': text,
+         'source': 'Vogue', 'category': 'Fashion', 'published_date': now}
+        for i, text in enumerate(texts)
+    ])
+    
+    conn = db.connect()
+    stored = [row[0] for row in conn.execute('SELECT description FROM articles')]
+    conn.close()
+    assert all(isinstance(value, bytes) for value in stored)
+    
+    by_title = {a['title']: a['description'] for a in db.get_articles(limit=500)}
+    assert [by_title[f'Story {i:04x}'] for i in range(len(texts))] == texts
+    assert ArticleDatabase(db.db_path).get_articles(limit=1, description_chars=20)[0]['description'] in {t[:20] for t in texts}
@@ -0,0 +1,35 @@
+import pytest
+from src.config import DEFAULT_SNAPSHOT_PATH, ENV_VARS, AggregatorConfig
+
+def test_defaults_without_environment():
+    config = AggregatorConfig.from_env({})
+    
+    assert config == AggregatorConfig(snapshot_path=DEFAULT_SNAPSHOT_PATH)
+    assert config.db_path == 'articles.db' and not config.sharded
+    assert AggregatorConfig().snapshot_path is None
+
+def test_environment_is_parsed_by_field_type():
+    config = AggregatorConfig.from_env({
+        'ARTICLES_DB_PATH': '/data/articles.db',
+        'ARTICLES_PARTITIONED': 'Yes',
+        'ARTICLES_RETENTION_DAYS': '7',
+        'ARTICLES_SNAPSHOT_PATH': '/data/articles.snapshot.db',
+        'ARTICLES_IN_MEMORY_SNAPSHOT': '0',
+        'ARTICLES_COMPRESS_DESCRIPTIONS': 'true',
+        'ARTICLES_ARCHIVE_DIR': '',
+        'UNRELATED': 'ignored',
+    })
+    
+    assert config == AggregatorConfig(db_path='/data/articles.db', partitioned=True, retention_days=7,
+                                      snapshot_path='/data/articles.snapshot.db', compress_descriptions=True)
+    assert set(ENV_VARS) == set(AggregatorConfig.__dataclass_fields__)
+
+def test_overrides_and_validation():
+    assert AggregatorConfig.from_env({'ARTICLES_SHARDS': '4'}, snapshot_path=None).shards == 4
+    
+    with pytest.raises(ValueError, match='single-file storage'):
+        AggregatorConfig.from_env({'ARTICLES_SHARDS': '4'})
+    with pytest.raises(ValueError, match='ARTICLES_RETENTION_DAYS'):
+        AggregatorConfig.from_env({'ARTICLES_RETENTION_DAYS': 'five'})
+    with pytest.raises(TypeError):
+        AggregatorConfig.from_env({}, unknown_option=1)
@@ -0,0 +1,48 @@
+import sqlite3
+from datetime import datetime, timezone
+import pytest
+from src.database import ArticleDatabase
+from src.partitioned_database import PartitionedArticleDatabase
+from src.sharded_database import ShardedArticleDatabase
+
+def make_articles(prefix, count=6, bad=2):
+    articles = [
+        {
+            'title': f'{prefix} story {i}',
+            'url': f'https://example.com/{prefix}/{i}',
+            'description': f'description {i} of {prefix}',
+            'published_date': datetime.now(timezone.utc),
+            'source': f'Source {i % 3}',
+            'category': 'Beauty',
+        }
+        for i in range(count)
+    ]
+    articles[bad]['published_date'] = 'not a date'
+    return articles
+
+@pytest.mark.parametrize('open_db', [
+    lambda path: ArticleDatabase(str(path / 'articles.db')),
+    lambda path: PartitionedArticleDatabase(str(path / 'articles.db')),
+    lambda path: ShardedArticleDatabase(str(path / 'articles.db'), 2),
+], ids=['base', 'partitioned', 'sharded'])
+def test_bad_article_does_not_sink_batch(tmp_path, open_db):
+    db = open_db(tmp_path)
+    articles = make_articles('batch')
+    
+    inserted = db.insert_articles(articles)
+    
+    assert inserted == [True, True, False, True, True, True]
+    assert db.get_stats()['total_articles'] == 5
+    # The failed article is retried next cycle rather than remembered as seen
+    assert not db.is_known(articles[2]['url'])
+    # No write lock is left behind
+    db.cleanup_old_articles(days_old=5)
+
+def test_failed_article_releases_write_lock(tmp_path):
+    db = ArticleDatabase(str(tmp_path / 'articles.db'))
+    db.insert_articles(make_articles('lock', count=1, bad=0))
+    
+    conn = sqlite3.connect(db.db_path, timeout=0)
+    conn.execute('BEGIN IMMEDIATE')
+    conn.rollback()
+    conn.close()
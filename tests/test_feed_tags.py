@@ -0,0 +1,63 @@
+import sqlite3
+import pytest
+from src.feed_tags import FeedTagIndex, TagMapper, entry_tags
+
+MAPPER = TagMapper(
+    {'beauty': 'Beauty', 'Skin  Care': 'Beauty', 'luxury': 'Luxury', 'retail': 'Retail', 'e-commerce': 'E-commerce'},
+    {'Retail Dive': {'retail': None, 'E-Commerce': 'E-commerce'}, 'Glossy': {'luxury': 'Beauty'}}
+)
+
+def test_tags_vote_and_ties_go_to_the_classifier():
+    assert MAPPER.scores('Vogue', ['Beauty']) == {'Beauty': 1.0}
+    assert MAPPER.scores('Vogue', ['skin care', 'luxury', 'BEAUTY']) == {'Beauty': 1.0, 'Luxury': 0.5}
+    assert MAPPER.scores('Vogue', ['beauty', 'luxury']) is None
+    assert MAPPER.scores('Vogue', ['runway', 'paris']) is None
+    assert MAPPER.scores('Vogue', []) is None
+
+def test_source_overrides_take_precedence():
+    # Mapped to None: the source's use of the tag counts for nothing
+    assert MAPPER.scores('Retail Dive', ['retail']) is None
+    assert MAPPER.scores('Retail Dive', ['Retail', 'e-commerce']) == {'E-commerce': 1.0}
+    assert MAPPER.scores('Vogue', ['retail']) == {'Retail': 1.0}
+    assert MAPPER.scores('Glossy', ['luxury']) == {'Beauty': 1.0}
+
+def test_version_follows_the_mapping():
+    same = TagMapper({'BEAUTY': 'Beauty', 'skin care': 'Beauty', 'luxury': 'Luxury', 'retail': 'Retail',
+                      'e-commerce': 'E-commerce'},
+                     {'Retail Dive': {'retail': None, 'e-commerce': 'E-commerce'}, 'Glossy': {'luxury': 'Beauty'}})
+    assert same.version == MAPPER.version
+    assert TagMapper({'beauty': 'Luxury'}).version != MAPPER.version
+    assert MAPPER.stamp('abc') == f'abc+tags-{MAPPER.version}'
+
+def test_entry_tags_dedupes_in_feed_order():
+    entry = {'tags': [{'term': ' Skin\n Care '}, {'term': 'Beauty'}, {'term': 'skin care'},
+                      {'term': ''}, {'term': None}, {'term': 'BEAUTY'}, {'term': 'Paris'}]}
+    assert entry_tags(entry) == ['Skin Care', 'Beauty', 'Paris']
+    assert entry_tags({}) == []
+
+@pytest.fixture
+def tag_conn():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE articles (id TEXT PRIMARY KEY)')
+    conn.executemany('INSERT INTO articles VALUES (?)', [('a',), ('b',), ('c',)])
+    index = FeedTagIndex()
+    index.init_tables(conn)
+    index.add(conn, 'a', 100, ['Skin Care', 'Beauty'])
+    index.add(conn, 'b', 200, ['beauty'])
+    index.add(conn, 'c', 300, None)
+    yield conn, index
+    conn.close()
+
+def test_filter_is_case_insensitive(tag_conn):
+    conn, index = tag_conn
+    query = f"SELECT a.id FROM articles a WHERE {index.filter_sql('a.id')} ORDER BY a.id"
+    
+    assert [row[0] for row in conn.execute(query, ('BEAUTY',))] == ['a', 'b']
+    assert [row[0] for row in conn.execute(query, ('skin care',))] == ['a']
+    assert index.tags_for(conn, ['a', 'b', 'c']) == {'a': ['Beauty', 'Skin Care'], 'b': ['beauty']}
+
+def test_prune_drops_tags_of_old_articles(tag_conn):
+    conn, index = tag_conn
+    
+    assert index.prune(conn, 150) == 2
+    assert index.tags_for(conn, ['a', 'b']) == {'b': ['beauty']}
@@ -0,0 +1,76 @@
+import random
+import sqlite3
+from datetime import datetime, timezone
+from src.database import ArticleDatabase
+from src.near_duplicates import NearDuplicateIndex, NUM_PERM, minhash, pack_signature, shingles, similarity
+
+ORIGINAL = ('Chanel names new creative director after a year-long search',
+            'The French house confirmed on Monday that its next creative director will show the first '
+            'collection in Paris this autumn, ending months of speculation across the industry.')
+# The same wire story as a second outlet runs it: retitled slightly, with markup and a sign-off
+SYNDICATED = ('Chanel names a new creative director after year-long search',
+              '<p>The French house confirmed on Monday that its next creative director will show the first '
+              'collection in Paris this autumn, ending months of speculation across the industry.</p> Read more.')
+
+WORDS = ('runway couture handbag retail luxury beauty skincare denim sneaker store mall brand label '
+         'designer market season launch collab archive vintage resale textile cotton silk tailoring').split()
+
+def random_article(rng):
+    title = ' '.join(rng.choice(WORDS) for _ in range(8))
+    return title, ' '.join(rng.choice(WORDS) for _ in range(30))
+
+def index():
+    conn = sqlite3.connect(':memory:')
+    near_duplicates = NearDuplicateIndex()
+    near_duplicates.init_tables(conn)
+    return conn, near_duplicates
+
+def test_signature_estimates_jaccard():
+    a, b = shingles(*ORIGINAL), shingles(*SYNDICATED)
+    jaccard = len(a & b) / len(a | b)
+    estimate = similarity(pack_signature(minhash(*ORIGINAL)), pack_signature(minhash(*SYNDICATED)))
+    
+    assert len(minhash(*ORIGINAL)) == NUM_PERM
+    assert abs(estimate - jaccard) < 0.2
+    assert minhash('', None) is None
+    assert minhash('', '<p><br/></p>') is None
+
+def test_known_near_duplicate_pair_is_found():
+    conn, near_duplicates = index()
+    near_duplicates.add(conn, 'original', 0, minhash(*ORIGINAL))
+    
+    assert near_duplicates.find(conn, minhash(*SYNDICATED)) == 'original'
+    assert near_duplicates.find(conn, minhash(*ORIGINAL)) == 'original'
+
+def test_distinct_articles_are_not_merged():
+    rng = random.Random(3)
+    conn, near_duplicates = index()
+    near_duplicates.add(conn, 'original', 0, minhash(*ORIGINAL))
+    
+    # Same topic words, different story
+    assert near_duplicates.find(conn, minhash('Chanel creative director shows first Paris collection',
+                                              'Reviews of the debut were mixed.')) is None
+    
+    # Articles drawn from one small vocabulary share many words but few bigrams
+    for i in range(300):
+        signature = minhash(*random_article(rng))
+        assert near_duplicates.find(conn, signature) is None
+        near_duplicates.add(conn, i, 0, signature)
+
+def test_database_links_copies_and_hides_them(tmp_path):
+    db = ArticleDatabase(str(tmp_path / 'articles.db'))
+    now = datetime.now(timezone.utc)
+    articles = [
+        {'title': title, 'description': description, 'url': f'https://example.com/{source}', 'source': source,
+         'category': 'Luxury', 'published_date': now}
+        for source, (title, description) in [('vogue', ORIGINAL), ('wwd', SYNDICATED),
+                                             ('elle', random_article(random.Random(5)))]
+    ]
+    
+    assert db.insert_articles(articles) == [True, True, True]
+    
+    shown = db.get_articles()
+    assert sorted(a['source'] for a in shown) == ['elle', 'vogue']
+    original = next(a for a in shown if a['source'] == 'vogue')
+    assert [a['source'] for a in db.get_duplicates(original['id'])] == ['wwd']
+    assert len(db.get_articles(include_duplicates=True)) == 3
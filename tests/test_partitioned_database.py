@@ -0,0 +1,72 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from src.archive import ArticleArchive
+from src.partitioned_database import PartitionedArticleDatabase, PARTITION_PREFIX
+
+NOW = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+
+def make_article(day, i, category='Beauty', source='Vogue'):
+    return {
+        # Unrelated words, so no story is linked as a near-duplicate of another
+        'title': ' '.join(hashlib.sha1(f'{day}/{i}/{k}'.encode()).hexdigest()[:8] for k in range(6)),
+        'url': f'https://example.com/{day}/{i}',
+        'description': '',
+        'published_date': NOW - timedelta(days=day, hours=i),
+        'source': source,
+        'category': category,
+    }
+
+def make_db(tmp_path, archive=None):
+    db = PartitionedArticleDatabase(str(tmp_path / 'articles.db'), archive=archive)
+    articles = [make_article(day, i, category='Luxury' if day >= 7 else 'Beauty')
+                for day in (0, 1, 8, 9) for i in range(3)]
+    assert db.insert_articles(articles) == [True] * len(articles)
+    return db
+
+def partition_counts(db):
+    conn = db.connect()
+    counts = {table[len(PARTITION_PREFIX):]: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+              for table in db.list_partitions(conn)}
+    conn.close()
+    return counts
+
+def test_rows_are_routed_to_their_days_partition(tmp_path):
+    db = make_db(tmp_path)
+    
+    days = [(NOW - timedelta(days=day)).strftime('%Y%m%d') for day in (0, 1, 8, 9)]
+    assert partition_counts(db) == {day: 3 for day in days}
+    
+    # Duplicates are found across partitions and within the batch
+    repeat = dict(make_article(9, 0), published_date=NOW)
+    new = make_article(2, 0)
+    assert db.insert_articles([repeat, new, dict(new)]) == [False, True, False]
+    assert db.get_stats()['total_articles'] == 13
+
+def test_get_articles_merges_partitions_newest_first(tmp_path):
+    db = make_db(tmp_path)
+    
+    articles = db.get_articles(limit=100)
+    timestamps = [a['published_ts'] for a in articles]
+    assert len(articles) == 12
+    assert timestamps == sorted(timestamps, reverse=True)
+    
+    # A limit spanning partitions stops in the second one
+    assert [a['url'] for a in db.get_articles(limit=4)] == [
+        'https://example.com/0/0', 'https://example.com/0/1', 'https://example.com/0/2', 'https://example.com/1/0'
+    ]
+    assert {a['url'][20:22] for a in db.get_articles(hours_old=40)} == {'0/', '1/'}
+    assert len(db.get_articles(category='Luxury')) == 6
+
+def test_cleanup_drops_whole_partitions_and_their_stats(tmp_path):
+    archive = ArticleArchive(str(tmp_path / 'archive'))
+    db = make_db(tmp_path, archive=archive)
+    
+    assert db.cleanup_old_articles(days_old=5) == 6
+    
+    assert sorted(partition_counts(db)) == sorted((NOW - timedelta(days=d)).strftime('%Y%m%d') for d in (0, 1))
+    stats = db.get_stats()
+    assert stats['total_articles'] == 6
+    assert stats['by_category'] == {'Beauty': 6}
+    assert stats['top_sources'] == {'Vogue': 6}
+    assert len(archive.query()) == 6
+    assert len(db.get_articles(category='Luxury')) == 0
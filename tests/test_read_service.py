@@ -0,0 +1,97 @@
+import os
+import shutil
+import sqlite3
+import logging
+import pytest
+from src.database import ArticleDatabase, SCHEMA_VERSION
+from src.partitioned_database import PartitionedArticleDatabase
+from src.read_service import ArticleReadService
+from src.snapshot import SnapshotArticleDatabase
+
+# The database shipped with the repository predates every migration
+SHIPPED_DB = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'articles.db')
+
+@pytest.fixture
+def v0_db(tmp_path):
+    if not os.path.exists(SHIPPED_DB):
+        pytest.skip("no shipped articles.db")
+    path = tmp_path / 'articles.db'
+    shutil.copy(SHIPPED_DB, path)
+    conn = sqlite3.connect(path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+    total = conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+    conn.close()
+    return str(path), total
+
+def test_serves_v0_database_without_snapshot(tmp_path, v0_db):
+    db_path, total = v0_db
+    service = ArticleReadService(str(tmp_path / 'missing.snapshot.db'), db_path)
+    
+    assert service.get_stats()['total_articles'] == total
+    articles = service.get_recent_articles(limit=10, with_description=False)
+    assert len(articles) == min(10, total)
+    category = articles[0]['category']
+    assert service.get_recent_articles(limit=10, category=category, min_score=0.5)
+    
+    conn = sqlite3.connect(db_path)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+    conn.close()
+
+def test_missing_primary_is_created_empty(tmp_path):
+    service = ArticleReadService(str(tmp_path / 'missing.snapshot.db'), str(tmp_path / 'articles.db'))
+    
+    assert service.get_stats()['total_articles'] == 0
+    assert service.get_recent_articles() == []
+
+def test_stale_snapshot_is_logged_once(tmp_path, caplog):
+    db_path = str(tmp_path / 'articles.db')
+    snapshot_path = str(tmp_path / 'articles.snapshot.db')
+    ArticleDatabase(db_path).publish_snapshot(snapshot_path)
+    service = ArticleReadService(snapshot_path, db_path)
+    
+    with caplog.at_level(logging.WARNING):
+        service.get_stats()
+        assert not caplog.records
+        
+        # Ingest kept writing the primary for two hours without publishing
+        two_hours_ago = os.stat(snapshot_path).st_mtime - 7200
+        os.utime(snapshot_path, (two_hours_ago, two_hours_ago))
+        assert service.reader.snapshot_lag() > 7000
+        service.get_stats()
+        service.get_recent_articles()
+    
+    assert [r.getMessage() for r in caplog.records if 'older than' in r.getMessage()] == [
+        f"Read snapshot {snapshot_path} is 2.0h older than {db_path}; is ingest running without snapshot_path?"
+    ]
+
+@pytest.mark.parametrize('in_memory', [False, True])
+def test_snapshot_reader_reads_key_format_of_the_served_file(tmp_path, in_memory):
+    db_path = str(tmp_path / 'articles.db')
+    snapshot_path = str(tmp_path / 'articles.snapshot.db')
+    ArticleDatabase(str(tmp_path / 'hex.db'), key_format='hex').publish_snapshot(snapshot_path)
+    ArticleDatabase(db_path, key_format='int64')
+    
+    # Known when opened, not only after the first query
+    reader = SnapshotArticleDatabase(snapshot_path, db_path, in_memory=in_memory)
+    assert reader.key_format == 'hex'
+    assert isinstance(reader.generate_article_id('Title', 'https://example.com'), str)
+    
+    # A snapshot of the primary written with other keys replaces it
+    ArticleDatabase(db_path).publish_snapshot(snapshot_path)
+    reader.get_stats()
+    assert reader.key_format == 'int64'
+    assert isinstance(reader.generate_article_id('Title', 'https://example.com'), int)
+
+def test_snapshot_reader_falls_back_to_primary_key_format(tmp_path):
+    db_path = str(tmp_path / 'articles.db')
+    PartitionedArticleDatabase(db_path, key_format='hex')
+    
+    reader = SnapshotArticleDatabase(str(tmp_path / 'missing.snapshot.db'), db_path)
+    assert reader.key_format == 'hex'
+    
+    # Nothing to read yet: detected on the first query instead
+    reader = SnapshotArticleDatabase(str(tmp_path / 'missing.snapshot.db'), str(tmp_path / 'missing.db'))
+    assert reader.key_format is None
+    ArticleDatabase(str(tmp_path / 'missing.db'), key_format='hex')
+    assert reader.get_articles() == []
+    assert reader.key_format == 'hex'
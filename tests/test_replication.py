@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import pytest
+from src.replication import ReplicationPublisher, ReplicaApplier, read_changeset
+
+def write(db_path, *titles):
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE IF NOT EXISTS articles (id INTEGER PRIMARY KEY, title TEXT)')
+    conn.executemany('INSERT INTO articles (title) VALUES (?)', [(title,) for title in titles])
+    conn.commit()
+    conn.close()
+
+def titles(db_path):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    rows = [row[0] for row in conn.execute('SELECT title FROM articles ORDER BY id')]
+    conn.close()
+    return rows
+
+@pytest.fixture
+def replication(tmp_path):
+    db_path = str(tmp_path / 'articles.db')
+    transport = str(tmp_path / 'transport')
+    publisher = ReplicationPublisher(db_path, transport, base_every=10)
+    applier = ReplicaApplier(transport, str(tmp_path / 'replica'))
+    return db_path, transport, publisher, applier
+
+def test_base_and_diffs_round_trip(replication):
+    db_path, transport, publisher, applier = replication
+    write(db_path, 'first')
+    assert publisher.publish() == 1
+    write(db_path, *(f'padding {i}' * 50 for i in range(100)))
+    assert publisher.publish() == 2
+    write(db_path, 'last')
+    assert publisher.publish() == 3
+    # Nothing changed, nothing shipped
+    assert publisher.publish() is None
+    
+    assert sorted(os.listdir(transport)) == ['000000000001.base', '000000000002.diff', '000000000003.diff']
+    header, pages = read_changeset(os.path.join(transport, '000000000003.diff'))
+    assert not header['full'] and 0 < len(pages) < header['page_count']
+    
+    assert applier.apply_pending() == 3
+    assert titles(applier.snapshot_path) == titles(db_path)
+    # Page for page the image the publisher shipped
+    with open(publisher.shadow_path, 'rb') as shipped, open(applier.replica_path, 'rb') as replica:
+        assert shipped.read() == replica.read()
+    assert applier.apply_pending() == 0
+
+def test_out_of_order_diff_waits_for_its_predecessor(replication):
+    db_path, transport, publisher, applier = replication
+    for seq in range(1, 4):
+        write(db_path, f'story {seq}')
+        publisher.publish()
+    
+    # Diff 2 is still in transit when diff 3 arrives
+    in_transit = os.path.join(transport, '000000000002.diff')
+    os.rename(in_transit, in_transit + '.part')
+    assert applier.apply_pending() == 1
+    assert titles(applier.snapshot_path) == ['story 1']
+    # No newer base to restart from: wait instead of re-applying base 1
+    assert applier.apply_pending() == 0
+    assert applier.lag()['lag_changesets'] == 2
+    
+    os.rename(in_transit + '.part', in_transit)
+    assert applier.apply_pending() == 2
+    assert titles(applier.snapshot_path) == ['story 1', 'story 2', 'story 3']
+
+def test_missing_diff_restarts_from_newer_base(tmp_path):
+    db_path = str(tmp_path / 'articles.db')
+    transport = str(tmp_path / 'transport')
+    publisher = ReplicationPublisher(db_path, transport, base_every=2, keep_bases=5)
+    applier = ReplicaApplier(transport, str(tmp_path / 'replica'))
+    write(db_path, 'story 1')
+    publisher.publish()
+    assert applier.apply_pending() == 1
+    
+    for seq in range(2, 5):
+        write(db_path, f'story {seq}')
+        publisher.publish()
+    assert sorted(os.listdir(transport))[-2:] == ['000000000003.base', '000000000004.diff']
+    # Diff 2 was lost (e.g. pruned); the replica catches up from base 3
+    os.remove(os.path.join(transport, '000000000002.diff'))
+    
+    assert applier.apply_pending() == 2
+    assert applier.lag()['applied_seq'] == 4
+    assert titles(applier.snapshot_path) == titles(db_path)
+
+def test_lag_tracks_applied_sequence(replication, monkeypatch):
+    db_path, transport, publisher, applier = replication
+    write(db_path, 'story 1')
+    publisher.publish()
+    write(db_path, 'story 2')
+    publisher.publish()
+    
+    lag = applier.lag()
+    assert (lag['applied_seq'], lag['latest_seq'], lag['lag_changesets']) == (0, 2, 2)
+    assert lag['lag_seconds'] >= 0
+    
+    applier.apply_pending()
+    lag = applier.lag()
+    assert (lag['applied_seq'], lag['lag_changesets'], lag['lag_seconds']) == (2, 0, 0.0)
+    assert lag['last_applied_published_at'] == read_changeset(os.path.join(transport, '000000000002.diff'))[0]['published_at']
+    
+    # An applier that is caught up never reads a changeset to report its lag,
+    # and only reads its own state from disk once
+    monkeypatch.setattr('src.replication.read_changeset', lambda path: pytest.fail('read a changeset'))
+    monkeypatch.setattr(applier, '_read_state', lambda: pytest.fail('re-read applied state'))
+    assert applier.lag()['lag_changesets'] == 0
+    
+    # A restarted applier resumes from the persisted position
+    restarted = ReplicaApplier(transport, applier.replica_dir)
+    assert restarted.lag()['applied_seq'] == 2
+
+def test_interrupted_apply_restarts_from_base(replication):
+    db_path, transport, publisher, applier = replication
+    write(db_path, 'story 1')
+    publisher.publish()
+    write(db_path, 'story 2')
+    publisher.publish()
+    applier.apply_pending()
+    
+    # A crash mid-apply leaves the dirty marker behind
+    open(applier.dirty_path, 'w').close()
+    restarted = ReplicaApplier(transport, applier.replica_dir)
+    assert restarted.lag()['applied_seq'] == 0
+    assert restarted.apply_pending() == 2
+    assert not os.path.exists(restarted.dirty_path)
+    assert titles(restarted.snapshot_path) == ['story 1', 'story 2']
@@ -0,0 +1,58 @@
+import random
+from array import array
+from src.database import ArticleDatabase
+from src.seen_set import SeenSet, fingerprint
+
+def urls(count, prefix='https://example.com/'):
+    rng = random.Random(7)
+    return [f'{prefix}{rng.getrandbits(64):016x}' for _ in range(count)]
+
+def test_membership_across_sorted_array_and_pending():
+    stored = urls(1000)
+    seen = SeenSet(stored, merge_threshold=100)
+    assert isinstance(seen.sorted, array) and seen.sorted.typecode == 'Q'
+    assert list(seen.sorted) == sorted(fingerprint(url) for url in stored)
+    
+    added = urls(150, 'https://example.org/')
+    for url in added[:99]:
+        seen.add(url)
+    # Below the threshold new keys wait in the pending set
+    assert len(seen.pending) == 99 and len(seen.sorted) == 1000
+    assert all(url in seen for url in stored + added[:99])
+    
+    for url in added[99:]:
+        seen.add(url)
+    # Reaching it merges them into the sorted array
+    assert len(seen.pending) == 50 and len(seen.sorted) == 1100
+    assert list(seen.sorted) == sorted(seen.sorted)
+    assert all(url in seen for url in stored + added)
+    assert len(seen) == 1150
+    
+    assert not any(url in seen for url in urls(1000, 'https://example.net/'))
+    assert 'https://example.com/' not in seen and '' not in seen
+
+def test_duplicates_are_stored_once():
+    seen = SeenSet(['a', 'a', 'b'], merge_threshold=2)
+    seen.add('a')
+    seen.add('c')
+    
+    assert list(seen.sorted) == sorted({fingerprint(k) for k in 'abc'})
+    assert len(seen) == 3
+
+def test_database_seen_set_tracks_inserts_and_deletes(tmp_path):
+    db = ArticleDatabase(str(tmp_path / 'articles.db'))
+    article = {'title': 'Runway report', 'url': 'https://example.com/runway', 'description': None,
+               'published_date': '2024-03-01T10:00:00+00:00', 'source': 'Vogue', 'category': 'Fashion'}
+    
+    assert not db.is_known(article['url'])
+    assert db.insert_articles([article]) == [True]
+    assert db.is_known(article['url'])
+    # A known URL never reaches SQLite
+    assert db.insert_articles([article]) == [False]
+    
+    # A fresh instance rebuilds the set from the stored URLs
+    assert ArticleDatabase(db.db_path).is_known(article['url'])
+    
+    # Retention deletes forget the URL so it can come back
+    db.cleanup_old_articles(days_old=1)
+    assert not db.is_known(article['url'])
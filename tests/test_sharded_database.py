@@ -0,0 +1,91 @@
+import random
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from src.database import ArticleDatabase
+from src.sharded_database import ShardedArticleDatabase
+
+NOW = datetime.now(timezone.utc)
+SOURCES = [f'Source {i}' for i in range(8)]
+CATEGORIES = ['Beauty', 'Luxury', 'Retail']
+
+def make_articles(count=60, seed=3):
+    rng = random.Random(seed)
+    return [
+        {
+            'title': ' '.join(f'{rng.getrandbits(32):08x}' for _ in range(6)),
+            'url': f'https://example.com/{i}',
+            'description': '',
+            'published_date': NOW - timedelta(minutes=rng.randrange(3 * 24 * 60)),
+            'source': SOURCES[i % len(SOURCES)],
+            'category': CATEGORIES[i % len(CATEGORIES)],
+        }
+        for i in range(count)
+    ]
+
+def story(url, source, minutes_ago):
+    return {
+        'title': 'Heritage house names a new creative director for its womenswear line',
+        'url': url,
+        'description': 'The appointment follows months of speculation about the future of the label.',
+        'published_date': NOW - timedelta(minutes=minutes_ago),
+        'source': source,
+        'category': 'Luxury',
+    }
+
+def in_different_shards(db):
+    first = db.shard_for(SOURCES[0])
+    return SOURCES[0], next(s for s in SOURCES if db.shard_for(s) is not first)
+
+def test_reads_merge_shards_like_one_database(tmp_path):
+    sharded = ShardedArticleDatabase(str(tmp_path / 'sharded.db'), 3)
+    single = ArticleDatabase(str(tmp_path / 'single.db'))
+    articles = make_articles()
+    sharded.insert_articles(articles)
+    single.insert_articles(articles)
+    
+    # Every shard got some sources, and the catalog holds no article tables
+    assert all(shard.get_stats()['total_articles'] for shard in sharded.shards)
+    conn = sqlite3.connect(sharded.db_path)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    assert not tables & {'articles', 'article_category_scores', 'article_tags', 'category_stats', 'text_dictionaries'}
+    
+    for kwargs in [{'limit': 100}, {'limit': 7}, {'limit': 10, 'category': 'Luxury'},
+                   {'limit': 100, 'source': SOURCES[2]}, {'limit': 100, 'hours_old': 30}]:
+        merged = [a['url'] for a in sharded.get_articles(**kwargs)]
+        assert merged == [a['url'] for a in single.get_articles(**kwargs)]
+    
+    assert sharded.get_stats() == single.get_stats()
+
+def test_near_duplicates_link_across_shards(tmp_path):
+    db = ShardedArticleDatabase(str(tmp_path / 'articles.db'), 2)
+    first, second = in_different_shards(db)
+    
+    assert db.insert_articles([story('https://a.example/1', first, 60)]) == [True]
+    assert db.insert_articles([story('https://b.example/1', second, 30)]) == [True]
+    
+    canonical, = db.get_articles()
+    assert canonical['url'] == 'https://a.example/1'
+    copies = db.get_duplicates(canonical['id'])
+    assert [a['url'] for a in copies] == ['https://b.example/1']
+    assert copies[0]['canonical_id'] == canonical['id']
+    assert len(db.get_articles(include_duplicates=True)) == 2
+
+def test_copies_of_a_story_that_failed_to_store_stay_visible(tmp_path):
+    db = ShardedArticleDatabase(str(tmp_path / 'articles.db'), 2)
+    first, second = in_different_shards(db)
+    original = story('https://a.example/1', first, 60)
+    
+    # The story fails in its shard after the catalog linked its copy to it
+    shard = db.shard_for(first)
+    article_row = shard.article_row
+    def failing_row(conn, article):
+        if article['url'] == original['url']:
+            raise sqlite3.IntegrityError('simulated failure')
+        return article_row(conn, article)
+    shard.article_row = failing_row
+    
+    assert db.insert_articles([original, story('https://b.example/1', second, 30)]) == [False, True]
+    
+    copy, = db.get_articles()
+    assert copy['url'] == 'https://b.example/1' and copy['canonical_id'] is None
@@ -0,0 +1,59 @@
+import sqlite3
+import pytest
+from datetime import datetime, timezone
+from src.compression import TextCompressor
+from src.database import ArticleDatabase, migrate_snippet
+from src.snippets import SNIPPET_CHARS, make_snippet, plain_text
+
+@pytest.mark.parametrize('html_text, text', [
+    ('<p>Runway</p><p>report</p>', 'Runway report'),
+    ('Line<br>break<br/>here', 'Line break here'),
+    ('<b>Ch</b>anel <a href="https://example.com">couture</a>', 'Chanel couture'),
+    ('Dior &amp; Co &#8217;s <i>new</i>&nbsp;line', 'Dior & Co ’s new line'),
+    ('&lt;b&gt; is escaped markup', '<b> is escaped markup'),
+    ('<script>track()</script><style>p {}</style>Visible <noscript>no</noscript>text', 'Visible text'),
+    ('<div>Unclosed <p>tags <span>everywhere', 'Unclosed tags everywhere'),
+    ('  spaced \n\t out  ', 'spaced out'),
+    ('<img src="x.jpg" alt="ignored"/>', ''),
+])
+def test_plain_text_strips_tags_and_decodes_entities(html_text, text):
+    assert plain_text(html_text) == text
+
+def test_short_text_is_kept_whole():
+    assert make_snippet('<p>A short description.</p>') == 'A short description.'
+    assert make_snippet('x' * SNIPPET_CHARS) == 'x' * SNIPPET_CHARS
+    assert make_snippet(None) is None
+    assert make_snippet('') is None
+    assert make_snippet('<p> </p><img src="x.jpg">') is None
+
+def test_long_text_is_cut_at_a_word_boundary():
+    text = 'word ' * 100
+    snippet = make_snippet(f'<p>{text}</p>')
+    
+    assert snippet.endswith('word…')
+    assert len(snippet) <= SNIPPET_CHARS + 1
+    assert make_snippet('alpha beta, gamma delta', max_chars=12) == 'alpha beta…'
+    assert make_snippet('alpha beta gamma', max_chars=10) == 'alpha beta…'
+    # A single long word is cut mid-word
+    assert make_snippet('x' * 300, max_chars=20) == 'x' * 20 + '…'
+    # The cut counts visible characters, not markup
+    assert make_snippet('<b>' * 50 + 'one two three', max_chars=8) == 'one two…'
+
+def test_database_stores_snippets_and_migrates_old_rows(tmp_path):
+    db = ArticleDatabase(str(tmp_path / 'articles.db'))
+    description = '<p>Chanel &amp; Dior</p>' + '<p>more words here</p>' * 30
+    db.insert_articles([{'title': 'Story', 'url': 'https://example.com/1', 'description': description,
+                         'source': 'Vogue', 'category': 'Luxury', 'published_date': datetime.now(timezone.utc)}])
+    
+    article = db.get_articles(with_description=False)[0]
+    assert article['snippet'] == make_snippet(description)
+    assert article['snippet'].startswith('Chanel & Dior more words here')
+    
+    # Rows written before the snippet column get one from their description
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE articles (description TEXT)')
+    conn.executemany('INSERT INTO articles VALUES (?)', [(description,), (None,), ('<i>short</i>',)])
+    migrate_snippet(conn, 'articles', TextCompressor(), batch_size=2)
+    assert [row[0] for row in conn.execute('SELECT snippet FROM articles ORDER BY rowid')] == [
+        make_snippet(description), None, 'short'
+    ]